@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+import importlib
+import time
+from contextlib import nullcontext
+
 import streamlit as st
 
-from pensiones.ui.pages.page1_isr_ss import render as render_isr_ss
-from pensiones.ui.pages.page2_lss1997 import render as render_lss1997
-from pensiones.ui.pages.page3_lss1973 import render as render_lss1973
+from pensiones.ui.cache import cache_stats
+from pensiones.utils import profiling
+
+# Cada sección se importa hasta que se abre (y Python la deja en caché después),
+# así el arranque no paga pandas/plotly/matplotlib de las páginas que no se ven.
+PAGES = {
+    "I) ISR 2026 + SS (LSS 1997) + INFONAVIT": "pensiones.ui.pages.page1_isr_ss",
+    "II) LSS 1997 — Tasa de reemplazo": "pensiones.ui.pages.page2_lss1997",
+    "IV) LSS 1973 — Pensión y RR (60–65)": "pensiones.ui.pages.page3_lss1973",
+    "V) Población — ISR/SS agregados": "pensiones.ui.pages.page4_population",
+}
 
 st.set_page_config(
     page_title="Calculadora de Pensiones",
@@ -16,23 +28,36 @@ st.caption("Tarea Larga 1 — Seguridad Social y Pensiones")
 
 section = st.sidebar.radio(
     "Secciones",
-    options=[
-        "I) ISR 2026 + SS (LSS 1997) + INFONAVIT",
-        "II) LSS 1997 — Tasa de reemplazo",
-        "IV) LSS 1973 — Pensión y RR (60–65)",
-    ],
+    options=list(PAGES),
 )
 
 st.sidebar.markdown("---")
 st.sidebar.write("Carpetas importantes:")
 st.sidebar.code("pensiones/core\n pensiones/data\n plots/")
+cache_box = st.sidebar.empty()
+debug = st.sidebar.checkbox("🔧 Panel de depuración (tiempos)", value=False)
+
+t0 = time.perf_counter()
+with (profiling.collect() if debug else nullcontext()) as run_stats:
+    with profiling.timer("ui.import_page"):
+        page = importlib.import_module(PAGES[section])
+    page.render()
+rerun_ms = 1e3 * (time.perf_counter() - t0)
+
+total = cache_stats()["total"]
+calls = total["hits"] + total["misses"]
+cache_box.caption(
+    f"Caché de cálculos: {total['hits']:,}/{calls:,} aciertos "
+    f"({total['hits'] / calls:.0%}) · {total['size']} entradas" if calls else "Caché de cálculos: sin uso aún"
+)
 
-if section.startswith("I)"):
-    render_isr_ss()
-elif section.startswith("II)"):
-    render_lss1997()
-else:
-    render_lss1973()
+if debug:
+    with st.expander(f"🔧 Depuración: esta ejecución tomó {rerun_ms:,.1f} ms", expanded=True):
+        st.caption("Desglose de esta ejecución (las llamadas anidadas se cuentan también en su función padre)")
+        st.dataframe(run_stats.to_frame(), use_container_width=True, hide_index=True)
+        if profiling.is_enabled():
+            st.caption(f"Acumulado del proceso ({profiling.ENV_PROFILE}=1)")
+            st.dataframe(profiling.GLOBAL.to_frame(), use_container_width=True, hide_index=True)
 
 st.markdown("---")
 st.caption("Tip: llena las tablas legales en `pensiones/data/` y ajusta las funciones en `pensiones/core/`.")
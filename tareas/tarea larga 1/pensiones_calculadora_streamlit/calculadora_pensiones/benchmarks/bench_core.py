@@ -0,0 +1,214 @@
+"""Benchmarks de las rutas calientes de ``pensiones.core``.
+
+Mide latencia (por elemento) y throughput (elementos/s) de ISR, cuotas SS, el
+solver de ahorro voluntario, ``rr_curve``, ``rr_by_retirement_age`` y
+``compare_scenarios``, en variante escalar (un llamado por trabajador) y por
+lotes, con caché de tablas fría (``io.cache_clear`` antes de cada corrida) y caliente. Guarda los
+resultados en JSON y los puede comparar contra una corrida anterior.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.bench_core --sizes 1k 100k
+    python -m benchmarks.bench_core --sizes 1k 100k 1M --out outputs/bench/nuevo.json \\
+        --compare outputs/bench/base.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.populations import SIZES, isr_brackets, lss1973_assumptions, lss1997_assumptions, population, ss_schedule
+from pensiones.core.isr_2026 import compile_isr_tariff, isr_monthly, isr_monthly_batch
+from pensiones.core.lss1973_ret import pension_lss1973_batch, rr_by_retirement_age
+from pensiones.core.lss1997_ret import (
+    replacement_rate_lss1997_batch,
+    rr_curve,
+    solve_voluntary_rate_for_target,
+    solve_voluntary_rate_for_target_batch,
+)
+from pensiones.core.scenarios import compare_scenarios, vary
+from pensiones.core.ss_1997 import ss_contributions_batch, ss_contributions_compact, ss_contributions_monthly
+from pensiones.utils import io
+
+# Las variantes escalares se miden sobre a lo más tantos trabajadores.
+SCALAR_ROWS = 2_000
+# Tasas voluntarias por trabajador en rr_curve (igual que la página II).
+CURVE_POINTS = 40
+
+def _timeit(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+class Recorder:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+
+    def run(self, function: str, variant: str, cache: str, size: str, items: int,
+            fn: Callable[[], Any], setup: Optional[Callable[[], Any]] = None) -> None:
+        if cache == "warm":
+            fn()  # calentamiento: tablas en caché, imports, etc.
+        times = _timeit(fn, self.repeat, setup)
+        median = statistics.median(times)
+        row = {
+            "function": function,
+            "variant": variant,
+            "cache": cache,
+            "size": size,
+            "items": items,
+            "seconds_median": median,
+            "seconds_min": min(times),
+            "latency_per_item_us": 1e6 * median / items,
+            "throughput_per_s": items / median if median > 0 else float("inf"),
+        }
+        self.results.append(row)
+        print(
+            f"{function:<34} {variant:<7} {cache:<5} {size:>5} "
+            f"{row['latency_per_item_us']:>12.3f} µs/elem {row['throughput_per_s']:>14,.0f} elem/s",
+            file=sys.stderr,
+        )
+
+def bench_size(rec: Recorder, label: str, df: pd.DataFrame) -> None:
+    brackets = isr_brackets()
+    tariff = compile_isr_tariff(brackets)
+    schedule = ss_schedule()
+    a97 = lss1997_assumptions()
+    a73 = lss1973_assumptions()
+
+    n = len(df)
+    k = min(n, SCALAR_ROWS)
+    salary = df["salary_monthly"].to_numpy(dtype=float)
+    sbc = df["sbc_daily"].to_numpy(dtype=float)
+    days = df["days"].to_numpy(dtype=float)
+    age = df["age_now"].to_numpy(dtype=float)
+    target = df["target_rr"].to_numpy(dtype=float)
+    rates = np.linspace(0.0, 0.20, CURVE_POINTS)
+    ages = np.arange(60, 66)
+
+    # ISR
+    rec.run("isr_monthly", "scalar", "warm", label, k,
+            lambda: [isr_monthly(x, tariff) for x in salary[:k]])
+    rec.run("isr_monthly", "batch", "warm", label, n, lambda: isr_monthly_batch(salary, tariff))
+
+    # Cuotas SS
+    rec.run("ss_contributions_monthly", "scalar", "warm", label, k,
+            lambda: [ss_contributions_monthly(x, int(d), schedule) for x, d in zip(sbc[:k], days[:k])])
+    rec.run("ss_contributions_monthly", "batch", "warm", label, n,
+            lambda: ss_contributions_batch(sbc, days, schedule))
+    rec.run("ss_contributions_compact", "scalar", "warm", label, k,
+            lambda: [ss_contributions_monthly(x, int(d), schedule, compact=True) for x, d in zip(sbc[:k], days[:k])])
+    rec.run("ss_contributions_compact", "batch", "warm", label, n,
+            lambda: ss_contributions_compact(sbc, days, schedule))
+
+    # Solver de ahorro voluntario (cuotas y supuestos de benchmarks.populations,
+    # no los de pensiones/data/, que pueden venir en cero)
+    ks = min(k, 200)
+    rec.run("solve_voluntary_rate_for_target", "scalar", "warm", label, ks,
+            lambda: [solve_voluntary_rate_for_target(a, s, t, assumptions=a97, schedule=schedule)
+                     for a, s, t in zip(age[:ks], salary[:ks], target[:ks])])
+    rec.run("solve_voluntary_rate_for_target", "batch", "warm", label, n,
+            lambda: solve_voluntary_rate_for_target_batch(age, salary, target, assumptions=a97, schedule=schedule))
+
+    # rr_curve: CURVE_POINTS tasas por trabajador
+    rec.run("rr_curve", "scalar", "warm", label, ks,
+            lambda: [rr_curve(a, s, rates, a97, schedule=schedule) for a, s in zip(age[:ks], salary[:ks])])
+
+    def curve_batch():
+        base = replacement_rate_lss1997_batch(age, salary, 0.0, a97, schedule=schedule)
+        return base["replacement_rate"][:, None] + rates[None, :] * base["rr_per_voluntary"][:, None]
+    rec.run("rr_curve", "batch", "warm", label, n, curve_batch)
+
+    # rr_by_retirement_age: edades 60–65 por trabajador
+    rec.run("rr_by_retirement_age", "scalar", "warm", label, ks,
+            lambda: [rr_by_retirement_age(a, s, assumptions=a73) for a, s in zip(age[:ks], salary[:ks])])
+    rec.run("rr_by_retirement_age", "batch", "warm", label, n,
+            lambda: pension_lss1973_batch(age[:, None], ages[None, :], salary[:, None], a73))
+
+    # Comparación de escenarios: 4 rendimientos, etapas previas reutilizadas
+    scenarios = vary("real_return_annual", [0.02, 0.035, 0.05])
+    rec.run("compare_scenarios", "batch", "warm", label, n,
+            lambda: compare_scenarios(df, scenarios, base_assumptions=a97, schedule=schedule))
+
+def bench_cold_warm(rec: Recorder) -> None:
+    """Primer llamado con la caché de tablas vacía vs. con tablas ya parseadas."""
+    cases = {
+        "isr_monthly": lambda: isr_monthly(20000.0),
+        "ss_contributions_monthly": lambda: ss_contributions_monthly(700.0),
+        "solve_voluntary_rate_for_target": lambda: solve_voluntary_rate_for_target(30, 20000.0, 0.7),
+        "rr_by_retirement_age": lambda: rr_by_retirement_age(55, 20000.0),
+    }
+    for name, fn in cases.items():
+        rec.run(name, "scalar", "cold", "1", 1, fn, setup=io.cache_clear)
+        rec.run(name, "scalar", "warm", "1", 1, fn)
+
+def compare(current: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """Imprime la razón actual/base de la mediana; devuelve el número de regresiones."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]
+    key = lambda r: (r["function"], r["variant"], r["cache"], r["size"])
+    base = {key(r): r for r in baseline}
+    regressions = 0
+    print(f"\nComparación contra {baseline_path} (umbral ×{threshold:.2f})")
+    for r in current:
+        b = base.get(key(r))
+        if b is None:
+            continue
+        ratio = r["latency_per_item_us"] / b["latency_per_item_us"]
+        flag = "REGRESIÓN" if ratio > threshold else ("mejora" if ratio < 1 / threshold else "")
+        regressions += flag == "REGRESIÓN"
+        print(f"  {r['function']:<34} {r['variant']:<7} {r['cache']:<5} {r['size']:>5}  ×{ratio:6.2f} {flag}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_core")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="JSON de salida (por defecto outputs/bench/bench_<fecha>.json)")
+    parser.add_argument("--compare", default=None, help="JSON de una corrida anterior")
+    parser.add_argument("--threshold", type=float, default=1.25, help="razón de latencia que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    rec = Recorder(repeat=args.repeat)
+    bench_cold_warm(rec)
+    for label in args.sizes:
+        bench_size(rec, label, population(SIZES[label]))
+
+    stamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    out = Path(args.out or f"outputs/bench/bench_{stamp}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "timestamp": stamp,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "repeat": args.repeat,
+            "sizes": args.sizes,
+        },
+        "results": rec.results,
+    }
+    out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"\nResultados en {out}", file=sys.stderr)
+
+    if args.compare:
+        return 1 if compare(rec.results, args.compare, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""Tiempo de importación (arranque en frío) de ``pensiones`` y de cada página.
+
+Cada objetivo se importa en un intérprete nuevo con ``python -X importtime``;
+se reporta la mediana del tiempo de importación (suma de los módulos de primer
+nivel), los módulos más lentos y se verifica que ``pensiones.core`` no arrastre
+Streamlit, matplotlib ni Plotly. Termina con código 1 si algún objetivo se pasa
+de su presupuesto o si el core importa un backend prohibido.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --repeat 7 --top 10 --out outputs/bench/import.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+CORE_MODULES = (
+    "pensiones.core.isr_2026",
+    "pensiones.core.ss_1997",
+    "pensiones.core.lss1997_ret",
+    "pensiones.core.lss1997_mc",
+    "pensiones.core.lss1973_ret",
+    "pensiones.core.grid",
+    "pensiones.core.curves",
+    "pensiones.core.net_to_gross",
+    "pensiones.core.mortality",
+    "pensiones.core.scenarios",
+)
+
+# objetivo -> (módulos a importar, presupuesto en ms)
+TARGETS: Dict[str, Tuple[Tuple[str, ...], float]] = {
+    "core": (CORE_MODULES, 1_500.0),
+    "ui.shell": (("streamlit", "pensiones.ui.cache", "pensiones.utils.profiling"), 3_000.0),
+    "ui.page1": (("pensiones.ui.pages.page1_isr_ss",), 3_500.0),
+    "ui.page2": (("pensiones.ui.pages.page2_lss1997",), 3_500.0),
+    "ui.page3": (("pensiones.ui.pages.page3_lss1973",), 3_500.0),
+    "ui.page4": (("pensiones.ui.pages.page4_population",), 3_500.0),
+}
+
+# El core debe poder usarse sin ninguno de estos paquetes.
+FORBIDDEN_IN_CORE = ("streamlit", "matplotlib", "plotly")
+
+_PROBE = "import importlib, json, sys\n" \
+         "for m in {mods!r}: importlib.import_module(m)\n" \
+         "print(json.dumps(sorted(k for k in {forbidden!r} if k in sys.modules)))\n"
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(módulo, self µs, acumulado µs) de cada línea de ``-X importtime``; el nombre
+    conserva la sangría (los de primer nivel no tienen espacios al inicio)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # encabezado
+        rows.append((parts[2].rstrip()[1:], int(parts[0]), int(parts[1])))
+    return rows
+
+def measure(modules: Tuple[str, ...], repeat: int) -> Dict[str, Any]:
+    code = _PROBE.format(mods=modules, forbidden=FORBIDDEN_IN_CORE)
+    totals, last_rows, loaded = [], [], []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        )
+        rows = _parse_importtime(proc.stderr)
+        totals.append(sum(cum for name, _, cum in rows if not name.startswith(" ")) / 1e3)
+        last_rows = rows
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    by_self = sorted(last_rows, key=lambda r: r[1], reverse=True)
+    return {
+        "median_ms": statistics.median(totals),
+        "min_ms": min(totals),
+        "max_ms": max(totals),
+        "forbidden_loaded": loaded,
+        "slowest": [{"module": n.strip(), "self_ms": s / 1e3, "cumulative_ms": c / 1e3} for n, s, c in by_self[:25]],
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_import")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="módulos más lentos (tiempo propio) a mostrar")
+    parser.add_argument("--out", default=None, help="JSON de salida")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    results = {}
+    print(f"{'objetivo':<10} {'mediana ms':>11} {'mín ms':>9} {'presupuesto':>12}")
+    for name in args.targets:
+        modules, budget = TARGETS[name]
+        r = measure(modules, args.repeat)
+        r["budget_ms"] = budget
+        results[name] = r
+        over = r["median_ms"] > budget
+        leak = name == "core" and r["forbidden_loaded"]
+        failures += bool(over) + bool(leak)
+        flag = "EXCEDE" if over else ""
+        print(f"{name:<10} {r['median_ms']:>11.1f} {r['min_ms']:>9.1f} {budget:>12.0f} {flag}")
+        if leak:
+            print(f"  el core importó {', '.join(r['forbidden_loaded'])}")
+        for m in r["slowest"][:args.top]:
+            print(f"    {m['module']:<40} {m['self_ms']:>8.1f} ms")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2), encoding="utf-8")
+        print(f"\nResultados en {out}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
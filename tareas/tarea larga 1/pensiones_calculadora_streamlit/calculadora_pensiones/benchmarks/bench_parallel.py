@@ -0,0 +1,43 @@
+"""Escalamiento de ``pensiones.parallel.run_sharded`` contra número de procesos.
+
+Uso (desde la carpeta del proyecto):
+    python -m benchmarks.bench_parallel --rows 2000000 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List, Optional
+
+from benchmarks.populations import population
+from pensiones.batch import compute_population_chunk
+from pensiones.parallel import run_sharded
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parallel")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    df = population(args.rows)
+
+    print(f"{args.rows:,} filas, {cpus} CPUs")
+    print(f"{'procesos':>8} {'mejor [s]':>10} {'filas/s':>12} {'speedup':>8}")
+    base = None
+    for w in worker_counts:
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = run_sharded(df, compute_population_chunk, workers=w)
+            best = min(best, time.perf_counter() - t0)
+        assert len(out) == len(df)
+        base = base or best
+        print(f"{w:>8} {best:>10.3f} {args.rows / best:>12,.0f} {base / best:>8.2f}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
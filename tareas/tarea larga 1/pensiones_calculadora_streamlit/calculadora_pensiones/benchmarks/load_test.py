@@ -0,0 +1,191 @@
+"""Prueba de carga contra una instancia local de ``pensiones.service``.
+
+Abre ``--concurrency`` clientes (asyncio, sólo biblioteca estándar) que mandan
+peticiones durante ``--duration`` segundos y reporta throughput, latencias
+(p50/p95/p99) y errores por endpoint, más las estadísticas del servicio
+(cálculos, peticiones coalescidas, lotes enviados al pool).
+
+Uso (desde la carpeta del proyecto, con el servicio arriba):
+    python -m pensiones.service --port 8000 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 32 --duration 10
+    python -m benchmarks.load_test --mix batch --batch-rows 20000
+    python -m benchmarks.load_test --identical      # todas iguales: mide el coalescing
+    python -m benchmarks.load_test --check-coalescing   # sin servidor: N peticiones iguales -> 1 cálculo
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+def _single_requests(rng: random.Random) -> Tuple[str, Dict[str, Any]]:
+    kind = rng.randrange(5)
+    salary = round(rng.uniform(5_000, 120_000), 2)
+    age = rng.randrange(20, 60)
+    if kind == 0:
+        return "/isr", {"income": salary}
+    if kind == 1:
+        return "/ss", {"sbc_daily": round(salary / 30, 2), "days_in_month": 30}
+    if kind == 2:
+        return "/lss1997/replacement-rate", {"age_now": age, "salary_monthly": salary, "voluntary_rate": round(rng.uniform(0, 0.2), 3)}
+    if kind == 3:
+        return "/lss1997/solve", {"age_now": age, "salary_monthly": salary, "target_rr": round(rng.uniform(0.3, 0.9), 2)}
+    return "/lss1973/rr-by-age", {"age_now": rng.randrange(45, 64), "salary_monthly": salary}
+
+def _batch_request(rng: random.Random, rows: int) -> Tuple[str, Dict[str, Any]]:
+    gen = np.random.default_rng(rng.randrange(2**32))
+    salary = np.round(gen.lognormal(np.log(18_000), 0.6, rows), 2).tolist()
+    age = gen.integers(20, 60, rows).tolist()
+    kind = rng.randrange(3)
+    if kind == 0:
+        return "/isr/batch", {"incomes": salary}
+    if kind == 1:
+        return "/ss/batch", {"sbc_daily": [s / 30 for s in salary]}
+    return "/lss1997/solve/batch", {"age_now": age, "salary_monthly": salary, "target_rr": 0.7}
+
+async def _post(host: str, port: int, path: str, body: bytes) -> Tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (
+            f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        ).encode("ascii")
+        writer.write(head + body)
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    header, _, payload = raw.partition(b"\r\n\r\n")
+    status = int(header.split(b" ", 2)[1]) if header else 0
+    return status, payload
+
+async def _get_json(host: str, port: int, path: str) -> Dict[str, Any]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.partition(b"\r\n\r\n")[2] or b"{}")
+
+async def _client(
+    host: str, port: int, deadline: float, timeout: float, seed: int, mix: str, batch_rows: int,
+    identical: Optional[Tuple[str, bytes]], results: Dict[str, List[float]], errors: Dict[str, int]
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        if identical is not None:
+            path, body = identical
+        else:
+            use_batch = mix == "batch" or (mix == "mixed" and rng.random() < 0.05)
+            path, payload = _batch_request(rng, batch_rows) if use_batch else _single_requests(rng)
+            body = json.dumps(payload).encode("utf-8")
+        t0 = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(_post(host, port, path, body), timeout)
+        except (OSError, asyncio.TimeoutError):
+            status = 0
+        if status == 200:
+            results[path].append(time.perf_counter() - t0)
+        else:
+            errors[path] += 1
+
+async def run(
+    url: str, concurrency: int, duration: float, mix: str, batch_rows: int, identical: bool, seed: int,
+    timeout: float = 60.0
+) -> int:
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    before = await _get_json(host, port, "/stats")
+
+    same = None
+    if identical:
+        path, payload = _batch_request(random.Random(seed), batch_rows)
+        same = (path, json.dumps(payload).encode("utf-8"))
+
+    results: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(
+        _client(host, port, deadline, timeout, seed + i, mix, batch_rows, same, results, errors) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - t0
+    after = await _get_json(host, port, "/stats")
+
+    total = sum(len(v) for v in results.values())
+    print(f"{total:,} peticiones OK en {elapsed:.1f} s ({total / elapsed:,.1f} req/s), "
+          f"{sum(errors.values()):,} errores, concurrencia {concurrency}")
+    print(f"{'endpoint':<34} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>5}")
+    for path in sorted(set(results) | set(errors)):
+        lat = np.asarray(results.get(path, [])) * 1e3
+        p50, p95, p99 = (np.percentile(lat, [50, 95, 99]) if lat.size else (float("nan"),) * 3)
+        print(f"{path:<34} {lat.size:>7,} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f} {errors.get(path, 0):>5}")
+    all_lat = [x for v in results.values() for x in v]
+    if all_lat:
+        print(f"latencia media global: {1e3 * statistics.fmean(all_lat):.2f} ms")
+
+    delta = {k: after[k] - before.get(k, 0) for k in ("requests", "computed", "coalesced", "offloaded", "errors")}
+    print("servicio:", ", ".join(f"{k}={v:,}" for k, v in delta.items()))
+    return 1 if errors else 0
+
+async def check_coalescing(n: int = 20, path: str = "/lss1997/solve") -> int:
+    """Manda ``n`` peticiones idénticas concurrentes a un ``PensionService`` en
+    proceso (sin pool ni red) y verifica que se calculen una sola vez."""
+    from pensiones.service import PensionService
+
+    service = PensionService(workers=1)
+    body = json.dumps({"age_now": 30, "salary_monthly": 20_000, "target_rr": 0.7}).encode("utf-8")
+    scope = {"type": "http", "method": "POST", "path": path}
+    statuses: List[int] = []
+
+    async def one() -> None:
+        async def receive() -> Dict[str, Any]:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await service(scope, receive, send)
+
+    service.startup()
+    try:
+        await asyncio.gather(*(one() for _ in range(n)))
+    finally:
+        service.shutdown()
+    stats = service.stats
+    ok = stats["computed"] == 1 and stats["coalesced"] == n - 1 and statuses == [200] * n
+    print(f"{n} peticiones iguales a {path}: computed={stats['computed']}, coalesced={stats['coalesced']} "
+          f"-> {'OK' if ok else 'FALLA'}")
+    return 0 if ok else 1
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos")
+    parser.add_argument("--mix", choices=["single", "batch", "mixed"], default="mixed",
+                        help="tipo de peticiones (mixed = 5%% lotes)")
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    parser.add_argument("--identical", action="store_true", help="todas las peticiones iguales (un lote)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="segundos por petición (después cuenta como error)")
+    parser.add_argument("--check-coalescing", action="store_true",
+                        help="verifica en proceso que --concurrency peticiones iguales se calculen una vez")
+    args = parser.parse_args(argv)
+    if args.check_coalescing:
+        return asyncio.run(check_coalescing(args.concurrency))
+    return asyncio.run(run(
+        args.url, args.concurrency, args.duration, args.mix, args.batch_rows, args.identical, args.seed, args.timeout
+    ))
+
+if __name__ == "__main__":
+    raise SystemExit(main())
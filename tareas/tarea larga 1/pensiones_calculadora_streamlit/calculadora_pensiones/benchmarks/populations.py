@@ -0,0 +1,105 @@
+"""Poblaciones sintéticas y tablas representativas para los benchmarks.
+
+Las tablas tienen la estructura y el orden de magnitud reales (tarifa mensual
+ISR del SAT con 11 rangos, cuotas IMSS + INFONAVIT por seguro, supuestos LSS
+1997/1973 distintos de cero), pero son sólo para medir tiempos: no sustituyen a
+las de ``pensiones/data/``.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.isr_2026 import ISRTariffBracket
+from pensiones.core.ss_1997 import SSRateSchedule, compile_ss_rates
+
+SIZES: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+_ISR_ROWS = [
+    (0.01, 746.04, 0.00, 0.0192),
+    (746.05, 6332.05, 14.32, 0.0640),
+    (6332.06, 11128.01, 371.83, 0.1088),
+    (11128.02, 12935.82, 893.63, 0.1600),
+    (12935.83, 15487.71, 1182.88, 0.1792),
+    (15487.72, 31236.49, 1640.18, 0.2136),
+    (31236.50, 49233.00, 5004.12, 0.2352),
+    (49233.01, 93993.90, 9236.89, 0.3000),
+    (93993.91, 125325.20, 22665.17, 0.3200),
+    (125325.21, 375975.61, 32691.18, 0.3400),
+    (375975.62, None, 117912.32, 0.3500),
+]
+
+_SS_RATES = {
+    "params": {"uma_daily": 117.31, "sbc_min_uma": 1.0, "sbc_max_uma": 25.0},
+    "insurances": [
+        {"name": "Enfermedades y Maternidad", "components": [
+            {"component": "Cuota fija", "employer_rate": 0.204, "employee_rate": 0.0, "gov_rate": 0.0, "base": "UMA"},
+            {"component": "Excedente 3 UMA", "employer_rate": 0.011, "employee_rate": 0.004, "gov_rate": 0.0, "base": "SBC_excess_3UMA"},
+            {"component": "Prestaciones en dinero", "employer_rate": 0.007, "employee_rate": 0.0025, "gov_rate": 0.0, "base": "SBC"},
+            {"component": "Gastos médicos pensionados", "employer_rate": 0.0105, "employee_rate": 0.00375, "gov_rate": 0.0, "base": "SBC"},
+        ]},
+        {"name": "Invalidez y Vida", "components": [
+            {"component": "IV", "employer_rate": 0.0175, "employee_rate": 0.00625, "gov_rate": 0.0, "base": "SBC"},
+        ]},
+        {"name": "Retiro, Cesantía y Vejez", "components": [
+            {"component": "Retiro", "employer_rate": 0.02, "employee_rate": 0.0, "gov_rate": 0.0, "base": "SBC"},
+            {"component": "Cesantía y Vejez", "employer_rate": 0.0315, "employee_rate": 0.01125, "gov_rate": 0.00225, "base": "SBC"},
+        ]},
+        {"name": "Riesgos de Trabajo", "components": [
+            {"component": "RT", "employer_rate": 0.005, "employee_rate": 0.0, "gov_rate": 0.0, "base": "SBC"},
+        ]},
+        {"name": "Guarderías y Prestaciones Sociales", "components": [
+            {"component": "GPS", "employer_rate": 0.01, "employee_rate": 0.0, "gov_rate": 0.0, "base": "SBC"},
+        ]},
+        {"name": "INFONAVIT", "components": [
+            {"component": "INFONAVIT", "employer_rate": 0.05, "employee_rate": 0.0, "gov_rate": 0.0, "base": "SBC"},
+        ]},
+    ],
+}
+
+_LSS1997_ASSUMPTIONS = {
+    "retirement_age_default": 65,
+    "inflation_annual": 0.04,
+    "real_return_annual": 0.035,
+    "wage_growth_annual": 0.01,
+    "density_of_contribution": 0.8,
+    "annuity_years": 20,
+}
+
+_LSS1973_ASSUMPTIONS = {
+    "min_wage_daily": 315.04,
+    "days_per_month": 30.4,
+    "weeks_min": 500,
+    "weeks_now_default": 1000,
+    "contribution_density": 0.8,
+    "max_salary_vsm": 25.0,
+    "pension_increase": 0.11,
+    "min_pension_vsm": 1.0,
+}
+
+def isr_brackets() -> List[ISRTariffBracket]:
+    return [ISRTariffBracket(lower, upper, fixed, rate) for lower, upper, fixed, rate in _ISR_ROWS]
+
+def ss_schedule() -> SSRateSchedule:
+    return compile_ss_rates(_SS_RATES)
+
+def lss1997_assumptions() -> Dict[str, Any]:
+    return dict(_LSS1997_ASSUMPTIONS)
+
+def lss1973_assumptions() -> Dict[str, Any]:
+    return dict(_LSS1973_ASSUMPTIONS)
+
+def population(size: int, seed: int = 0) -> pd.DataFrame:
+    """Trabajadores con salario lognormal (mediana ~15k MXN/mes) y SBC ≈ salario / 30."""
+    rng = np.random.default_rng(seed)
+    salary = rng.lognormal(np.log(15000), 0.7, size).round(2)
+    return pd.DataFrame({
+        "salary_monthly": salary,
+        "sbc_daily": (salary / 30 * rng.uniform(1.0, 1.1, size)).round(2),
+        "days": rng.integers(28, 32, size),
+        "age_now": rng.integers(20, 60, size),
+        "voluntary_rate": rng.uniform(0.0, 0.10, size).round(4),
+        "target_rr": rng.uniform(0.3, 0.9, size).round(2),
+    })
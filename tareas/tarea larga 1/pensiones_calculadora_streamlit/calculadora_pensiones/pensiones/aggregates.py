@@ -0,0 +1,588 @@
+"""Resúmenes de población en memoria constante (ISR / cuotas SS) que se combinan.
+
+Los agregadores consumen los resultados del batch bloque por bloque y nunca
+guardan filas: sumas acumuladas, histogramas de bordes fijos, sketches de
+cuantiles (error relativo acotado) y conteos por tramo de ISR. Dos resúmenes
+con la misma configuración se combinan con ``merge`` (el resultado es el mismo
+que si un solo proceso hubiera visto todas las filas, salvo el error del
+sketch), así que cada worker/shard resume su parte y el proceso principal sólo
+junta objetos pequeños. Se guardan como JSON para combinar corridas separadas.
+
+- ``PopulationSummary.update(df)`` recibe la salida de ``batch.compute_chunk``.
+- El costo por seguro (patrón / trabajador / gobierno) se obtiene de las sumas
+  de las bases de cotización: las cuotas son lineales en la base, así que
+  basta acumular tres sumas por año de tarifa en lugar del desglose por fila.
+
+Uso (desde la carpeta del proyecto):
+    python -m pensiones.batch nomina.csv --summary resumen.json
+    python -m pensiones.aggregates merge total.json resumen_a.json resumen_b.json
+    python -m pensiones.aggregates show total.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.ss_1997 import PAYERS, SSRateSchedule, load_ss_1997_schedule
+from pensiones.core.tariffs import DEFAULT_YEAR, fill_years, load_tariff_registry
+from pensiones.utils.profiling import timed
+
+SUMMARY_FORMAT = 1
+# Bordes por omisión de los histogramas de tasas efectivas: puntos porcentuales de 0% a 50%.
+DEFAULT_RATE_EDGES = tuple(np.round(np.linspace(0.0, 0.5, 51), 4))
+DEFAULT_RELATIVE_ACCURACY = 0.005
+DEFAULT_QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+SUM_COLUMNS = ("isr", "ss_patron", "ss_trabajador", "ss_gobierno", "ss_total")
+RATE_COLUMNS = ("isr_eff", "ss_eff")
+
+def _num(x: float) -> Optional[float]:
+    # JSON no admite inf/nan
+    return float(x) if math.isfinite(x) else None
+
+def _unnum(x: Optional[float], default: float) -> float:
+    return default if x is None else float(x)
+
+class RunningSums:
+    """Conteo, suma, suma de cuadrados, mínimo y máximo por columna."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = tuple(columns)
+        k = len(self.columns)
+        self.count = 0
+        self.total = np.zeros(k)
+        self.total_sq = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, values: np.ndarray) -> None:
+        """``values`` de forma (filas, columnas) en el orden de ``columns``."""
+        x = np.asarray(values, dtype=float).reshape(-1, len(self.columns))
+        if not x.shape[0]:
+            return
+        self.count += x.shape[0]
+        self.total += x.sum(axis=0)
+        self.total_sq += np.einsum("ij,ij->j", x, x)
+        self.min = np.minimum(self.min, x.min(axis=0))
+        self.max = np.maximum(self.max, x.max(axis=0))
+
+    def merge(self, other: "RunningSums") -> "RunningSums":
+        if other.columns != self.columns:
+            raise ValueError(f"Columnas distintas: {self.columns} vs {other.columns}")
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        n = max(self.count, 1)
+        mean = self.total / n
+        var = np.maximum(self.total_sq / n - mean ** 2, 0.0)
+        empty = self.count == 0
+        return pd.DataFrame({
+            "columna": list(self.columns),
+            "n": self.count,
+            "total": self.total,
+            "media": np.nan if empty else mean,
+            "desv_est": np.nan if empty else np.sqrt(var),
+            "min": np.nan if empty else self.min,
+            "max": np.nan if empty else self.max,
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "columns": list(self.columns),
+            "count": self.count,
+            "total": self.total.tolist(),
+            "total_sq": self.total_sq.tolist(),
+            "min": [_num(v) for v in self.min],
+            "max": [_num(v) for v in self.max],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningSums":
+        out = cls(data["columns"])
+        out.count = int(data["count"])
+        out.total = np.asarray(data["total"], dtype=float)
+        out.total_sq = np.asarray(data["total_sq"], dtype=float)
+        out.min = np.array([_unnum(v, np.inf) for v in data["min"]])
+        out.max = np.array([_unnum(v, -np.inf) for v in data["max"]])
+        return out
+
+class FixedHistogram:
+    """Histograma con bordes fijos (el último intervalo incluye su borde derecho)
+    más conteos de valores por debajo / por encima del rango."""
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or self.edges.shape[0] < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("Los bordes del histograma deben ser crecientes (al menos 2).")
+        self.counts = np.zeros(self.edges.shape[0] - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values) -> None:
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        nb = self.counts.shape[0]
+        idx = np.searchsorted(self.edges, x, side="right") - 1
+        idx[x == self.edges[-1]] = nb - 1
+        self.underflow += int((idx < 0).sum())
+        self.overflow += int((idx >= nb).sum())
+        inside = idx[(idx >= 0) & (idx < nb)]
+        self.counts += np.bincount(inside, minlength=nb)
+
+    def merge(self, other: "FixedHistogram") -> "FixedHistogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Sólo se combinan histogramas con los mismos bordes.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def to_frame(self) -> pd.DataFrame:
+        lo = list(self.edges[:-1])
+        hi = list(self.edges[1:])
+        n = list(self.counts)
+        if self.underflow:
+            lo, hi, n = [-np.inf] + lo, [self.edges[0]] + hi, [self.underflow] + n
+        if self.overflow:
+            lo, hi, n = lo + [self.edges[-1]], hi + [np.inf], n + [self.overflow]
+        total = max(self.total, 1)
+        return pd.DataFrame({"desde": lo, "hasta": hi, "n": n, "proporcion": np.asarray(n, dtype=float) / total})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist(),
+                "underflow": self.underflow, "overflow": self.overflow}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FixedHistogram":
+        out = cls(data["edges"])
+        out.counts = np.asarray(data["counts"], dtype=np.int64)
+        out.underflow = int(data["underflow"])
+        out.overflow = int(data["overflow"])
+        return out
+
+class QuantileSketch:
+    """Sketch de cuantiles con error relativo acotado (cubetas logarítmicas, como DDSketch).
+
+    Un valor x > ``min_value`` cae en la cubeta k = ceil(log_gamma x) con
+    gamma = (1 + a) / (1 - a); el cuantil devuelto está a menos de ``a``
+    (``relative_accuracy``) del valor real en términos relativos. Valores
+    <= ``min_value`` (p.ej. tasa efectiva 0) se cuentan aparte como cero. Si hay
+    más de ``max_bins`` cubetas se juntan las más bajas (sólo pierden precisión
+    los cuantiles más pequeños). Sólo admite valores >= 0.
+    """
+    _NO_FLOOR = -(1 << 62)
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_bins: int = 2048, min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy debe estar entre 0 y 1.")
+        self.relative_accuracy = float(relative_accuracy)
+        self.max_bins = int(max_bins)
+        self.min_value = float(min_value)
+        self.gamma = (1.0 + self.relative_accuracy) / (1.0 - self.relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0  # llave de counts[0]
+        self.floor = self._NO_FLOOR  # llaves menores se juntaron en la primera cubeta
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _extend(self, lo: int, hi: int) -> None:
+        if not self.counts.shape[0]:
+            self.offset = lo
+            self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+        new_lo = min(lo, self.offset)
+        new_hi = max(hi, self.offset + self.counts.shape[0] - 1)
+        if new_lo == self.offset and new_hi - new_lo + 1 == self.counts.shape[0]:
+            return
+        counts = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+        start = self.offset - new_lo
+        counts[start:start + self.counts.shape[0]] = self.counts
+        self.counts, self.offset = counts, new_lo
+
+    def _raise_floor(self, floor: int) -> None:
+        if floor <= self.floor:
+            return
+        self.floor = floor
+        if not self.counts.shape[0] or floor <= self.offset:
+            return
+        self._extend(floor, floor)
+        k = floor - self.offset
+        self.counts[k] += self.counts[:k].sum()
+        self.counts = self.counts[k:].copy()
+        self.offset = floor
+
+    def _add_aligned(self, start: int, counts: np.ndarray) -> None:
+        """Suma ``counts`` a las llaves ``start``, ``start + 1``, ... (las menores al piso van a la primera cubeta)."""
+        keys_lo = max(start, self.floor)
+        if start < keys_lo:
+            k = min(keys_lo - start, counts.shape[0])
+            below = counts[:k].sum()
+            counts = counts[k:]
+            start = keys_lo
+            if not counts.shape[0]:
+                counts = np.array([below], dtype=np.int64)
+            else:
+                counts = counts.copy()
+                counts[0] += below
+        self._extend(start, start + counts.shape[0] - 1)
+        a = start - self.offset
+        self.counts[a:a + counts.shape[0]] += counts
+        if self.counts.shape[0] > self.max_bins:
+            self._raise_floor(self.offset + self.counts.shape[0] - self.max_bins)
+
+    def update(self, values) -> None:
+        x = np.asarray(values, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if not x.shape[0]:
+            return
+        if np.any(x < 0):
+            raise ValueError("QuantileSketch sólo admite valores >= 0.")
+        self.count += int(x.shape[0])
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        pos = x[x > self.min_value]
+        self.zero_count += int(x.shape[0] - pos.shape[0])
+        if pos.shape[0]:
+            keys = np.ceil(np.log(pos) / self._log_gamma).astype(np.int64)
+            lo = int(keys.min())
+            self._add_aligned(lo, np.bincount(keys - lo))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if (other.relative_accuracy, other.min_value) != (self.relative_accuracy, self.min_value):
+            raise ValueError("Sólo se combinan sketches con la misma precisión y min_value.")
+        self._raise_floor(other.floor)
+        self._add_aligned(other.offset, other.counts)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q) -> np.ndarray:
+        """Cuantiles ``q`` (escalar o arreglo en [0, 1]); NaN si no hay datos."""
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        rank = np.clip(q, 0.0, 1.0) * (self.count - 1)
+        cum = self.zero_count + np.cumsum(self.counts)
+        idx = np.minimum(np.searchsorted(cum, rank, side="right"), max(self.counts.shape[0] - 1, 0))
+        value = 2.0 * self.gamma ** (self.offset + idx) / (self.gamma + 1.0)
+        out = np.where(rank < self.zero_count, 0.0, value)
+        return np.clip(out, self.min, self.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy, "max_bins": self.max_bins, "min_value": self.min_value,
+            "count": self.count, "zero_count": self.zero_count, "min": _num(self.min), "max": _num(self.max),
+            "offset": self.offset, "floor": self.floor, "counts": self.counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        out = cls(data["relative_accuracy"], data["max_bins"], data["min_value"])
+        out.count = int(data["count"])
+        out.zero_count = int(data["zero_count"])
+        out.min = _unnum(data["min"], np.inf)
+        out.max = _unnum(data["max"], -np.inf)
+        out.offset = int(data["offset"])
+        out.floor = int(data["floor"])
+        out.counts = np.asarray(data["counts"], dtype=np.int64)
+        return out
+
+class GroupedSums:
+    """Conteo y sumas de columnas por llave entera (p.ej. tramo de ISR); crece según llegan llaves."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = tuple(columns)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, len(self.columns)))
+
+    def _grow(self, n: int) -> None:
+        if n > self.counts.shape[0]:
+            extra = n - self.counts.shape[0]
+            self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+            self.sums = np.concatenate([self.sums, np.zeros((extra, len(self.columns)))])
+
+    def update(self, keys, values: np.ndarray) -> None:
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        if not keys.shape[0]:
+            return
+        if keys.min() < 0:
+            raise ValueError("Las llaves de GroupedSums deben ser >= 0.")
+        values = np.asarray(values, dtype=float).reshape(keys.shape[0], len(self.columns))
+        n = int(keys.max()) + 1
+        self._grow(n)
+        self.counts[:n] += np.bincount(keys, minlength=n)
+        for j in range(len(self.columns)):
+            self.sums[:n, j] += np.bincount(keys, weights=values[:, j], minlength=n)
+
+    def merge(self, other: "GroupedSums") -> "GroupedSums":
+        if other.columns != self.columns:
+            raise ValueError(f"Columnas distintas: {self.columns} vs {other.columns}")
+        n = other.counts.shape[0]
+        self._grow(n)
+        self.counts[:n] += other.counts
+        self.sums[:n] += other.sums
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"columns": list(self.columns), "counts": self.counts.tolist(), "sums": self.sums.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GroupedSums":
+        out = cls(data["columns"])
+        out.counts = np.asarray(data["counts"], dtype=np.int64)
+        out.sums = np.asarray(data["sums"], dtype=float).reshape(-1, len(out.columns))
+        return out
+
+def _insurance_costs(schedule: SSRateSchedule, base_sums: np.ndarray) -> Dict[str, np.ndarray]:
+    """Costo por seguro y aportante a partir de las sumas de base mensual por tipo de base."""
+    component = base_sums[schedule.base_kind][:, None] * schedule.rates  # (componentes, aportantes)
+    out: Dict[str, np.ndarray] = {}
+    for name, row in zip(schedule.insurance, component):
+        out[name] = out.get(name, 0.0) + row
+    return out
+
+class PopulationSummary:
+    """Resumen de población de ISR / cuotas SS en memoria constante.
+
+    - ``sums``: totales, medias y extremos del sueldo, ISR y cuotas por aportante.
+    - ``by_insurance``: costo patrón / trabajador / gobierno por seguro.
+    - ``histograms`` y ``sketches``: distribución de ``isr_eff`` y ``ss_eff``
+      (y cuantiles del sueldo).
+    - ``brackets``: trabajadores, ISR y sueldo por tramo de la tarifa ISR.
+
+    La configuración (``config()``) debe coincidir con la de ``compute_chunk``
+    para que el costo por seguro use los mismos días / años de tarifa.
+    """
+
+    def __init__(
+        self,
+        salary_col: str = "salary_monthly",
+        days_col: str = "days",
+        default_days: int = 30,
+        year_col: str = "year",
+        default_year: int = DEFAULT_YEAR,
+        rate_edges: Sequence[float] = DEFAULT_RATE_EDGES,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+    ):
+        self.salary_col = salary_col
+        self.days_col = days_col
+        self.default_days = int(default_days)
+        self.year_col = year_col
+        self.default_year = int(default_year)
+        self.rate_edges = tuple(float(e) for e in rate_edges)
+        self.relative_accuracy = float(relative_accuracy)
+
+        self.sums = RunningSums((salary_col,) + SUM_COLUMNS)
+        self.by_insurance: Dict[str, np.ndarray] = {}
+        self.histograms = {c: FixedHistogram(self.rate_edges) for c in RATE_COLUMNS}
+        self.sketches = {c: QuantileSketch(self.relative_accuracy) for c in RATE_COLUMNS + (salary_col,)}
+        self.brackets = GroupedSums(("isr", salary_col))
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "salary_col": self.salary_col, "days_col": self.days_col, "default_days": self.default_days,
+            "year_col": self.year_col, "default_year": self.default_year, "rate_edges": list(self.rate_edges),
+            "relative_accuracy": self.relative_accuracy,
+        }
+
+    @property
+    def count(self) -> int:
+        return self.sums.count
+
+    def _update_insurance(self, df: pd.DataFrame) -> None:
+        sbc = df["sbc_daily_capped"].to_numpy(dtype=float)
+        if self.days_col in df.columns:
+            days = df[self.days_col].to_numpy(dtype=float)
+        else:
+            days = np.full(sbc.shape, float(self.default_days))
+
+        if self.year_col in df.columns:
+            registry = load_tariff_registry()
+            row = registry.year_index(fill_years(df[self.year_col].to_numpy(), self.default_year))
+            groups = [(registry.ss_schedules[int(r)], row == r, float(registry.uma_daily[int(r)])) for r in np.unique(row)]
+        else:
+            schedule = load_ss_1997_schedule()
+            groups = [(schedule, None, schedule.uma_daily)]
+
+        for schedule, mask, uma in groups:
+            s, d = (sbc, days) if mask is None else (sbc[mask], days[mask])
+            # sumas de base mensual por tipo (mismo orden que BASE_KINDS)
+            base_sums = np.array([
+                s @ d,
+                uma * d.sum(),
+                np.maximum(0.0, s - 3.0 * uma) @ d,
+            ])
+            for name, cost in _insurance_costs(schedule, base_sums).items():
+                self.by_insurance[name] = self.by_insurance.get(name, 0.0) + cost
+
+    @timed()
+    def update(self, df: pd.DataFrame) -> "PopulationSummary":
+        """Agrega un bloque de resultados de ``batch.compute_chunk``."""
+        missing = [c for c in (self.salary_col, "sbc_daily_capped", "isr_bracket") + SUM_COLUMNS + RATE_COLUMNS
+                   if c not in df.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas de resultados para el resumen: {missing}")
+        if not len(df):
+            return self
+        salary = df[self.salary_col].to_numpy(dtype=float)
+        self.sums.update(df[list(self.sums.columns)].to_numpy(dtype=float))
+        for c in RATE_COLUMNS:
+            rate = df[c].to_numpy(dtype=float)
+            self.histograms[c].update(rate)
+            self.sketches[c].update(rate)
+        self.sketches[self.salary_col].update(salary)
+        isr = df["isr"].to_numpy(dtype=float)
+        self.brackets.update(df["isr_bracket"].to_numpy(), np.column_stack([isr, salary]))
+        self._update_insurance(df)
+        return self
+
+    def merge(self, other: "PopulationSummary") -> "PopulationSummary":
+        """Combina ``other`` en este resumen (misma configuración)."""
+        if other.config() != self.config():
+            raise ValueError("Sólo se combinan resúmenes con la misma configuración.")
+        self.sums.merge(other.sums)
+        for name, cost in other.by_insurance.items():
+            self.by_insurance[name] = self.by_insurance.get(name, 0.0) + cost
+        for c in self.histograms:
+            self.histograms[c].merge(other.histograms[c])
+        for c in self.sketches:
+            self.sketches[c].merge(other.sketches[c])
+        self.brackets.merge(other.brackets)
+        return self
+
+    # --- tablas para reportes ---
+
+    def totals_frame(self) -> pd.DataFrame:
+        return self.sums.to_frame()
+
+    def insurance_frame(self) -> pd.DataFrame:
+        """Costo mensual total por seguro y aportante (columnas como el desglose de la página I)."""
+        names = list(self.by_insurance)
+        amounts = np.array([self.by_insurance[n] for n in names]).reshape(-1, len(PAYERS))
+        df = pd.DataFrame(amounts, columns=list(PAYERS))
+        df.insert(0, "Seguro", names)
+        df["Total"] = amounts.sum(axis=1)
+        return df
+
+    def histogram_frame(self, column: str) -> pd.DataFrame:
+        return self.histograms[column].to_frame()
+
+    def quantiles_frame(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        df = pd.DataFrame({"cuantil": list(quantiles)})
+        for c, sketch in self.sketches.items():
+            df[c] = sketch.quantile(quantiles)
+        return df
+
+    def brackets_frame(self) -> pd.DataFrame:
+        counts = self.brackets.counts
+        n = np.maximum(counts, 1)
+        return pd.DataFrame({
+            "tramo": np.arange(counts.shape[0]),
+            "n": counts,
+            "proporcion": counts / max(int(counts.sum()), 1),
+            "isr_total": self.brackets.sums[:, 0],
+            "isr_medio": np.where(counts > 0, self.brackets.sums[:, 0] / n, np.nan),
+            "sueldo_medio": np.where(counts > 0, self.brackets.sums[:, 1] / n, np.nan),
+        })
+
+    def report(self) -> str:
+        parts = [
+            f"Trabajadores: {self.count:,}",
+            self.totals_frame().to_string(index=False),
+            "",
+            "Costo mensual por seguro:",
+            self.insurance_frame().to_string(index=False),
+            "",
+            "Cuantiles:",
+            self.quantiles_frame().to_string(index=False),
+            "",
+            "Tramos ISR:",
+            self.brackets_frame().query("n > 0").to_string(index=False),
+        ]
+        return "\n".join(parts)
+
+    # --- serialización ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": SUMMARY_FORMAT,
+            "config": self.config(),
+            "sums": self.sums.to_dict(),
+            "by_insurance": {k: np.asarray(v).tolist() for k, v in self.by_insurance.items()},
+            "histograms": {k: h.to_dict() for k, h in self.histograms.items()},
+            "sketches": {k: s.to_dict() for k, s in self.sketches.items()},
+            "brackets": self.brackets.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PopulationSummary":
+        if data.get("format") != SUMMARY_FORMAT:
+            raise ValueError(f"Formato de resumen no soportado: {data.get('format')!r}")
+        out = cls(**data["config"])
+        out.sums = RunningSums.from_dict(data["sums"])
+        out.by_insurance = {k: np.asarray(v, dtype=float) for k, v in data["by_insurance"].items()}
+        out.histograms = {k: FixedHistogram.from_dict(v) for k, v in data["histograms"].items()}
+        out.sketches = {k: QuantileSketch.from_dict(v) for k, v in data["sketches"].items()}
+        out.brackets = GroupedSums.from_dict(data["brackets"])
+        return out
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+def load_summary(path: str | Path) -> PopulationSummary:
+    return PopulationSummary.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+def merge_summaries(summaries: Iterable[PopulationSummary]) -> PopulationSummary:
+    """Combina resúmenes (p.ej. uno por shard) en uno nuevo; no modifica los de entrada."""
+    merged: Optional[PopulationSummary] = None
+    for s in summaries:
+        if merged is None:
+            merged = PopulationSummary(**s.config())
+        merged.merge(s)
+    if merged is None:
+        raise ValueError("No hay resúmenes que combinar.")
+    return merged
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pensiones.aggregates")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_merge = sub.add_parser("merge", help="combina resúmenes JSON en uno")
+    p_merge.add_argument("output")
+    p_merge.add_argument("inputs", nargs="+")
+    p_show = sub.add_parser("show", help="imprime las tablas de un resumen")
+    p_show.add_argument("input")
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        merged = merge_summaries(load_summary(p) for p in args.inputs)
+        merged.save(args.output)
+        print(f"{len(args.inputs)} resúmenes, {merged.count:,} trabajadores -> {args.output}", file=sys.stderr)
+        return 0
+    print(load_summary(args.input).report())
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
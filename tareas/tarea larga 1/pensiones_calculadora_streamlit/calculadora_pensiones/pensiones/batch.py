@@ -0,0 +1,335 @@
+"""Corrida por lotes (sin Streamlit): ISR + SS + tasas efectivas por trabajador.
+
+Lee un CSV/Parquet de nómina por bloques, calcula con las funciones vectorizadas
+de ``pensiones.core`` y escribe cada bloque al archivo de salida en cuanto está
+listo, así la memoria depende del tamaño del bloque y no del archivo.
+
+Uso:
+    python -m pensiones.batch nomina.csv resultados.csv
+    python -m pensiones.batch nomina.parquet resultados.parquet --chunksize 500000
+    python -m pensiones.batch nomina.csv resultados.csv --workers 8 --pensions
+    python -m pensiones.batch nomina.csv --summary resumen.json --workers 8
+
+Columnas de entrada (configurables): ``salary_monthly``, ``sbc_daily`` y,
+opcional, ``days`` (si falta se usa ``--days``). Con ``--pensions`` se agregan
+RR LSS 1997 y el barrido LSS 1973 60–65 (columnas ``age_now`` y, opcional,
+``voluntary_rate``).
+
+Con ``--summary`` cada bloque se resume en su worker (``pensiones.aggregates``:
+totales, costo por seguro, histogramas/cuantiles de tasas efectivas y tramos
+ISR) y el proceso principal combina los resúmenes; sin archivo de salida las
+filas ni siquiera regresan al proceso principal.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pensiones.aggregates import PopulationSummary
+from pensiones.core.isr_2026 import isr_monthly_batch
+from pensiones.core.lss1973_ret import pension_lss1973_batch
+from pensiones.core.lss1997_ret import replacement_rate_lss1997_batch
+from pensiones.core.ss_1997 import ss_contributions_batch, effective_rates_batch
+from pensiones.core.tariffs import DEFAULT_YEAR, fill_years, isr_monthly_by_year, ss_contributions_by_year
+from pensiones.parallel import default_workers, map_ordered
+from pensiones.utils import profiling
+
+DEFAULT_CHUNKSIZE = 200_000
+
+RESULT_COLUMNS = [
+    "isr", "isr_bracket", "sbc_daily_capped",
+    "ss_patron", "ss_trabajador", "ss_gobierno", "ss_total",
+    "isr_eff", "ss_eff",
+]
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover - depende del entorno
+        raise ImportError("Para leer/escribir Parquet instala pyarrow: pip install pyarrow") from e
+    return pq
+
+def iter_chunks(path: Any, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Itera el archivo de nómina en bloques de ``chunksize`` filas.
+
+    ``path`` también puede ser un archivo abierto con atributo ``name`` (p.ej.
+    un archivo subido en Streamlit); el formato se decide por la extensión."""
+    if _is_parquet(Path(getattr(path, "name", path))):
+        pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def compute_chunk(
+    df: pd.DataFrame,
+    salary_col: str = "salary_monthly",
+    sbc_col: str = "sbc_daily",
+    days_col: str = "days",
+    default_days: int = 30,
+    year_col: str = "year",
+    default_year: int = DEFAULT_YEAR
+) -> pd.DataFrame:
+    """ISR, cuotas SS (totales por aportante) y tasas efectivas para un bloque.
+
+    Si el bloque trae la columna ``year_col`` cada fila usa la tarifa ISR y la
+    UMA/tasas SS vigentes en su año (``pensiones.core.tariffs``); si no, las 2026.
+    Los años vacíos usan ``default_year`` (y así quedan en la salida).
+    Devuelve el bloque de entrada con las columnas de RESULT_COLUMNS agregadas.
+    """
+    missing = [c for c in (salary_col, sbc_col) if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo de nómina: {missing}")
+
+    salary = df[salary_col].to_numpy(dtype=float)
+    sbc_daily = df[sbc_col].to_numpy(dtype=float)
+    if days_col in df.columns:
+        days = df[days_col].to_numpy(dtype=float)
+    else:
+        days = np.full(len(df), float(default_days))
+
+    if year_col in df.columns:
+        years = fill_years(df[year_col].to_numpy(), default_year)
+        isr = isr_monthly_by_year(salary, years)
+        ss = ss_contributions_by_year(sbc_daily, years, days)
+    else:
+        isr = isr_monthly_batch(salary)
+        ss = ss_contributions_batch(sbc_daily, days)
+
+    # misma base que la página I: SBC mensual, o el sueldo si no hay SBC
+    sbc_monthly = sbc_daily * days
+    eff = effective_rates_batch(
+        sbc_monthly=np.where(sbc_monthly > 0, sbc_monthly, salary),
+        isr_monthly=isr["isr"],
+        ss_total_monthly=ss["Total"],
+    )
+
+    out = df.copy()
+    if year_col in df.columns:
+        out[year_col] = years
+    out["isr"] = isr["isr"]
+    out["isr_bracket"] = isr["bracket"]
+    out["sbc_daily_capped"] = ss["sbc_daily_capped"]
+    out["ss_patron"] = ss["Patron"]
+    out["ss_trabajador"] = ss["Trabajador"]
+    out["ss_gobierno"] = ss["Gobierno"]
+    out["ss_total"] = ss["Total"]
+    out["isr_eff"] = eff["isr_eff"]
+    out["ss_eff"] = eff["ss_eff"]
+    return out
+
+def compute_population_chunk(
+    df: pd.DataFrame,
+    salary_col: str = "salary_monthly",
+    age_col: str = "age_now",
+    voluntary_col: str = "voluntary_rate",
+    weeks_col: str = "weeks_now",
+    min_age: int = 60,
+    max_age: int = 65,
+    **chunk_kwargs: Any
+) -> pd.DataFrame:
+    """``compute_chunk`` + RR LSS 1997 y RR/pensión LSS 1973 por edad de retiro.
+
+    Si existen, se usan las columnas ``weeks_col``, ``has_spouse``, ``n_children``
+    y ``n_parents`` para la LSS 1973 (si no, los supuestos por omisión)."""
+    if age_col not in df.columns:
+        raise ValueError(f"Falta la columna '{age_col}' para el cálculo de pensiones.")
+
+    out = compute_chunk(df, salary_col=salary_col, **chunk_kwargs)
+    salary = df[salary_col].to_numpy(dtype=float)
+    age_now = df[age_col].to_numpy(dtype=float)
+    vol = df[voluntary_col].to_numpy(dtype=float) if voluntary_col in df.columns else 0.0
+
+    rr97 = replacement_rate_lss1997_batch(age_now, salary, vol)
+    out["rr_lss1997"] = rr97["replacement_rate"]
+    out["pension_lss1997"] = rr97["pension_monthly"]
+
+    ages = np.arange(min_age, max_age + 1)
+    worker = {
+        key: df[col].to_numpy(dtype=float)[:, None]
+        for key, col in (("weeks_now", weeks_col), ("has_spouse", "has_spouse"),
+                         ("n_children", "n_children"), ("n_parents", "n_parents"))
+        if col in df.columns
+    }
+    rr73 = pension_lss1973_batch(age_now[:, None], ages[None, :], salary[:, None], **worker)
+    for j, ra in enumerate(ages):
+        out[f"rr_lss1973_{ra}"] = rr73["replacement_rate"][:, j]
+        out[f"pension_lss1973_{ra}"] = rr73["pension_monthly"][:, j]
+    return out
+
+class ChunkWriter:
+    """Escribe bloques consecutivos a CSV (append) o Parquet (row groups)."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._parquet = _is_parquet(self.path)
+        self._writer = None
+        self._first = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._parquet:
+            import pyarrow as pa
+            pq = _require_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def summarize_chunk(
+    df: pd.DataFrame,
+    func: Callable[[pd.DataFrame], pd.DataFrame],
+    summary_config: Dict[str, Any],
+    keep_rows: bool = True
+) -> Tuple[Optional[pd.DataFrame], PopulationSummary]:
+    """``func(df)`` más su resumen parcial (corre dentro del worker).
+
+    Con ``keep_rows=False`` sólo regresa el resumen (no viajan las filas)."""
+    result = func(df)
+    summary = PopulationSummary(**summary_config).update(result)
+    return (result if keep_rows else None), summary
+
+def summary_config(**chunk_kwargs: Any) -> Dict[str, Any]:
+    """Configuración de ``PopulationSummary`` coherente con los kwargs de ``compute_chunk``."""
+    keys = ("salary_col", "days_col", "default_days", "year_col", "default_year")
+    return PopulationSummary(**{k: chunk_kwargs[k] for k in keys if k in chunk_kwargs}).config()
+
+def run_batch(
+    input_path: str | Path,
+    output_path: Optional[str | Path],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: bool = True,
+    workers: int = 1,
+    pensions: bool = False,
+    summary: Optional[PopulationSummary] = None,
+    **chunk_kwargs: Any
+) -> Dict[str, float]:
+    """Procesa ``input_path`` bloque por bloque y escribe a ``output_path``.
+
+    Con ``workers > 1`` los bloques se evalúan en procesos (ver
+    ``pensiones.parallel.map_ordered``) y se escriben en el orden de entrada.
+    Si se pasa ``summary`` (un ``PopulationSummary`` vacío o con datos previos),
+    cada bloque se resume donde se calcula y se combina en él; ``output_path``
+    puede ser ``None`` si sólo interesa el resumen.
+    Devuelve filas, bloques, segundos y filas/segundo.
+    """
+    if output_path is None and summary is None:
+        raise ValueError("Indica un archivo de salida, un resumen o ambos.")
+    func = functools.partial(compute_population_chunk if pensions else compute_chunk, **chunk_kwargs)
+    if summary is not None:
+        func = functools.partial(summarize_chunk, func=func, summary_config=summary.config(),
+                                 keep_rows=output_path is not None)
+    t0 = time.perf_counter()
+    rows = 0
+    chunks = 0
+    writer = ChunkWriter(output_path) if output_path is not None else None
+    try:
+        for result in map_ordered(func, iter_chunks(input_path, chunksize), workers=workers):
+            if summary is not None:
+                result, partial = result
+                summary.merge(partial)
+                rows += partial.count
+            else:
+                rows += len(result)
+            if writer is not None:
+                writer.write(result)
+            chunks += 1
+            if progress:
+                elapsed = time.perf_counter() - t0
+                print(f"  bloque {chunks}: {rows:,} filas ({rows / elapsed:,.0f} filas/s)", file=sys.stderr)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    seconds = time.perf_counter() - t0
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pensiones.batch",
+        description="ISR 2026 + cuotas SS + tasas efectivas para un archivo de nómina (CSV/Parquet).",
+    )
+    parser.add_argument("input", help="archivo de entrada (.csv o .parquet)")
+    parser.add_argument("output", nargs="?", help="archivo de salida (.csv o .parquet); opcional con --summary")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="filas por bloque")
+    parser.add_argument("--salary-col", default="salary_monthly")
+    parser.add_argument("--sbc-col", default="sbc_daily")
+    parser.add_argument("--days-col", default="days")
+    parser.add_argument("--days", type=int, default=30, help="días del mes si no viene la columna")
+    parser.add_argument("--year-col", default="year", help="año fiscal por fila (opcional; sin ella se usa 2026)")
+    parser.add_argument("--default-year", type=int, default=DEFAULT_YEAR, help="año para filas con el año vacío")
+    parser.add_argument("--workers", type=int, default=1, help="procesos en paralelo (0 = todos los CPUs)")
+    parser.add_argument("--pensions", action="store_true", help="agregar RR LSS 1997 y LSS 1973 (60–65)")
+    parser.add_argument("--summary", default=None, help="guardar un resumen agregado (JSON, ver pensiones.aggregates)")
+    parser.add_argument("--quiet", action="store_true", help="no mostrar avance por bloque")
+    args = parser.parse_args(argv)
+    if args.output is None and args.summary is None:
+        parser.error("indica un archivo de salida y/o --summary")
+
+    chunk_kwargs = dict(
+        salary_col=args.salary_col,
+        sbc_col=args.sbc_col,
+        days_col=args.days_col,
+        default_days=args.days,
+        year_col=args.year_col,
+        default_year=args.default_year,
+    )
+    summary = PopulationSummary(**summary_config(**chunk_kwargs)) if args.summary else None
+
+    # PENSIONES_CPROFILE=archivo.pstats perfila la corrida (sólo el proceso principal)
+    with profiling.cprofile_from_env():
+        stats = run_batch(
+            args.input,
+            args.output,
+            chunksize=args.chunksize,
+            progress=not args.quiet,
+            workers=args.workers or default_workers(),
+            pensions=args.pensions,
+            summary=summary,
+            **chunk_kwargs,
+        )
+    targets = " y ".join(p for p in (args.output, args.summary) if p)
+    print(
+        f"{stats['rows']:,} filas en {stats['chunks']} bloques, "
+        f"{stats['seconds']:.2f} s ({stats['rows_per_sec']:,.0f} filas/s) -> {targets}",
+        file=sys.stderr,
+    )
+    if summary is not None:
+        summary.save(args.summary)
+        print(summary.report(), file=sys.stderr)
+    if profiling.is_enabled():
+        print(profiling.GLOBAL.report(), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
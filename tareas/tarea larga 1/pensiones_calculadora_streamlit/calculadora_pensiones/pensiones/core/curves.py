@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.isr_2026 import isr_monthly_batch
+from pensiones.core.ss_1997 import ss_contributions_batch
+from pensiones.utils.io import file_version
+from pensiones.utils.profiling import timed
+
+ISR_TABLE = "isr_2026_tarifa.json"
+SS_TABLE = "ss_1997_rates.json"
+
+# Puntos guardados en memoria por proceso, sumando todas las curvas (versión de
+# tablas, días, paso); cada punto ocupa 24 bytes (k, ISR, SS), ~24 MB en total.
+STORE_MAX_POINTS = 1_000_000
+
+@dataclass(frozen=True, eq=False)
+class EffectiveRateCurve:
+    """ISR y cuotas SS mensuales evaluadas sobre una malla de ingresos.
+
+    ``version`` identifica las tablas usadas (huella de la tarifa ISR y de las
+    tasas SS); el SBC de cada punto se toma como ingreso mensual / días.
+    """
+    version: Tuple[str, str]
+    days_in_month: int
+    step: float
+    incomes: np.ndarray
+    isr: np.ndarray
+    ss_total: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.incomes.shape[0])
+
+    @property
+    def isr_eff(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.incomes > 0, self.isr / self.incomes, 0.0)
+
+    @property
+    def ss_eff(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.incomes > 0, self.ss_total / self.incomes, 0.0)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Ingreso_mensual": self.incomes,
+            "ISR": self.isr,
+            "SS_total": self.ss_total,
+            "ISR_eff": self.isr_eff,
+            "SS_eff": self.ss_eff,
+        })
+
+class _Points:
+    """Puntos ya calculados de una curva: ingreso = k * paso, k ordenado."""
+    __slots__ = ("k", "isr", "ss_total")
+
+    def __init__(self, k: np.ndarray, isr: np.ndarray, ss_total: np.ndarray) -> None:
+        self.k = k
+        self.isr = isr
+        self.ss_total = ss_total
+
+    def __len__(self) -> int:
+        return int(self.k.shape[0])
+
+_EMPTY = _Points(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+
+_lock = threading.Lock()
+_store: "OrderedDict[Tuple[str, str, int, float], _Points]" = OrderedDict()
+_stats = {"computed": 0, "reused": 0, "points": 0}
+
+def nice_step(span: float, n_points: int) -> float:
+    """Paso "redondo" (1, 2, 2.5 o 5 × 10^k) más cercano a ``span / (n_points - 1)``.
+
+    Al anclar la malla en múltiplos de un paso redondo, dos rangos distintos con
+    densidad parecida comparten puntos y sólo se calculan los nuevos.
+    """
+    raw = float(span) / max(int(n_points) - 1, 1)
+    if raw <= 0:
+        raise ValueError("El rango de ingresos debe tener longitud positiva.")
+    scale = 10.0 ** math.floor(math.log10(raw))
+    candidates = scale * np.array([1.0, 2.0, 2.5, 5.0, 10.0])
+    return float(candidates[np.argmin(np.abs(np.log(candidates / raw)))])
+
+def _evaluate(incomes: np.ndarray, days_in_month: int) -> Tuple[np.ndarray, np.ndarray]:
+    isr = isr_monthly_batch(incomes)["isr"]
+    ss_total = ss_contributions_batch(incomes / days_in_month, days_in_month=days_in_month)["Total"]
+    return isr, ss_total
+
+def _merge(pts: _Points, k: np.ndarray, isr: np.ndarray, ss_total: np.ndarray) -> _Points:
+    all_k = np.concatenate([pts.k, k])
+    all_k, first = np.unique(all_k, return_index=True)
+    return _Points(
+        all_k,
+        np.concatenate([pts.isr, isr])[first],
+        np.concatenate([pts.ss_total, ss_total])[first],
+    )
+
+@timed()
+def effective_rate_curve(
+    income_min: float,
+    income_max: float,
+    n_points: int = 40,
+    days_in_month: int = 30
+) -> EffectiveRateCurve:
+    """Curva de ISR y SS por ingreso mensual en [income_min, income_max].
+
+    La malla son los múltiplos de ``nice_step(rango, n_points)`` dentro del rango
+    más los dos extremos. Los puntos de la malla se guardan por (versión de
+    tarifa ISR, versión de tasas SS, días, paso): si se amplía el rango o se
+    vuelve a pedir la misma curva, sólo se evalúan los ingresos que faltan.
+    """
+    income_min = float(income_min)
+    income_max = float(income_max)
+    days_in_month = int(days_in_month)
+    if income_min < 0:
+        raise ValueError("El ingreso mínimo no puede ser negativo.")
+    if income_max <= income_min:
+        raise ValueError("El ingreso máximo debe ser mayor que el mínimo.")
+    if days_in_month <= 0:
+        raise ValueError("Los días del mes deben ser positivos.")
+
+    step = nice_step(income_max - income_min, n_points)
+    k = np.arange(
+        math.ceil(income_min / step - 1e-9),
+        math.floor(income_max / step + 1e-9) + 1,
+        dtype=np.int64,
+    )
+    version = (file_version(ISR_TABLE), file_version(SS_TABLE))
+    key = (version[0], version[1], days_in_month, step)
+
+    with _lock:
+        pts = _store.get(key, _EMPTY)
+        if key in _store:
+            _store.move_to_end(key)
+
+    missing = np.setdiff1d(k, pts.k, assume_unique=True)
+    if missing.size:
+        isr_new, ss_new = _evaluate(missing * step, days_in_month)
+        with _lock:
+            # otro hilo pudo haber agregado puntos mientras calculábamos
+            old = _store.get(key, _EMPTY)
+            pts = _merge(old, missing, isr_new, ss_new)
+            _store[key] = pts
+            _store.move_to_end(key)
+            _stats["points"] += len(pts) - len(old)
+            # LRU por puntos; una curva desalojada sigue disponible en ``pts``
+            while _stats["points"] > STORE_MAX_POINTS and _store:
+                _stats["points"] -= len(_store.popitem(last=False)[1])
+    with _lock:
+        _stats["computed"] += int(missing.size)
+        _stats["reused"] += int(k.size - missing.size)
+
+    pos = np.searchsorted(pts.k, k)
+    incomes = k * step
+    isr = pts.isr[pos]
+    ss_total = pts.ss_total[pos]
+
+    # extremos fuera de la malla: se evalúan aparte y no se guardan
+    edges = [x for x in (income_min, income_max) if not np.any(np.isclose(incomes, x, rtol=0.0, atol=1e-6))]
+    if edges:
+        edge_inc = np.array(edges)
+        edge_isr, edge_ss = _evaluate(edge_inc, days_in_month)
+        incomes = np.concatenate([incomes, edge_inc])
+        order = np.argsort(incomes, kind="stable")
+        incomes = incomes[order]
+        isr = np.concatenate([isr, edge_isr])[order]
+        ss_total = np.concatenate([ss_total, edge_ss])[order]
+
+    return EffectiveRateCurve(
+        version=version,
+        days_in_month=days_in_month,
+        step=step,
+        incomes=incomes,
+        isr=isr,
+        ss_total=ss_total,
+    )
+
+def curve_cache_info() -> Dict[str, int]:
+    """Puntos evaluados vs. reutilizados y curvas guardadas en memoria."""
+    with _lock:
+        return {**_stats, "curves": len(_store)}
+
+def curve_cache_clear() -> None:
+    with _lock:
+        _store.clear()
+        for k in _stats:
+            _stats[k] = 0
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.lss1973_ret import pension_lss1973_batch
+from pensiones.core.lss1997_ret import replacement_rate_lss1997_batch
+from pensiones.utils.profiling import timed
+
+@dataclass(frozen=True, eq=False)
+class GridResult:
+    """Resultados sobre el producto cartesiano de ``axes``.
+
+    Cada arreglo de ``values`` tiene forma ``shape`` (una dimensión por eje, en
+    el orden de ``axes``).
+    """
+    axes: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray]
+
+    @property
+    def dims(self) -> Tuple[str, ...]:
+        return tuple(self.axes)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(a) for a in self.axes.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Formato largo: una fila por combinación, columnas = ejes + valores."""
+        coords = np.meshgrid(*self.axes.values(), indexing="ij")
+        data = {name: c.ravel() for name, c in zip(self.axes, coords)}
+        data.update({name: np.broadcast_to(v, self.shape).ravel() for name, v in self.values.items()})
+        return pd.DataFrame(data)
+
+def _axis(values) -> np.ndarray:
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+def _expand(axes: Sequence[np.ndarray]) -> Tuple[np.ndarray, ...]:
+    # cada eje en su propia dimensión para que el broadcasting arme el producto cartesiano
+    n = len(axes)
+    return tuple(a.reshape((1,) * i + (-1,) + (1,) * (n - i - 1)) for i, a in enumerate(axes))
+
+@timed()
+def grid_lss1997(
+    voluntary_rate,
+    retirement_age,
+    salary_monthly,
+    age_now,
+    assumptions: Optional[Dict[str, Any]] = None,
+    balance_now: float = 0.0
+) -> GridResult:
+    """RR / pensión / saldo LSS 1997 sobre voluntaria × edad de retiro × salario × edad actual.
+
+    Como la RR es afín en la tasa voluntaria, la proyección se corre una sola vez
+    por (edad de retiro, salario, edad actual) y el eje voluntario sale de
+    ``rr(0) + v * rr_per_voluntary``.
+    """
+    vol = _axis(voluntary_rate)
+    ret, sal, age = _axis(retirement_age), _axis(salary_monthly), _axis(age_now)
+    ret_x, sal_x, age_x = _expand([ret, sal, age])
+
+    base = replacement_rate_lss1997_batch(
+        age_x, sal_x, 0.0, assumptions, retirement_age=ret_x, balance_now=balance_now
+    )
+    slope_rr = base["rr_per_voluntary"]
+    slope_pension = slope_rr * base["final_salary"]
+    slope_balance = slope_pension * base["annuity_factor"]
+
+    v = vol.reshape(-1, 1, 1, 1)
+    values = {
+        "replacement_rate": base["replacement_rate"][None] + v * slope_rr[None],
+        "pension_monthly": base["pension_monthly"][None] + v * slope_pension[None],
+        "balance": base["balance"][None] + v * slope_balance[None],
+    }
+    axes = {"voluntary_rate": vol, "retirement_age": ret, "salary_monthly": sal, "age_now": age}
+    return GridResult(axes=axes, values=values)
+
+@timed()
+def grid_lss1973(
+    retirement_age,
+    salary_monthly,
+    age_now,
+    assumptions: Optional[Dict[str, Any]] = None
+) -> GridResult:
+    """RR / pensión LSS 1973 sobre edad de retiro × salario × edad actual."""
+    ret, sal, age = _axis(retirement_age), _axis(salary_monthly), _axis(age_now)
+    ret_x, sal_x, age_x = _expand([ret, sal, age])
+
+    out = pension_lss1973_batch(age_x, ret_x, sal_x, assumptions)
+    values = {k: out[k] for k in ("replacement_rate", "pension_monthly")}
+    axes = {"retirement_age": ret, "salary_monthly": sal, "age_now": age}
+    return GridResult(axes=axes, values=values)
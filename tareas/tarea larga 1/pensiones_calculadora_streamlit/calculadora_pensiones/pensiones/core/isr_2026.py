@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union
 
-from pensiones.utils.io import load_json
+import numpy as np
+
+from pensiones.utils.io import load_parsed
+from pensiones.utils.profiling import timed
 
 @dataclass(frozen=True)
 class ISRTariffBracket:
@@ -12,8 +15,18 @@ class ISRTariffBracket:
     fixed_quota: float
     rate: float  # tasa marginal (p.ej. 0.1792)
 
-def load_isr_2026_tariff() -> List[ISRTariffBracket]:
-    data = load_json("isr_2026_tarifa.json")
+@dataclass(frozen=True, eq=False)
+class ISRTariffArrays:
+    """Tarifa ISR en forma columnar (un arreglo por campo) para búsqueda vectorizada."""
+    lower: np.ndarray
+    upper: np.ndarray  # np.inf = sin límite superior
+    fixed_quota: np.ndarray
+    rate: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.lower.shape[0])
+
+def _parse_isr_tariff(data: Dict[str, Any]) -> Tuple[ISRTariffBracket, ...]:
     brackets = []
     for b in data.get("brackets", []):
         brackets.append(ISRTariffBracket(
@@ -24,9 +37,190 @@ def load_isr_2026_tariff() -> List[ISRTariffBracket]:
         ))
     if not brackets:
         raise ValueError("La tarifa ISR está vacía. Rellena pensiones/data/isr_2026_tarifa.json")
-    return brackets
+    return tuple(brackets)
+
+def _parse_isr_tariff_arrays(data: Dict[str, Any]) -> ISRTariffArrays:
+    return compile_isr_tariff(_parse_isr_tariff(data))
+
+def load_isr_2026_tariff() -> List[ISRTariffBracket]:
+    return list(load_parsed("isr_2026_tarifa.json", _parse_isr_tariff))
+
+def load_isr_2026_arrays() -> ISRTariffArrays:
+    """Tarifa 2026 ya compilada; se parsea una vez por proceso (ver ``load_parsed``)."""
+    return load_parsed("isr_2026_tarifa.json", _parse_isr_tariff_arrays)
+
+def bracket_index(lower: np.ndarray, income) -> np.ndarray:
+    """Rango de la tarifa para cada ingreso: el último con ``lower <= ingreso``.
+
+    Debajo del primer límite se usa el primer rango y el hueco de un centavo
+    entre ``upper`` y el siguiente ``lower`` de la tabla del SAT cuenta como
+    parte del rango anterior (el exceso sobre su límite inferior sigue siendo
+    continuo). Es la única regla de búsqueda de todas las rutas de ISR.
+    """
+    idx = np.searchsorted(lower, np.asarray(income, dtype=float), side="right") - 1
+    return np.clip(idx, 0, lower.shape[0] - 1)
+
+def compile_isr_tariff(brackets: Sequence[ISRTariffBracket]) -> ISRTariffArrays:
+    """Convierte la lista de rangos en arreglos (lower/upper/fixed_quota/rate).
+
+    Los rangos deben venir ordenados por límite inferior, como en la tabla del SAT.
+    """
+    if not brackets:
+        raise ValueError("La tarifa ISR está vacía.")
+    lower = np.array([b.lower for b in brackets], dtype=float)
+    if np.any(np.diff(lower) <= 0):
+        raise ValueError("Los rangos de la tarifa ISR deben estar ordenados por límite inferior.")
+    upper = np.array([np.inf if b.upper is None else b.upper for b in brackets], dtype=float)
+    fixed_quota = np.array([b.fixed_quota for b in brackets], dtype=float)
+    rate = np.array([b.rate for b in brackets], dtype=float)
+    for arr in (lower, upper, fixed_quota, rate):
+        arr.flags.writeable = False
+    return ISRTariffArrays(lower=lower, upper=upper, fixed_quota=fixed_quota, rate=rate)
+
+@dataclass(frozen=True, eq=False)
+class ISRPiecewise:
+    """ISR mensual como función lineal por tramos: ``isr(x) = intercept[i] + slope[i] * x``
+    para ``breakpoints[i] <= x < breakpoints[i + 1]``.
+
+    Los tramos son los rangos de la tarifa y se ubican con ``bracket_index``,
+    la misma regla de ``isr_monthly_batch`` (hueco de un centavo = rango
+    anterior; debajo del primer límite, la primera cuota fija), así que ambas
+    rutas dan el mismo ISR para cualquier ingreso. Consultas O(log n).
+    """
+    breakpoints: np.ndarray
+    slopes: np.ndarray  # tasa marginal
+    intercepts: np.ndarray  # cuota fija - tasa * límite inferior
+    net_breakpoints: np.ndarray  # ingreso neto (x - isr) en cada breakpoint
+
+    def __len__(self) -> int:
+        return int(self.breakpoints.shape[0])
+
+    @classmethod
+    def from_tariff(cls, tariff: ISRTariffArrays) -> "ISRPiecewise":
+        slopes = np.asarray(tariff.rate, dtype=float)
+        if np.any(slopes >= 1.0):
+            raise ValueError("Las tasas marginales deben ser menores a 1.")
+        breakpoints = np.asarray(tariff.lower, dtype=float)
+        intercepts = tariff.fixed_quota - slopes * breakpoints
+        net_breakpoints = breakpoints - tariff.fixed_quota
+        # el neto debe ser creciente para invertirlo; si la tabla tiene un salto
+        # de centavos en un límite, se busca sobre su envolvente creciente
+        net_breakpoints = np.maximum.accumulate(net_breakpoints)
+        for arr in (breakpoints, slopes, intercepts, net_breakpoints):
+            arr.flags.writeable = False
+        return cls(breakpoints=breakpoints, slopes=slopes, intercepts=intercepts, net_breakpoints=net_breakpoints)
+
+    def segment(self, income) -> np.ndarray:
+        """Índice del tramo de cada ingreso (misma búsqueda que ``isr_monthly_batch``)."""
+        return bracket_index(self.breakpoints, income)
+
+    def __call__(self, income) -> np.ndarray:
+        x = np.maximum(np.asarray(income, dtype=float), self.breakpoints[0])
+        i = self.segment(x)
+        return self.intercepts[i] + self.slopes[i] * x
+
+    def marginal_rate(self, income) -> np.ndarray:
+        return self.slopes[self.segment(income)]
+
+    def net(self, income) -> np.ndarray:
+        return np.asarray(income, dtype=float) - self(income)
 
-def isr_monthly(gross_monthly_income: float, brackets: Optional[List[ISRTariffBracket]] = None) -> Dict[str, Any]:
+    def gross_from_net(self, net_income) -> np.ndarray:
+        """Ingreso bruto cuyo neto de ISR es ``net_income`` (inversa exacta por tramo)."""
+        net = np.asarray(net_income, dtype=float)
+        i = np.maximum(np.searchsorted(self.net_breakpoints, net, side="right") - 1, 0)
+        gross = (net + self.intercepts[i]) / (1.0 - self.slopes[i])
+        # debajo del primer límite el ISR es la cuota fija inicial
+        low = net < self.net_breakpoints[0]
+        return np.where(low, net + self.intercepts[0] + self.slopes[0] * self.breakpoints[0], gross)
+
+    def curve_points(self, income_min: float, income_max: float, kind: str = "isr", tol: float = 1e-4) -> Dict[str, np.ndarray]:
+        """Puntos mínimos para dibujar la curva en [income_min, income_max].
+
+        - ``kind="isr"``: el ISR es lineal entre breakpoints, basta con los
+          breakpoints del rango y los extremos (exacto al unirlos con rectas).
+        - ``kind="effective"``: la tasa efectiva ``slope + intercept / x`` es una
+          hipérbola en cada tramo; se subdivide geométricamente hasta que el
+          error de la cuerda sea <= ``tol`` (en puntos de tasa).
+
+        Devuelve ``income`` e ``isr`` (o ``effective_rate``).
+        """
+        lo, hi = float(income_min), float(income_max)
+        if hi <= lo:
+            raise ValueError("El ingreso máximo debe ser mayor que el mínimo.")
+        inner = self.breakpoints[(self.breakpoints > lo) & (self.breakpoints < hi)]
+        knots = np.concatenate([[lo], inner, [hi]])
+        if kind == "isr":
+            return {"income": knots, "isr": self(knots)}
+        if kind != "effective":
+            raise ValueError("kind debe ser 'isr' o 'effective'.")
+        if lo <= 0:
+            raise ValueError("La tasa efectiva requiere ingreso mínimo > 0.")
+
+        pieces = [knots[:1]]
+        for x0, x1 in zip(knots[:-1], knots[1:]):
+            b = abs(float(self.intercepts[self.segment(x0)]))
+            # error máximo de la cuerda de b/x en [x0, x0*q]: b (sqrt(q) - 1)^2 / (x0 q)
+            n = 1
+            while n < 10_000:
+                q = (x1 / x0) ** (1.0 / n)
+                if b * (np.sqrt(q) - 1.0) ** 2 / (x0 * q) <= tol:
+                    break
+                n += 1
+            pieces.append(np.geomspace(x0, x1, n + 1)[1:])
+        income = np.concatenate(pieces)
+        return {"income": income, "effective_rate": self(income) / income}
+
+def _parse_isr_piecewise(data: Dict[str, Any]) -> ISRPiecewise:
+    return ISRPiecewise.from_tariff(_parse_isr_tariff_arrays(data))
+
+def load_isr_2026_piecewise() -> ISRPiecewise:
+    """Tarifa 2026 como ``ISRPiecewise``, cacheada por proceso."""
+    return load_parsed("isr_2026_tarifa.json", _parse_isr_piecewise)
+
+@timed()
+def isr_monthly_batch(
+    incomes: np.ndarray,
+    brackets: Optional[Union[Sequence[ISRTariffBracket], ISRTariffArrays]] = None
+) -> Dict[str, np.ndarray]:
+    """ISR mensual para un arreglo de ingresos (un cálculo vectorizado).
+
+    Ubica el rango con ``bracket_index`` (searchsorted sobre los límites
+    inferiores; debajo del primer límite, el primer rango) y devuelve columnas (arreglos del mismo tamaño que ``incomes``):
+    - isr
+    - bracket (índice del rango usado)
+    - lower, upper (np.inf = sin límite), fixed_quota, rate, excess
+    """
+    income = np.asarray(incomes, dtype=float)
+    if np.any(income < 0):
+        raise ValueError("El ingreso mensual no puede ser negativo.")
+
+    if brackets is None:
+        brackets = load_isr_2026_arrays()
+    tariff = brackets if isinstance(brackets, ISRTariffArrays) else compile_isr_tariff(brackets)
+
+    idx = bracket_index(tariff.lower, income)
+
+    lower = tariff.lower[idx]
+    fixed_quota = tariff.fixed_quota[idx]
+    rate = tariff.rate[idx]
+    excess = np.maximum(0.0, income - lower)
+
+    return {
+        "isr": fixed_quota + excess * rate,
+        "bracket": idx,
+        "lower": lower,
+        "upper": tariff.upper[idx],
+        "fixed_quota": fixed_quota,
+        "rate": rate,
+        "excess": excess,
+    }
+
+@timed()
+def isr_monthly(
+    gross_monthly_income: float,
+    brackets: Optional[Union[Sequence[ISRTariffBracket], ISRTariffArrays]] = None
+) -> Dict[str, Any]:
     """Calcula ISR mensual usando tarifa por rangos.
 
     Devuelve un dict con:
@@ -37,28 +231,35 @@ def isr_monthly(gross_monthly_income: float, brackets: Optional[List[ISRTariffBr
     if gross_monthly_income < 0:
         raise ValueError("El ingreso mensual no puede ser negativo.")
 
-    if brackets is None:
-        brackets = load_isr_2026_tariff()
-
-    income = float(gross_monthly_income)
-
-    chosen = None
-    for b in brackets:
-        if income >= b.lower and (b.upper is None or income <= b.upper):
+    if brackets is not None and not isinstance(brackets, ISRTariffArrays):
+        # lista explícita: recorrido escalar con la regla de ``bracket_index``
+        # (sin compilar arreglos en cada llamada; rangos ordenados por ``lower``)
+        if not brackets:
+            raise ValueError("La tarifa ISR está vacía.")
+        income = float(gross_monthly_income)
+        chosen = brackets[0]
+        for b in brackets:
+            if b.lower > income:
+                break
             chosen = b
-            break
-    if chosen is None:
-        # si no cayó en ninguno, usamos el último por seguridad
-        chosen = brackets[-1]
+        excess = max(0.0, income - chosen.lower)
+        return {
+            "isr": chosen.fixed_quota + excess * chosen.rate,
+            "lower": chosen.lower,
+            "upper": chosen.upper,
+            "fixed_quota": chosen.fixed_quota,
+            "rate": chosen.rate,
+            "excess": excess,
+        }
 
-    excess = max(0.0, income - chosen.lower)
-    tax = chosen.fixed_quota + excess * chosen.rate
+    out = isr_monthly_batch(np.array([float(gross_monthly_income)]), brackets)
+    upper = float(out["upper"][0])
 
     return {
-        "isr": tax,
-        "lower": chosen.lower,
-        "upper": chosen.upper,
-        "fixed_quota": chosen.fixed_quota,
-        "rate": chosen.rate,
-        "excess": excess,
+        "isr": float(out["isr"][0]),
+        "lower": float(out["lower"][0]),
+        "upper": None if np.isinf(upper) else upper,
+        "fixed_quota": float(out["fixed_quota"][0]),
+        "rate": float(out["rate"][0]),
+        "excess": float(out["excess"][0]),
     }
@@ -1,48 +1,246 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Dict, Any, Optional
 import numpy as np
 import pandas as pd
 
-from pensiones.utils.io import load_json
+from pensiones.utils.io import load_params, load_parsed
+from pensiones.utils.profiling import timed
 
+ASSUMPTIONS_FILE = "lss1973_assumptions.json"
+
+@dataclass(frozen=True, eq=False)
+class LSS1973Tables:
+    """Tablas legales de la LSS 1973 compiladas en arreglos para búsqueda vectorizada."""
+    vsm_upper: np.ndarray  # límite superior de cada grupo de salario (en VSM; inf = sin tope)
+    basic: np.ndarray  # cuantía básica (fracción del salario promedio), art. 167
+    increment: np.ndarray  # incremento anual por año cotizado después de las semanas mínimas
+    cesantia_age: np.ndarray  # edades de la tabla del art. 171
+    cesantia_factor: np.ndarray  # fracción de la pensión de vejez que corresponde a esa edad
+    spouse: float
+    child: float
+    parent: float
+    no_dependents_aid: float
+    single_parent_aid: float
+    max_pension: float  # tope de vejez + asignaciones (fracción del salario promedio), art. 169
+
+    def group(self, salary_vsm) -> np.ndarray:
+        """Grupo del art. 167 (límites superiores incluidos, a 2 decimales)."""
+        return np.searchsorted(self.vsm_upper, np.round(np.asarray(salary_vsm, dtype=float), 2), side="left")
+
+    def age_factor(self, retirement_age) -> np.ndarray:
+        """Porcentaje de cesantía por edad (0 antes de la primera edad, 100% desde la última)."""
+        ra = np.floor(np.asarray(retirement_age, dtype=float))
+        idx = np.searchsorted(self.cesantia_age, ra, side="right") - 1
+        return np.where(idx >= 0, self.cesantia_factor[np.maximum(idx, 0)], 0.0)
+
+def compile_lss1973_tables(data: Dict[str, Any]) -> LSS1973Tables:
+    tables = data.get("tables", {})
+    try:
+        art167 = tables["art167"]
+        art171 = tables["art171_cesantia"]
+        family = tables["art164_family"]
+        art169 = tables["art169"]
+    except KeyError as e:
+        raise ValueError(f"Falta la tabla {e} en pensiones/data/{ASSUMPTIONS_FILE}") from None
+
+    upper = np.array([np.inf if u is None else float(u) for u in art167["salary_vsm_upper"]])
+    basic = np.asarray(art167["basic_pct"], dtype=float) / 100.0
+    increment = np.asarray(art167["increment_pct"], dtype=float) / 100.0
+    if not (len(upper) == len(basic) == len(increment)) or np.any(np.diff(upper) <= 0):
+        raise ValueError("La tabla del art. 167 debe tener límites crecientes y columnas del mismo tamaño.")
+    ages = np.asarray(art171["age"], dtype=float)
+    factor = np.asarray(art171["pct"], dtype=float) / 100.0
+    if len(ages) != len(factor) or np.any(np.diff(ages) <= 0):
+        raise ValueError("La tabla de cesantía (art. 171) debe tener edades crecientes y un porcentaje por edad.")
+
+    for arr in (upper, basic, increment, ages, factor):
+        arr.flags.writeable = False
+    return LSS1973Tables(
+        vsm_upper=upper,
+        basic=basic,
+        increment=increment,
+        cesantia_age=ages,
+        cesantia_factor=factor,
+        spouse=float(family.get("spouse", 0.15)),
+        child=float(family.get("child", 0.10)),
+        parent=float(family.get("parent", 0.10)),
+        no_dependents_aid=float(family.get("no_dependents_aid", 0.15)),
+        single_parent_aid=float(family.get("single_parent_aid", 0.10)),
+        max_pension=float(art169.get("max_pension_pct", 100.0)) / 100.0,
+    )
+
+def load_lss1973_tables() -> LSS1973Tables:
+    """Tablas del art. 167/171/164/169 ya compiladas (una vez por proceso)."""
+    return load_parsed(ASSUMPTIONS_FILE, compile_lss1973_tables)
+
+def increment_years(excess_weeks) -> np.ndarray:
+    """Años para incrementos: cada 52 semanas un año; el sobrante de 13 a 26
+    semanas cuenta como medio año y más de 26 como año completo."""
+    w = np.maximum(np.asarray(excess_weeks, dtype=float), 0.0)
+    full, rest = np.divmod(np.floor(w), 52.0)
+    return full + np.where(rest > 26, 1.0, np.where(rest >= 13, 0.5, 0.0))
+
+def family_assignment(tables: LSS1973Tables, has_spouse, n_children, n_parents) -> np.ndarray:
+    """Asignaciones familiares / ayuda asistencial (art. 164) como fracción de la cuantía."""
+    spouse = np.asarray(has_spouse, dtype=bool)
+    children = np.asarray(n_children, dtype=float)
+    parents = np.asarray(n_parents, dtype=float)
+    direct = tables.spouse * spouse + tables.child * children
+    # sin esposa(o) ni hijos: ascendientes; sin nadie, ayuda asistencial
+    alone = ~spouse & (children == 0)
+    aid = np.where(parents == 0, tables.no_dependents_aid, np.where(parents == 1, tables.single_parent_aid, 0.0))
+    return direct + np.where(alone, tables.parent * parents + aid, 0.0)
+
+@timed()
+def pension_lss1973_batch(
+    age_now: np.ndarray,
+    retirement_age: np.ndarray,
+    salary_monthly: np.ndarray,
+    assumptions: Optional[Dict[str, Any]] = None,
+    weeks_now=None,
+    has_spouse=False,
+    n_children=0,
+    n_parents=0,
+    avg_salary_daily=None,
+    tables: Optional[LSS1973Tables] = None
+) -> Dict[str, np.ndarray]:
+    """Pensión de cesantía en edad avanzada / vejez LSS 1973 para arreglos de
+    trabajadores y edades de retiro (se hace broadcasting entre todos los argumentos,
+    p.ej. ``age_now[:, None]`` × ``ages[None, :]``).
+
+    - Semanas al retiro: ``weeks_now + 52 * (edad retiro - edad actual) * densidad``.
+    - Salario promedio de las últimas 250 semanas: ``avg_salary_daily`` o, si no
+      se da, ``salary_monthly / days_per_month``; topado en ``max_salary_vsm`` VSM.
+    - Cuantía = salario promedio × (básica + incremento × años después de
+      ``weeks_min`` semanas), según el grupo del art. 167.
+    - Vejez = min(cuantía × (1 + asignaciones), ``max_pension`` × salario
+      promedio): con las asignaciones la pensión no excede el 100% del salario
+      promedio (art. 169; tope en ``tables.art169`` del JSON).
+    - Pensión = max(vejez × % cesantía por edad, pensión mínima) ×
+      (1 + ``pension_increase``); 0 si no se llega a ``weeks_min`` semanas o a
+      la primera edad de cesantía.
+
+    Devuelve ``replacement_rate`` (pensión / salario mensual), ``pension_monthly``
+    y los auxiliares del cálculo.
+    """
+    if assumptions is None:
+        assumptions = load_params(ASSUMPTIONS_FILE)
+    if tables is None:
+        tables = load_lss1973_tables()
+
+    min_wage = float(assumptions.get("min_wage_daily", 315.04))
+    days_per_month = float(assumptions.get("days_per_month", 30.4))
+    weeks_min = float(assumptions.get("weeks_min", 500))
+    density = float(assumptions.get("contribution_density", 1.0))
+    max_vsm = float(assumptions.get("max_salary_vsm", 25.0))
+    increase = float(assumptions.get("pension_increase", 0.11))
+    min_pension_vsm = float(assumptions.get("min_pension_vsm", 1.0))
+    if weeks_now is None:
+        weeks_now = float(assumptions.get("weeks_now_default", 1000))
+
+    age_now, ra, salary, weeks_now, avg_daily = np.broadcast_arrays(
+        np.asarray(age_now, dtype=float),
+        np.asarray(retirement_age, dtype=float),
+        np.asarray(salary_monthly, dtype=float),
+        np.asarray(weeks_now, dtype=float),
+        np.asarray(np.nan if avg_salary_daily is None else avg_salary_daily, dtype=float),
+    )
+    avg_daily = np.where(np.isnan(avg_daily), salary / days_per_month, avg_daily)
+    avg_daily = np.minimum(avg_daily, max_vsm * min_wage)
+    salary_vsm = avg_daily / min_wage
+
+    weeks = weeks_now + 52.0 * np.maximum(ra - age_now, 0.0) * density
+    years_inc = increment_years(weeks - weeks_min)
+
+    g = tables.group(salary_vsm)
+    basic = tables.basic[g]
+    increment = tables.increment[g]
+    cuantia_daily = avg_daily * (basic + increment * years_inc)
+
+    family = family_assignment(tables, has_spouse, n_children, n_parents)
+    age_factor = tables.age_factor(ra)
+    eligible = (weeks >= weeks_min) & (age_factor > 0)
+
+    vejez_daily = cuantia_daily * (1.0 + family)
+    cap_daily = tables.max_pension * avg_daily
+    max_applied = eligible & (vejez_daily > cap_daily)
+    pension_daily = np.minimum(vejez_daily, cap_daily) * age_factor
+    min_daily = min_pension_vsm * min_wage
+    min_applied = eligible & (pension_daily < min_daily)
+    pension_daily = np.where(min_applied, min_daily, pension_daily) * (1.0 + increase)
+    pension_monthly = np.where(eligible, pension_daily * days_per_month, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = np.where(salary > 0, pension_monthly / salary, 0.0)
+
+    return {
+        "replacement_rate": rr,
+        "pension_monthly": pension_monthly,
+        "weeks": weeks,
+        "salary_vsm": salary_vsm,
+        "basic_pct": basic,
+        "increment_pct": increment,
+        "increment_years": years_inc,
+        "family_pct": np.broadcast_to(family, rr.shape),
+        "age_factor": age_factor,
+        "eligible": eligible,
+        "max_pension_applied": max_applied,
+        "min_pension_applied": min_applied,
+    }
+
+@timed()
 def pension_lss1973(
     age_now: int,
     retirement_age: int,
     salary_monthly: float,
-    assumptions: Optional[Dict[str, Any]] = None
+    assumptions: Optional[Dict[str, Any]] = None,
+    weeks_now: Optional[float] = None,
+    has_spouse: bool = False,
+    n_children: int = 0,
+    n_parents: int = 0
 ) -> Dict[str, Any]:
-    """Plantilla: pensión LSS 1973 + tasa de reemplazo.
+    """Pensión LSS 1973 + tasa de reemplazo para un trabajador y una edad de retiro.
 
-    Debes implementar con base en el Excel LSS 1973 visto en clase.
+    Ver ``pension_lss1973_batch`` para el modelo.
     """
-    if assumptions is None:
-        assumptions = load_json("lss1973_assumptions.json").get("params", {})
-
-    # TODO: reemplazar por tu modelo del Excel
-    # Placeholder demo UI: penaliza jubilación temprana
-    base_rr_65 = 0.75
-    penalty_per_year = 0.06
-    rr = base_rr_65 - penalty_per_year * max(0, 65 - retirement_age)
-    rr = float(np.clip(rr, 0.0, 1.2))
-    pension = rr * salary_monthly
+    out = pension_lss1973_batch(
+        age_now, retirement_age, salary_monthly, assumptions,
+        weeks_now=weeks_now, has_spouse=has_spouse, n_children=n_children, n_parents=n_parents,
+    )
 
     return {
         "retirement_age": retirement_age,
-        "replacement_rate": rr,
-        "pension_monthly": pension,
+        "replacement_rate": float(out["replacement_rate"]),
+        "pension_monthly": float(out["pension_monthly"]),
+        "weeks": float(out["weeks"]),
+        "eligible": bool(out["eligible"]),
         "age_now": age_now,
         "salary_monthly": salary_monthly,
     }
 
+@timed()
 def rr_by_retirement_age(
     age_now: int,
     salary_monthly: float,
     min_age: int = 60,
-    max_age: int = 65
+    max_age: int = 65,
+    assumptions: Optional[Dict[str, Any]] = None,
+    weeks_now: Optional[float] = None,
+    has_spouse: bool = False,
+    n_children: int = 0,
+    n_parents: int = 0
 ) -> pd.DataFrame:
-    rows = []
-    for ra in range(min_age, max_age + 1):
-        out = pension_lss1973(age_now, ra, salary_monthly)
-        rows.append({"retirement_age": ra, "replacement_rate": out["replacement_rate"], "pension_monthly": out["pension_monthly"]})
-    return pd.DataFrame(rows)
+    ages = np.arange(min_age, max_age + 1)
+    out = pension_lss1973_batch(
+        age_now, ages, salary_monthly, assumptions,
+        weeks_now=weeks_now, has_spouse=has_spouse, n_children=n_children, n_parents=n_parents,
+    )
+    return pd.DataFrame({
+        "retirement_age": ages,
+        "replacement_rate": out["replacement_rate"],
+        "pension_monthly": out["pension_monthly"],
+        "weeks": out["weeks"],
+        "age_factor": out["age_factor"],
+    })
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from pensiones.core.lss1997_ret import (
+    DAYS_PER_MONTH,
+    RCV_INSURANCE,
+    monthly_rate,
+    rcv_contribution_rate,
+    retirement_annuity_factor,
+)
+from pensiones.core.ss_1997 import load_ss_1997_schedule
+from pensiones.utils.io import load_params
+from pensiones.utils.profiling import timed
+
+def _log_growth_params(mean_annual: float, vol_annual: float):
+    """(mu, sigma) mensuales de log(1 + r) con E[1 + r] = (1 + mean_annual)^(1/12)."""
+    sigma = vol_annual / np.sqrt(12.0)
+    return float(np.log1p(monthly_rate(mean_annual))) - 0.5 * sigma ** 2, sigma
+
+def _accumulate_paths(
+    log_wage: np.ndarray,
+    log_return: np.ndarray,
+    salary_monthly: float,
+    rcv_rate: float,
+    voluntary_rate: float,
+    density: float,
+    base_floor: float,
+    base_cap: float,
+    balance_now: float
+) -> Dict[str, np.ndarray]:
+    """Misma acumulación que ``project_accounts`` (aportación al cierre del mes t,
+    crece con A[T] / A[t+1]) pero en escala logarítmica, con horizonte común
+    para todas las trayectorias (trayectorias × meses)."""
+    LW = np.cumsum(log_wage, axis=1)  # log W[t + 1]
+    LA = np.cumsum(log_return, axis=1)  # log A[t + 1]
+    log_A_T = LA[:, -1]
+
+    wage = np.exp(LW - log_wage)
+    wage *= salary_monthly
+    weight = np.exp(log_A_T[:, None] - LA)
+    weight *= density
+
+    voluntary_factor = np.einsum("ij,ij->i", wage, weight)
+    np.clip(wage, base_floor, base_cap, out=wage)
+    mandatory_factor = np.einsum("ij,ij->i", wage, weight)
+
+    return {
+        "balance": rcv_rate * mandatory_factor + voluntary_rate * voluntary_factor + balance_now * np.exp(log_A_T),
+        "final_salary": salary_monthly * np.exp(LW[:, -1]),
+    }
+
+@timed()
+def simulate_replacement_rates(
+    age_now: float,
+    salary_monthly: float,
+    voluntary_rate: float,
+    n_paths: int = 10_000,
+    seed: Optional[int] = None,
+    target_rr: Optional[float] = None,
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[float] = None,
+    balance_now: float = 0.0,
+    chunk_size: int = 5_000,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    return_samples: bool = False
+) -> Dict[str, Any]:
+    """Distribución de la tasa de reemplazo LSS 1997 con rendimientos y crecimiento
+    salarial estocásticos.
+
+    Por trayectoria y mes se simulan (lognormales, independientes) el rendimiento
+    real y el crecimiento salarial real, alrededor de ``real_return_annual`` y
+    ``wage_growth_annual`` con volatilidades anuales ``real_return_vol_annual`` y
+    ``wage_growth_vol_annual``. Todo el cálculo es en términos reales, así que la
+    inflación no entra en la simulación.
+    La acumulación es la misma de ``replacement_rate_lss1997_batch`` (trayectorias ×
+    meses) y el saldo se convierte a renta con la tasa real esperada.
+
+    Las trayectorias se generan por bloques de ``chunk_size`` (memoria acotada);
+    con el mismo ``seed`` y ``chunk_size`` el resultado es reproducible.
+    Devuelve mean, std, percentiles {p: rr}, prob_target (si hay ``target_rr``),
+    n_paths y, con ``return_samples=True``, el arreglo ``samples`` de RR.
+    """
+    if assumptions is None:
+        assumptions = load_params("lss1997_assumptions.json")
+    if retirement_age is None:
+        retirement_age = float(assumptions.get("retirement_age_default", 65))
+    if n_paths <= 0:
+        raise ValueError("n_paths debe ser positivo.")
+
+    schedule = load_ss_1997_schedule()
+    uma_month = schedule.uma_daily * DAYS_PER_MONTH
+    rcv_rate = rcv_contribution_rate(schedule, assumptions.get("rcv_insurance", RCV_INSURANCE))
+    density = float(assumptions.get("density_of_contribution", 1.0))
+
+    real_return = float(assumptions.get("real_return_annual", 0.0))
+    wage_growth = float(assumptions.get("wage_growth_annual", 0.0))
+    return_vol = float(assumptions.get("real_return_vol_annual", 0.0))
+    wage_vol = float(assumptions.get("wage_growth_vol_annual", 0.0))
+
+    mu_real, sd_real = _log_growth_params(real_return, return_vol)
+    mu_wage, sd_wage = _log_growth_params(wage_growth, wage_vol)
+
+    months = max(0, int(round((float(retirement_age) - float(age_now)) * 12)))
+    annuity = float(retirement_annuity_factor(float(retirement_age), assumptions, float(age_now)))
+
+    rng = np.random.default_rng(seed)
+    samples = np.empty(n_paths)
+    for a in range(0, n_paths, chunk_size):
+        n = min(chunk_size, n_paths - a)
+        log_wage = rng.standard_normal((n, months))
+        log_wage *= sd_wage
+        log_wage += mu_wage
+        log_return = rng.standard_normal((n, months))
+        log_return *= sd_real
+        log_return += mu_real
+
+        if months == 0:
+            proj = {"balance": np.full(n, float(balance_now)), "final_salary": np.full(n, float(salary_monthly))}
+        else:
+            proj = _accumulate_paths(
+                log_wage, log_return, float(salary_monthly), rcv_rate, float(voluntary_rate), density,
+                base_floor=schedule.sbc_min_uma * uma_month,
+                base_cap=schedule.sbc_max_uma * uma_month,
+                balance_now=float(balance_now),
+            )
+        final_salary = proj["final_salary"]
+        pension = proj["balance"] / annuity
+        samples[a:a + n] = np.where(final_salary > 0, pension / np.where(final_salary > 0, final_salary, 1.0), 0.0)
+
+    out: Dict[str, Any] = {
+        "n_paths": n_paths,
+        "mean": float(samples.mean()),
+        "std": float(samples.std()),
+        "percentiles": {float(p): float(v) for p, v in zip(percentiles, np.percentile(samples, percentiles))},
+    }
+    if target_rr is not None:
+        out["prob_target"] = float(np.mean(samples >= float(target_rr)))
+    if return_samples:
+        out["samples"] = samples
+    return out
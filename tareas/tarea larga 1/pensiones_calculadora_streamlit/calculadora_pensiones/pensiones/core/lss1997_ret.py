@@ -4,37 +4,242 @@ from typing import Dict, Any, Tuple, Callable, Optional
 import numpy as np
 import pandas as pd
 
-from pensiones.utils.io import load_json
+from pensiones.core.mortality import pension_annuity_factor
+from pensiones.core.solvers import solve_monotone, solve_monotone_batch
+from pensiones.core.ss_1997 import SSRateSchedule, load_ss_1997_schedule
+from pensiones.utils.io import load_params
+from pensiones.utils.profiling import timed
 
+# Días promedio por mes para pasar de topes diarios (UMA) a mensuales.
+DAYS_PER_MONTH = 30.4
+# Seguro del JSON de tasas cuyas cuotas van a la cuenta individual.
+RCV_INSURANCE = "Retiro, Cesantía y Vejez"
+
+def monthly_rate(annual_rate) -> np.ndarray:
+    """Tasa mensual equivalente a una tasa anual efectiva."""
+    return np.power(1.0 + np.asarray(annual_rate, dtype=float), 1.0 / 12.0) - 1.0
+
+def rcv_contribution_rate(schedule: Optional[SSRateSchedule] = None, insurance: str = RCV_INSURANCE) -> float:
+    """Suma de tasas (patrón + trabajador + gobierno) del seguro de RCV."""
+    if schedule is None:
+        schedule = load_ss_1997_schedule()
+    rows = [i for i, name in enumerate(schedule.insurance) if name == insurance]
+    return float(schedule.rates[rows].sum()) if rows else 0.0
+
+def annuity_factor_due(monthly_return, months) -> np.ndarray:
+    """Valor presente de 1 mensual anticipado durante ``months`` meses."""
+    i = np.asarray(monthly_return, dtype=float)
+    n = np.asarray(months, dtype=float)
+    v = 1.0 / (1.0 + i)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        af = (1.0 - v ** n) / (1.0 - v)
+    return np.where(np.abs(i) < 1e-12, n, af)
+
+def retirement_annuity_factor(
+    retirement_age,
+    assumptions: Dict[str, Any],
+    age_now=None
+) -> np.ndarray:
+    """Valor presente de 1 mensual de pensión al retiro (divide al saldo).
+
+    Sin ``gender`` en los supuestos es una renta cierta por ``annuity_years`` años.
+    Con ``gender`` es una renta vitalicia de ``pensiones.core.mortality`` a la tasa
+    real y, si hay ``partner_age`` (edad actual de la pareja) y ``gender_partner``,
+    incluye la pensión de viudez al ``survivor_pension_fraction`` (90%).
+    """
+    real_return = float(assumptions.get("real_return_annual", 0.0))
+    gender = assumptions.get("gender")
+    if gender is None:
+        return annuity_factor_due(monthly_rate(real_return), 12.0 * float(assumptions.get("annuity_years", 20)))
+
+    partner_age = assumptions.get("partner_age")
+    if partner_age is not None and age_now is not None:
+        # edad de la pareja cuando el trabajador se retira
+        partner_age = np.asarray(partner_age, dtype=float) + (np.asarray(retirement_age, dtype=float) - np.asarray(age_now, dtype=float))
+    return pension_annuity_factor(
+        retirement_age, gender, real_return,
+        partner_age=partner_age,
+        gender_partner=assumptions.get("gender_partner"),
+        survivor_fraction=float(assumptions.get("survivor_pension_fraction", 0.9)),
+    )
+
+def growth_index(monthly_rates, months: int) -> np.ndarray:
+    """Índice acumulado I[..., t] = prod_{s<t} (1 + r_s) para t = 0..months.
+
+    ``monthly_rates`` puede ser escalar (tasa constante) o un arreglo cuya última
+    dimensión son los ``months`` meses (p.ej. trayectorias × meses).
+    """
+    r = np.asarray(monthly_rates, dtype=float)
+    if r.ndim == 0:
+        r = np.full(months, float(r))
+    r = r[..., :months]
+    ones = np.ones(r.shape[:-1] + (1,))
+    return np.concatenate([ones, np.cumprod(1.0 + r, axis=-1)], axis=-1)
+
+def project_accounts(
+    salary_monthly: np.ndarray,
+    months: np.ndarray,
+    rcv_rate: float,
+    voluntary_rate: np.ndarray,
+    density: np.ndarray,
+    wage_rates,
+    return_rates,
+    base_floor: float = 0.0,
+    base_cap: float = np.inf,
+    balance_now: np.ndarray = 0.0
+) -> Dict[str, np.ndarray]:
+    """Proyección mensual de la cuenta individual (trabajadores × meses, sin ciclo por mes).
+
+    - El salario del mes t es ``salary * W[t]`` con W = ``growth_index(wage_rates)``.
+    - Las cuotas obligatorias (``rcv_rate``) van sobre el salario topado a
+      [base_floor, base_cap]; las voluntarias sobre el salario completo.
+    - Cada aportación (al cierre del mes t, ponderada por ``density``) crece
+      hasta el retiro T con el factor A[T] / A[t+1], A = ``growth_index(return_rates)``.
+
+    ``wage_rates``/``return_rates`` son escalares o arreglos (meses,) o (n, meses).
+    Todo se mantiene en términos reales. Devuelve arreglos (n,).
+    """
+    salary = np.asarray(salary_monthly, dtype=float)
+    months = np.asarray(months, dtype=np.intp)
+    n = salary.shape[0]
+    horizon = int(months.max()) if n else 0
+
+    W = np.broadcast_to(growth_index(wage_rates, horizon), (n, horizon + 1))
+    A = np.broadcast_to(growth_index(return_rates, horizon), (n, horizon + 1))
+    T = months[:, None]
+    W_T = np.take_along_axis(W, T, axis=1)[:, 0]
+    A_T = np.take_along_axis(A, T, axis=1)[:, 0]
+
+    active = np.arange(horizon)[None, :] < T
+    weight = np.where(active, A_T[:, None] / A[:, 1:], 0.0)
+    weight *= np.broadcast_to(np.asarray(density, dtype=float), (n,))[:, None]
+
+    wage = salary[:, None] * W[:, :horizon]
+    mandatory_base = np.maximum(base_floor, np.minimum(wage, base_cap))
+    mandatory_factor = (mandatory_base * weight).sum(axis=1)
+    voluntary_factor = (wage * weight).sum(axis=1)
+
+    return {
+        "balance_mandatory": rcv_rate * mandatory_factor + np.asarray(balance_now, dtype=float) * A_T,
+        "balance_voluntary": np.asarray(voluntary_rate, dtype=float) * voluntary_factor,
+        "voluntary_factor": voluntary_factor,
+        "final_salary": salary * W_T,
+    }
+
+@timed()
+def replacement_rate_lss1997_batch(
+    age_now: np.ndarray,
+    salary_monthly: np.ndarray,
+    voluntary_rate: np.ndarray,
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[np.ndarray] = None,
+    balance_now: np.ndarray = 0.0,
+    chunk_size: int = 4096,
+    schedule: Optional[SSRateSchedule] = None
+) -> Dict[str, np.ndarray]:
+    """Tasa de reemplazo LSS 1997 (CESANTÍA/VEJEZ) para arreglos de trabajadores.
+
+    Proyecta la cuenta individual mes a mes hasta ``retirement_age`` (por defecto
+    ``retirement_age_default``) con ``wage_growth_annual``, ``real_return_annual`` y
+    ``density_of_contribution``, y convierte el saldo en pensión mensual con
+    ``retirement_annuity_factor`` (renta cierta por ``annuity_years`` años o, si los
+    supuestos traen ``gender``, renta vitalicia con viudez). Las entradas se combinan
+    con broadcasting; se procesa en bloques de ``chunk_size`` trabajadores.
+    ``schedule`` son las cuotas SS (por omisión ``ss_1997_rates.json``).
+
+    Devuelve arreglos replacement_rate, pension_monthly, balance,
+    balance_mandatory, balance_voluntary, final_salary, annuity_factor,
+    retirement_age y rr_per_voluntary (la RR es afín en la tasa voluntaria:
+    rr = rr(0) + voluntary_rate * rr_per_voluntary).
+    """
+    if assumptions is None:
+        assumptions = load_params("lss1997_assumptions.json")
+    if retirement_age is None:
+        retirement_age = float(assumptions.get("retirement_age_default", 65))
+
+    age_now, salary, vol, ret_age, bal0 = np.broadcast_arrays(
+        np.asarray(age_now, dtype=float),
+        np.asarray(salary_monthly, dtype=float),
+        np.asarray(voluntary_rate, dtype=float),
+        np.asarray(retirement_age, dtype=float),
+        np.asarray(balance_now, dtype=float),
+    )
+    shape = age_now.shape
+    age_now, salary, vol, ret_age, bal0 = (a.ravel() for a in (age_now, salary, vol, ret_age, bal0))
+
+    if schedule is None:
+        schedule = load_ss_1997_schedule()
+    uma_month = schedule.uma_daily * DAYS_PER_MONTH
+    rcv_rate = rcv_contribution_rate(schedule, assumptions.get("rcv_insurance", RCV_INSURANCE))
+    wage_m = monthly_rate(assumptions.get("wage_growth_annual", 0.0))
+    return_m = monthly_rate(assumptions.get("real_return_annual", 0.0))
+    density = float(assumptions.get("density_of_contribution", 1.0))
+
+    months = np.maximum(0, np.rint((ret_age - age_now) * 12)).astype(np.intp)
+
+    parts = []
+    for a in range(0, max(len(salary), 1), chunk_size):
+        sl = slice(a, a + chunk_size)
+        parts.append(project_accounts(
+            salary[sl], months[sl], rcv_rate, vol[sl], density, wage_m, return_m,
+            base_floor=schedule.sbc_min_uma * uma_month,
+            base_cap=schedule.sbc_max_uma * uma_month,
+            balance_now=bal0[sl],
+        ))
+    proj = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    annuity = retirement_annuity_factor(ret_age, assumptions, age_now)
+    balance = proj["balance_mandatory"] + proj["balance_voluntary"]
+    pension = balance / annuity
+    final_salary = proj["final_salary"]
+    positive = final_salary > 0
+    safe = np.where(positive, final_salary, 1.0)
+
+    out = {
+        "replacement_rate": np.where(positive, pension / safe, 0.0),
+        "pension_monthly": pension,
+        "balance": balance,
+        "balance_mandatory": proj["balance_mandatory"],
+        "balance_voluntary": proj["balance_voluntary"],
+        "final_salary": final_salary,
+        "annuity_factor": np.broadcast_to(annuity, balance.shape),
+        "retirement_age": ret_age,
+        "rr_per_voluntary": np.where(positive, proj["voluntary_factor"] / annuity / safe, 0.0),
+    }
+    return {k: v.reshape(shape) for k, v in out.items()}
+
+@timed()
 def replacement_rate_lss1997(
     age_now: int,
     salary_monthly: float,
     voluntary_rate: float,
-    assumptions: Optional[Dict[str, Any]] = None
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[int] = None,
+    balance_now: float = 0.0,
+    schedule: Optional[SSRateSchedule] = None
 ) -> Dict[str, Any]:
-    """Plantilla: tasa de reemplazo LSS 1997 (CESANTÍA/VEJEZ).
+    """Tasa de reemplazo LSS 1997 (CESANTÍA/VEJEZ) para un trabajador.
 
-    Aquí debes implementar lo que viene en el Excel visto en clase.
+    Ver ``replacement_rate_lss1997_batch`` para el modelo y los supuestos usados.
     Esta función devuelve un dict con tasa de reemplazo, pensión estimada, y auxiliares.
     """
-    if assumptions is None:
-        assumptions = load_json("lss1997_assumptions.json").get("params", {})
-
-    # TODO: reemplazar por tu modelo del Excel
-    # Placeholder razonable: tasa de reemplazo crece con contribución voluntaria (solo para demo UI)
-    base = 0.35
-    rr = base + 1.5 * voluntary_rate
-    rr = float(np.clip(rr, 0.0, 1.2))
-    pension = rr * salary_monthly
+    out = replacement_rate_lss1997_batch(
+        age_now, salary_monthly, voluntary_rate, assumptions,
+        retirement_age=retirement_age, balance_now=balance_now, schedule=schedule,
+    )
 
     return {
-        "replacement_rate": rr,
-        "pension_monthly": pension,
+        "replacement_rate": float(out["replacement_rate"]),
+        "pension_monthly": float(out["pension_monthly"]),
+        "balance": float(out["balance"]),
+        "final_salary": float(out["final_salary"]),
+        "retirement_age": float(out["retirement_age"]),
         "age_now": age_now,
         "salary_monthly": salary_monthly,
         "voluntary_rate": voluntary_rate
     }
 
+@timed()
 def solve_voluntary_rate_for_target(
     age_now: int,
     salary_monthly: float,
@@ -42,35 +247,90 @@ def solve_voluntary_rate_for_target(
     lo: float = 0.0,
     hi: float = 0.30,
     tol: float = 1e-4,
-    max_iter: int = 60
+    max_iter: int = 60,
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[int] = None,
+    schedule: Optional[SSRateSchedule] = None
 ) -> Dict[str, Any]:
     """Encuentra la tasa de ahorro voluntario (adicional) para alcanzar una RR objetivo.
 
-    Implementa búsqueda binaria sobre voluntary_rate.
+    La RR es afín en voluntary_rate (el saldo voluntario es tasa × factor), así
+    que basta con evaluar los extremos (ver ``pensiones.core.solvers``); ``iters``
+    es el número de evaluaciones del modelo. Si la meta no es alcanzable en
+    [lo, hi] devuelve el extremo más cercano.
     """
     if target_rr <= 0:
         return {"voluntary_rate": 0.0, "achieved_rr": 0.0, "iters": 0}
 
-    for i in range(max_iter):
-        mid = 0.5 * (lo + hi)
-        rr_mid = replacement_rate_lss1997(age_now, salary_monthly, mid)["replacement_rate"]
-        if abs(rr_mid - target_rr) <= tol:
-            return {"voluntary_rate": mid, "achieved_rr": rr_mid, "iters": i + 1}
-        if rr_mid < target_rr:
-            lo = mid
-        else:
-            hi = mid
+    if assumptions is None:
+        assumptions = load_params("lss1997_assumptions.json")
+
+    def rr(v: float) -> float:
+        return replacement_rate_lss1997(
+            age_now, salary_monthly, v, assumptions, retirement_age, schedule=schedule
+        )["replacement_rate"]
+
+    sol = solve_monotone(rr, float(target_rr), lo, hi, tol=tol, max_iter=max_iter, linear=True)
+    return {"voluntary_rate": float(sol["x"]), "achieved_rr": float(sol["fx"]), "iters": sol["evals"]}
 
-    rr_final = replacement_rate_lss1997(age_now, salary_monthly, 0.5*(lo+hi))["replacement_rate"]
-    return {"voluntary_rate": 0.5*(lo+hi), "achieved_rr": rr_final, "iters": max_iter}
+@timed()
+def solve_voluntary_rate_for_target_batch(
+    age_now: np.ndarray,
+    salary_monthly: np.ndarray,
+    target_rr: np.ndarray,
+    lo: float = 0.0,
+    hi: float = 0.30,
+    tol: float = 1e-4,
+    max_iter: int = 60,
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[np.ndarray] = None,
+    schedule: Optional[SSRateSchedule] = None
+) -> Dict[str, np.ndarray]:
+    """``solve_voluntary_rate_for_target`` para un arreglo de trabajadores a la vez.
+
+    Devuelve arreglos voluntary_rate, achieved_rr, iters y converged (máscara
+    por trabajador; False si no convergió o la meta quedó fuera de [lo, hi]).
+    """
+    if assumptions is None:
+        assumptions = load_params("lss1997_assumptions.json")
+
+    if retirement_age is None:
+        retirement_age = float(assumptions.get("retirement_age_default", 65))
+
+    age_now, salary, target, ret_age = np.broadcast_arrays(
+        np.asarray(age_now, dtype=float),
+        np.asarray(salary_monthly, dtype=float),
+        np.asarray(target_rr, dtype=float),
+        np.asarray(retirement_age, dtype=float),
+    )
+    age_now, salary, target, ret_age = (a.ravel() for a in (age_now, salary, target, ret_age))
+
+    def rr(v: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        return replacement_rate_lss1997_batch(
+            age_now[idx], salary[idx], v, assumptions, retirement_age=ret_age[idx], schedule=schedule
+        )["replacement_rate"]
+
+    sol = solve_monotone_batch(rr, target, lo, hi, tol=tol, max_iter=max_iter, linear=True)
+
+    no_target = target <= 0
+    return {
+        "voluntary_rate": np.where(no_target, 0.0, sol["x"]),
+        "achieved_rr": np.where(no_target, 0.0, sol["fx"]),
+        "iters": np.where(no_target, 0, sol["evals"]),
+        "converged": (sol["converged"] & sol["bracketed"]) | no_target,
+    }
 
+@timed()
 def rr_curve(
     age_now: int,
     salary_monthly: float,
-    voluntary_rates: np.ndarray
+    voluntary_rates: np.ndarray,
+    assumptions: Optional[Dict[str, Any]] = None,
+    retirement_age: Optional[int] = None,
+    schedule: Optional[SSRateSchedule] = None
 ) -> pd.DataFrame:
-    rows = []
-    for v in voluntary_rates:
-        out = replacement_rate_lss1997(age_now, salary_monthly, float(v))
-        rows.append({"voluntary_rate": float(v), "replacement_rate": out["replacement_rate"]})
-    return pd.DataFrame(rows)
+    rates = np.asarray(voluntary_rates, dtype=float)
+    out = replacement_rate_lss1997_batch(
+        age_now, salary_monthly, rates, assumptions, retirement_age=retirement_age, schedule=schedule
+    )
+    return pd.DataFrame({"voluntary_rate": rates, "replacement_rate": out["replacement_rate"]})
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from pensiones.utils.io import file_version, load_parsed
+from pensiones.utils.profiling import timed
+
+MORTALITY_FILE = "mortality_tables.json"
+# Corrección de Woolhouse: renta anual pagadera mensualmente ä(12) ≈ ä - 11/24.
+WOOLHOUSE_12 = 11.0 / 24.0
+
+_GENDER_ALIASES = {
+    "h": "H", "hombre": "H", "masculino": "H", "male": "H",
+    "m": "M", "mujer": "M", "femenino": "M", "f": "M", "female": "M",
+}
+
+def normalize_gender(gender: Any) -> str:
+    """Clave de tabla ("H"/"M") a partir de "Masculino", "Femenino", "H", "M", ..."""
+    key = _GENDER_ALIASES.get(str(gender).strip().lower())
+    if key is None:
+        raise ValueError(f"Género no reconocido: {gender!r} (usa 'H'/'Masculino' o 'M'/'Femenino').")
+    return key
+
+@dataclass(frozen=True, eq=False)
+class LifeTable:
+    """Probabilidades de muerte qx para las edades 0..max_age (q en max_age = 1)."""
+    name: str
+    qx: np.ndarray
+
+    @property
+    def max_age(self) -> int:
+        return int(self.qx.shape[0] - 1)
+
+    @property
+    def lx(self) -> np.ndarray:
+        """Sobrevivientes con l_0 = 1."""
+        return np.concatenate([[1.0], np.cumprod(1.0 - self.qx)[:-1]])
+
+def _table_qx(spec: Dict[str, Any], max_age: int) -> np.ndarray:
+    ages = np.arange(max_age + 1, dtype=float)
+    if "qx" in spec:
+        # edades anteriores a min_age usan la primera qx (no afectan rentas de retiro)
+        min_age = int(spec.get("min_age", 0))
+        given = np.asarray(spec["qx"], dtype=float)[:max_age + 1 - min_age]
+        qx = np.concatenate([np.full(min_age, given[0]), given])
+        qx = np.concatenate([qx, np.ones(max_age + 1 - len(qx))])
+    elif spec.get("law") == "gompertz_makeham":
+        A, B, c = float(spec["A"]), float(spec["B"]), float(spec["c"])
+        qx = 1.0 - np.exp(-A - B * c ** ages * (c - 1.0) / np.log(c))
+    else:
+        raise ValueError("Cada tabla necesita 'qx' o 'law': 'gompertz_makeham' con A, B y c.")
+    if np.any((qx < 0) | (qx > 1)):
+        raise ValueError("Las qx deben estar entre 0 y 1.")
+    qx[-1] = 1.0
+    return qx
+
+def parse_mortality_tables(data: Dict[str, Any]) -> Dict[str, LifeTable]:
+    max_age = int(data.get("max_age", 110))
+    tables = {}
+    for key, spec in data.get("tables", {}).items():
+        qx = _table_qx(spec, max_age)
+        qx.flags.writeable = False
+        tables[normalize_gender(key)] = LifeTable(name=str(spec.get("name", key)), qx=qx)
+    if not tables:
+        raise ValueError(f"No hay tablas en pensiones/data/{MORTALITY_FILE}")
+    return tables
+
+def load_mortality_tables() -> Dict[str, LifeTable]:
+    """Tablas por género ("H"/"M"), parseadas una vez por proceso."""
+    return load_parsed(MORTALITY_FILE, parse_mortality_tables)
+
+def _table(gender: Any) -> LifeTable:
+    key = normalize_gender(gender)
+    tables = load_mortality_tables()
+    if key not in tables:
+        raise ValueError(f"No hay tabla de mortalidad para el género '{key}'.")
+    return tables[key]
+
+@dataclass(frozen=True, eq=False)
+class Commutation:
+    """Columnas de conmutación de una vida a la tasa anual ``rate``.
+
+    Dx = v^x lx, Nx = sum_{t>=x} Dt; la renta vitalicia anticipada anual es
+    äx = Nx / Dx. Índice = edad (0..max_age).
+    """
+    gender: str
+    rate: float
+    Dx: np.ndarray
+    Nx: np.ndarray
+
+    @property
+    def annuity_due(self) -> np.ndarray:
+        return self.Nx / self.Dx
+
+@dataclass(frozen=True, eq=False)
+class JointCommutation:
+    """Renta anual anticipada sobre dos vidas (pagadera mientras vivan ambas).
+
+    ``axy[x, y]`` para edades enteras; se arma con la recursión
+    ä_xy = 1 + v p_x p_y ä_{x+1,y+1} (todas las parejas a la vez).
+    """
+    gender_x: str
+    gender_y: str
+    rate: float
+    axy: np.ndarray
+
+def _rate_key(rate: float) -> float:
+    return round(float(rate), 12)
+
+@lru_cache(maxsize=32)
+def _commutation(version: str, gender: str, rate: float) -> Commutation:
+    # la versión del archivo sólo forma parte de la llave: invalida al cambiar las tablas
+    lx = _table(gender).lx
+    v = 1.0 / (1.0 + rate)
+    Dx = v ** np.arange(lx.shape[0]) * lx
+    Nx = np.cumsum(Dx[::-1])[::-1]
+    for arr in (Dx, Nx):
+        arr.flags.writeable = False
+    return Commutation(gender=gender, rate=rate, Dx=Dx, Nx=Nx)
+
+@lru_cache(maxsize=16)
+def _joint(version: str, gender_x: str, gender_y: str, rate: float) -> JointCommutation:
+    px = 1.0 - _table(gender_x).qx
+    py = 1.0 - _table(gender_y).qx
+    v = 1.0 / (1.0 + rate)
+    n = min(px.shape[0], py.shape[0])
+    step = v * np.outer(px[:n - 1], py[:n - 1])
+    axy = np.ones((n, n))
+    # cada pasada fija una diagonal más; n pasadas llegan a la edad máxima
+    for _ in range(n - 1):
+        axy[:-1, :-1] = 1.0 + step * axy[1:, 1:]
+    axy.flags.writeable = False
+    return JointCommutation(gender_x=gender_x, gender_y=gender_y, rate=rate, axy=axy)
+
+def commutation(gender: Any, rate: float) -> Commutation:
+    """Conmutación de una vida, cacheada por (versión de tablas, género, tasa)."""
+    return _commutation(file_version(MORTALITY_FILE), normalize_gender(gender), _rate_key(rate))
+
+def joint_commutation(gender_x: Any, gender_y: Any, rate: float) -> JointCommutation:
+    """Tabla ä_xy de dos vidas, cacheada por (versión de tablas, géneros, tasa)."""
+    return _joint(file_version(MORTALITY_FILE), normalize_gender(gender_x), normalize_gender(gender_y), _rate_key(rate))
+
+def mortality_cache_info() -> Dict[str, Any]:
+    return {"commutation": _commutation.cache_info(), "joint": _joint.cache_info()}
+
+def mortality_cache_clear() -> None:
+    _commutation.cache_clear()
+    _joint.cache_clear()
+
+def _interp_single(table: np.ndarray, ages: np.ndarray) -> np.ndarray:
+    return np.interp(ages, np.arange(table.shape[0], dtype=float), table)
+
+def _interp_joint(table: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    top = table.shape[0] - 1
+    x = np.clip(x, 0.0, top)
+    y = np.clip(y, 0.0, top)
+    x0 = np.minimum(np.floor(x).astype(np.intp), top - 1)
+    y0 = np.minimum(np.floor(y).astype(np.intp), top - 1)
+    fx, fy = x - x0, y - y0
+    return ((1 - fx) * (1 - fy) * table[x0, y0] + fx * (1 - fy) * table[x0 + 1, y0]
+            + (1 - fx) * fy * table[x0, y0 + 1] + fx * fy * table[x0 + 1, y0 + 1])
+
+GENDERS = ("H", "M")
+
+def _gender_codes(genders, shape) -> np.ndarray:
+    """Índices en ``GENDERS`` (0 = H, 1 = M); se normalizan sólo los valores distintos."""
+    g = np.broadcast_to(np.asarray(genders, dtype=object), shape)
+    codes, uniq = pd.factorize(g.ravel())  # por hash: mucho más rápido que ordenar cadenas
+    lookup = np.array([GENDERS.index(normalize_gender(v)) for v in uniq], dtype=np.int8)
+    return lookup[codes].reshape(shape)
+
+def _by_gender(genders, shape, compute) -> np.ndarray:
+    """Aplica ``compute(gender, mask)`` por grupo de género (una pasada por género)."""
+    g = np.asarray(genders, dtype=object)
+    if g.ndim == 0:
+        return np.broadcast_to(compute(g.item(), None), shape).astype(float)
+    codes = _gender_codes(g, shape)
+    out = np.empty(shape)
+    for code in np.flatnonzero(np.bincount(codes.ravel(), minlength=len(GENDERS))):
+        mask = codes == code
+        out[mask] = compute(GENDERS[code], mask)
+    return out
+
+def _to_monthly(annual_due: np.ndarray, monthly: bool) -> np.ndarray:
+    # valor presente de 1 al mes (12 pagos de 1 al año)
+    return np.asarray(12.0 * (annual_due - WOOLHOUSE_12) if monthly else annual_due)
+
+@timed()
+def life_annuity_factor(ages, gender, rate: float, monthly: bool = True) -> np.ndarray:
+    """Renta vitalicia anticipada äx para arreglos de edades (interpolación lineal
+    entre edades enteras). Con ``monthly=True`` es el valor presente de 1 al mes."""
+    x = np.asarray(ages, dtype=float)
+
+    def compute(g, mask):
+        ax = commutation(g, rate).annuity_due
+        return _interp_single(ax, x if mask is None else x[mask])
+
+    return _to_monthly(_by_gender(gender, x.shape, compute), monthly)
+
+@timed()
+def joint_life_annuity_factor(age_x, age_y, gender_x, gender_y, rate: float, monthly: bool = True) -> np.ndarray:
+    """Renta anticipada mientras vivan ambos (ä_xy), vectorizada sobre parejas."""
+    x, y = np.broadcast_arrays(np.asarray(age_x, dtype=float), np.asarray(age_y, dtype=float))
+    pairs = len(GENDERS) * _gender_codes(gender_x, x.shape) + _gender_codes(gender_y, x.shape)
+    out = np.empty(x.shape)
+    for pair in np.flatnonzero(np.bincount(pairs.ravel(), minlength=len(GENDERS) ** 2)):
+        mask = pairs == pair
+        gx, gy = divmod(int(pair), len(GENDERS))
+        table = joint_commutation(GENDERS[gx], GENDERS[gy], rate).axy
+        out[mask] = _interp_joint(table, x[mask], y[mask])
+    return _to_monthly(out, monthly)
+
+@timed()
+def pension_annuity_factor(
+    age,
+    gender,
+    rate: float,
+    partner_age=None,
+    gender_partner=None,
+    survivor_fraction: float = 0.9,
+    monthly: bool = True
+) -> np.ndarray:
+    """Factor para convertir un saldo en pensión vitalicia con pensión de sobrevivencia.
+
+    factor = ä_x + s · (ä_y - ä_xy): la pensión completa mientras viva el
+    pensionado y la fracción ``survivor_fraction`` a la pareja (edad y) después.
+    Donde ``partner_age`` es NaN/None sólo se usa ä_x.
+    """
+    x = np.asarray(age, dtype=float)
+    single = life_annuity_factor(x, gender, rate, monthly=monthly)
+    if partner_age is None or gender_partner is None:
+        return single
+    y = np.broadcast_to(np.asarray(partner_age, dtype=float), single.shape)
+    has = ~np.isnan(y)
+    if not has.any():
+        return single
+    gy = np.broadcast_to(np.asarray(gender_partner, dtype=object), single.shape)
+    gx = np.broadcast_to(np.asarray(gender, dtype=object), single.shape)
+    xb = np.broadcast_to(x, single.shape)
+    ay = life_annuity_factor(y[has], gy[has], rate, monthly=monthly)
+    axy = joint_life_annuity_factor(xb[has], y[has], gx[has], gy[has], rate, monthly=monthly)
+    out = np.array(single, dtype=float)
+    out[has] += float(survivor_fraction) * (ay - axy)
+    return out
+
+def life_expectancy(ages, gender) -> np.ndarray:
+    """Esperanza de vida completa aproximada (curtate + 1/2)."""
+    lx = _table(gender).lx
+    tail = np.cumsum(lx[::-1])[::-1]
+    ex = np.where(lx > 0, (tail - lx) / np.where(lx > 0, lx, 1.0), 0.0) + 0.5
+    return _interp_single(ex, np.asarray(ages, dtype=float))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from pensiones.core.isr_2026 import ISRPiecewise, load_isr_2026_piecewise
+from pensiones.core.ss_1997 import SSRateSchedule, load_ss_1997_schedule, ss_contributions_batch
+from pensiones.utils.io import file_version
+from pensiones.utils.profiling import timed
+
+@dataclass(frozen=True, eq=False)
+class NetIncomeCurve:
+    """Neto mensual (bruto - ISR - cuotas SS del trabajador) como función lineal por
+    tramos del bruto, guardada por sus nodos ``gross`` / ``net``.
+
+    Los nodos son la unión de los límites de la tarifa ISR y de los cortes de las
+    bases de SS (SBC mínimo, 3 UMA y tope), llevados a ingreso bruto con
+    ``SBC diario = bruto * sbc_factor / días``. Entre nodos el neto es exactamente
+    lineal (el tramo ``j`` empieza en ``gross[j]`` con pendiente ``slope[j]``; el
+    último no tiene fin), así que invertirlo es despejar una recta.
+    """
+    gross: np.ndarray
+    net: np.ndarray  # neto en cada nodo (valor por la derecha)
+    slope: np.ndarray  # pendiente del neto en el tramo que empieza en cada nodo
+    days_in_month: int
+    sbc_factor: float
+
+    def __len__(self) -> int:
+        return int(self.gross.shape[0])
+
+    def gross_for(self, target_net) -> np.ndarray:
+        t = np.asarray(target_net, dtype=float)
+        j = np.clip(np.searchsorted(self.net, t, side="right") - 1, 0, len(self) - 1)
+        gross = self.gross[j] + (t - self.net[j]) / self.slope[j]
+        # netos que caen en un salto de centavos de la tarifa: fin del tramo
+        end = np.append(self.gross[1:], np.inf)[j]
+        return np.minimum(gross, end)
+
+def _net(gross: np.ndarray, isr: ISRPiecewise, schedule: SSRateSchedule, days: int, sbc_factor: float) -> np.ndarray:
+    ss = ss_contributions_batch(gross * sbc_factor / days, days, schedule)["Trabajador"]
+    return gross - isr(gross) - ss
+
+def compile_net_income_curve(
+    days_in_month: int = 30,
+    sbc_factor: float = 1.0,
+    isr: Optional[ISRPiecewise] = None,
+    schedule: Optional[SSRateSchedule] = None
+) -> NetIncomeCurve:
+    """Arma la curva bruto -> neto para unos días del mes y factor de integración del SBC."""
+    if days_in_month <= 0 or sbc_factor <= 0:
+        raise ValueError("Los días del mes y el factor de SBC deben ser positivos.")
+    if isr is None:
+        isr = load_isr_2026_piecewise()
+    if schedule is None:
+        schedule = load_ss_1997_schedule()
+
+    uma_month = schedule.uma_daily * days_in_month
+    ss_breaks = np.array([schedule.sbc_min_uma, 3.0, schedule.sbc_max_uma]) * uma_month / sbc_factor
+    gross = np.unique(np.concatenate([[0.0], isr.breakpoints, ss_breaks]))
+    gross = gross[gross >= 0]
+    # un punto interior por tramo (el último tramo no tiene fin) para la pendiente
+    inner = np.append(0.5 * (gross[:-1] + gross[1:]), 2.0 * gross[-1] + 1.0)
+    values = _net(np.concatenate([gross, inner]), isr, schedule, days_in_month, sbc_factor)
+    net, net_inner = values[:len(gross)], values[len(gross):]
+    slope = (net_inner - net) / (inner - gross)
+    if np.any(slope <= 0):
+        raise ValueError("El neto no es creciente en el bruto; revisa tasas ISR/SS (deben sumar < 100%).")
+
+    net = np.maximum.accumulate(net)
+    for arr in (gross, net, slope):
+        arr.flags.writeable = False
+    return NetIncomeCurve(
+        gross=gross,
+        net=net,
+        slope=slope,
+        days_in_month=int(days_in_month),
+        sbc_factor=float(sbc_factor),
+    )
+
+@lru_cache(maxsize=64)
+def _default_curve(isr_version: str, ss_version: str, days_in_month: int, sbc_factor: float) -> NetIncomeCurve:
+    # las versiones sólo forman parte de la llave: invalidan al cambiar las tablas
+    return compile_net_income_curve(days_in_month, sbc_factor)
+
+@timed()
+def gross_from_net_batch(
+    target_net,
+    days_in_month: int = 30,
+    sbc_factor: float = 1.0,
+    isr: Optional[ISRPiecewise] = None,
+    schedule: Optional[SSRateSchedule] = None,
+    detail: bool = False
+) -> Dict[str, np.ndarray]:
+    """Sueldo bruto mensual que deja un neto ``target_net`` (arreglo) después de ISR
+    y cuotas SS del trabajador.
+
+    Devuelve columnas gross, net (verificado), isr, bracket (tramo ISR),
+    sbc_daily_capped, Patron, Trabajador, Gobierno y Total de SS (más
+    ``base_daily``/``detail`` por componente con ``detail=True``).
+    """
+    target = np.asarray(target_net, dtype=float)
+    if np.any(target < 0):
+        raise ValueError("El neto objetivo no puede ser negativo.")
+
+    if isr is None and schedule is None:
+        curve = _default_curve(
+            file_version("isr_2026_tarifa.json"), file_version("ss_1997_rates.json"),
+            int(days_in_month), float(sbc_factor),
+        )
+        isr = load_isr_2026_piecewise()
+        schedule = load_ss_1997_schedule()
+    else:
+        isr = isr if isr is not None else load_isr_2026_piecewise()
+        schedule = schedule if schedule is not None else load_ss_1997_schedule()
+        curve = compile_net_income_curve(days_in_month, sbc_factor, isr, schedule)
+
+    gross = np.maximum(curve.gross_for(target), 0.0)
+    ss = ss_contributions_batch(gross * curve.sbc_factor / curve.days_in_month, curve.days_in_month, schedule, detail=detail)
+    isr_amount = isr(gross)
+    out = {
+        "gross": gross,
+        "net": gross - isr_amount - ss["Trabajador"],
+        "isr": isr_amount,
+        "bracket": isr.segment(gross),
+    }
+    out.update(ss)
+    return out
+
+def gross_from_net(
+    target_net: float,
+    days_in_month: int = 30,
+    sbc_factor: float = 1.0
+) -> Dict[str, Any]:
+    """Versión escalar de ``gross_from_net_batch`` (dict de floats)."""
+    out = gross_from_net_batch(np.array([float(target_net)]), days_in_month, sbc_factor)
+    res = {k: float(v[0]) for k, v in out.items()}
+    res["bracket"] = int(out["bracket"][0])
+    return res
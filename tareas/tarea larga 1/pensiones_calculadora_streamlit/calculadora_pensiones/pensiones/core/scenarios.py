@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.lss1997_ret import (
+    DAYS_PER_MONTH,
+    RCV_INSURANCE,
+    growth_index,
+    monthly_rate,
+    rcv_contribution_rate,
+    retirement_annuity_factor,
+)
+from pensiones.core.ss_1997 import SSRateSchedule, load_ss_1997_schedule
+from pensiones.utils.io import load_params
+from pensiones.utils.profiling import timed, timer
+
+# Entradas por trabajador que acepta el motor (mismos nombres que en el batch).
+POPULATION_COLUMNS = ("age_now", "salary_monthly", "voluntary_rate", "balance_now", "retirement_age")
+# Bytes de resultados de etapa guardados por motor: las etapas hasta aportaciones
+# son matrices trabajadores × meses (~16 MB cada una con 4096 trabajadores y 40 años).
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_CHUNK_SIZE = 4096
+
+@dataclass(frozen=True)
+class Stage:
+    """Etapa del cálculo: ``func(engine, params, upstream)`` -> dict de arreglos.
+
+    ``params`` son las llaves de los supuestos que lee y ``deps`` las etapas de las
+    que depende; la llave de caché sólo incluye eso, así que cambiar un supuesto
+    recalcula únicamente las etapas que lo leen y las que dependen de ellas.
+    """
+    name: str
+    params: Tuple[str, ...]
+    deps: Tuple[str, ...]
+    func: Callable[["ScenarioEngine", Dict[str, Any], Dict[str, Dict[str, np.ndarray]]], Dict[str, np.ndarray]]
+
+def _months(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    ret_age = engine.retirement_age
+    if ret_age is None:
+        default = p["retirement_age_default"]
+        ret_age = np.full(engine.n, float(65 if default is None else default))
+    months = np.maximum(0, np.rint((ret_age - engine.age_now) * 12)).astype(np.intp)
+    horizon = int(months.max()) if engine.n else 0
+    return {"retirement_age": ret_age, "months": months, "active": np.arange(horizon)[None, :] < months[:, None]}
+
+def _wage_path(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    months = up["months"]["months"]
+    horizon = up["months"]["active"].shape[1]
+    W = growth_index(monthly_rate(p["wage_growth_annual"] or 0.0), horizon)
+    return {"wage": engine.salary[:, None] * W[None, :horizon], "final_salary": engine.salary * W[months]}
+
+def _sbc_cap(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    uma_month = engine.schedule.uma_daily * DAYS_PER_MONTH
+    base = np.clip(up["wage_path"]["wage"], engine.schedule.sbc_min_uma * uma_month, engine.schedule.sbc_max_uma * uma_month)
+    return {"mandatory_base": base}
+
+def _contributions(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    rcv_rate = rcv_contribution_rate(engine.schedule, p["rcv_insurance"] or RCV_INSURANCE)
+    density = float(1.0 if p["density_of_contribution"] is None else p["density_of_contribution"])
+    weight = up["months"]["active"] * density
+    return {
+        "mandatory": rcv_rate * up["sbc_cap"]["mandatory_base"] * weight,
+        "voluntary_unit": up["wage_path"]["wage"] * weight,  # aportación por punto de tasa voluntaria
+    }
+
+def _accumulation(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    months = up["months"]["months"]
+    horizon = up["months"]["active"].shape[1]
+    A = growth_index(monthly_rate(p["real_return_annual"] or 0.0), horizon)
+    A_T = A[months]
+    # cada aportación (cierre del mes t) crece hasta el retiro con A[T] / A[t+1]
+    growth = A_T[:, None] / A[None, 1:]
+    mandatory = (up["contributions"]["mandatory"] * growth).sum(axis=1) + engine.balance_now * A_T
+    voluntary_factor = (up["contributions"]["voluntary_unit"] * growth).sum(axis=1)
+    return {
+        "balance_mandatory": mandatory,
+        "voluntary_factor": voluntary_factor,
+        "balance_voluntary": engine.voluntary_rate * voluntary_factor,
+    }
+
+def _annuitization(engine: "ScenarioEngine", p: Dict[str, Any], up) -> Dict[str, np.ndarray]:
+    acc = up["accumulation"]
+    annuity = np.broadcast_to(
+        retirement_annuity_factor(up["months"]["retirement_age"], {k: v for k, v in p.items() if v is not None}, engine.age_now),
+        (engine.n,),
+    )
+    balance = acc["balance_mandatory"] + acc["balance_voluntary"]
+    pension = balance / annuity
+    final_salary = up["wage_path"]["final_salary"]
+    positive = final_salary > 0
+    safe = np.where(positive, final_salary, 1.0)
+    return {
+        "replacement_rate": np.where(positive, pension / safe, 0.0),
+        "pension_monthly": pension,
+        "balance": balance,
+        "annuity_factor": annuity,
+        "rr_per_voluntary": np.where(positive, acc["voluntary_factor"] / annuity / safe, 0.0),
+    }
+
+# En orden topológico. Las llaves de supuestos son las de lss1997_assumptions.json.
+STAGES: Tuple[Stage, ...] = (
+    Stage("months", ("retirement_age_default",), (), _months),
+    Stage("wage_path", ("wage_growth_annual",), ("months",), _wage_path),
+    Stage("sbc_cap", (), ("wage_path",), _sbc_cap),
+    Stage("contributions", ("rcv_insurance", "density_of_contribution"), ("months", "wage_path", "sbc_cap"), _contributions),
+    Stage("accumulation", ("real_return_annual",), ("months", "contributions"), _accumulation),
+    Stage(
+        "annuitization",
+        ("real_return_annual", "annuity_years", "gender", "partner_age", "gender_partner", "survivor_pension_fraction"),
+        ("months", "wage_path", "accumulation"),
+        _annuitization,
+    ),
+)
+
+def _canon(value: Any) -> Any:
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        return round(float(value), 12)
+    return value
+
+def _nbytes(result: Dict[str, np.ndarray]) -> int:
+    return sum(np.asarray(v).nbytes for v in result.values())
+
+class ScenarioEngine:
+    """Cálculo LSS 1997 por etapas para una población fija, con caché por etapa.
+
+    La llave de cada etapa es (nombre, valores de los supuestos que lee, llaves
+    de sus etapas previas): al correr otro escenario sólo se recalculan las
+    etapas cuyo supuesto cambió y las que dependen de ellas (p.ej. cambiar
+    ``real_return_annual`` reutiliza trayectoria salarial, topes y aportaciones).
+    El resultado de ``run`` coincide con ``replacement_rate_lss1997_batch``.
+    """
+
+    def __init__(
+        self,
+        age_now,
+        salary_monthly,
+        voluntary_rate=0.0,
+        balance_now=0.0,
+        retirement_age=None,
+        schedule: Optional[SSRateSchedule] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        arrays = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(age_now, dtype=float)),
+            np.asarray(salary_monthly, dtype=float),
+            np.asarray(voluntary_rate, dtype=float),
+            np.asarray(balance_now, dtype=float),
+        )
+        self.age_now, self.salary, self.voluntary_rate, self.balance_now = (a.ravel() for a in arrays)
+        self.n = self.age_now.shape[0]
+        self.retirement_age = None if retirement_age is None else np.broadcast_to(
+            np.asarray(retirement_age, dtype=float), (self.n,))
+        self.schedule = schedule if schedule is not None else load_ss_1997_schedule()
+        self.max_bytes = max_bytes
+        self._cache: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+        self._cache_bytes = 0
+        self.computed = {s.name: 0 for s in STAGES}
+        self.reused = {s.name: 0 for s in STAGES}
+
+    @staticmethod
+    def stage_key(stage: Stage, params: Dict[str, Any], upstream_keys: Sequence[str]) -> str:
+        payload = repr((stage.name, tuple((k, _canon(params[k])) for k in stage.params), tuple(upstream_keys)))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def run(self, assumptions: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """Resultados por trabajador (arreglos (n,)) para un juego de supuestos."""
+        keys: Dict[str, str] = {}
+        outputs: Dict[str, Dict[str, np.ndarray]] = {}
+        for stage in STAGES:
+            params = {k: assumptions.get(k) for k in stage.params}
+            key = self.stage_key(stage, params, [keys[d] for d in stage.deps])
+            keys[stage.name] = key
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.reused[stage.name] += 1
+                outputs[stage.name] = cached
+                continue
+            with timer(f"scenarios.{stage.name}"):
+                result = stage.func(self, params, {d: outputs[d] for d in stage.deps})
+            self.computed[stage.name] += 1
+            outputs[stage.name] = self._cache[key] = result
+            self._cache_bytes += _nbytes(result)
+            # LRU por tamaño; lo desalojado en esta corrida sigue vivo en ``outputs``
+            while self._cache_bytes > self.max_bytes and self._cache:
+                self._cache_bytes -= _nbytes(self._cache.popitem(last=False)[1])
+
+        out = dict(outputs["annuitization"])
+        out.update(
+            balance_mandatory=outputs["accumulation"]["balance_mandatory"],
+            balance_voluntary=outputs["accumulation"]["balance_voluntary"],
+            final_salary=outputs["wage_path"]["final_salary"],
+            retirement_age=outputs["months"]["retirement_age"],
+        )
+        return out
+
+    def stage_stats(self) -> pd.DataFrame:
+        """Cuántas veces se calculó / reutilizó cada etapa."""
+        return pd.DataFrame({
+            "stage": [s.name for s in STAGES],
+            "computed": [self.computed[s.name] for s in STAGES],
+            "reused": [self.reused[s.name] for s in STAGES],
+        })
+
+def vary(field: str, values: Iterable[Any], include_base: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Escenarios que cambian un solo supuesto: ``{"field=valor": {field: valor}}``."""
+    scenarios: Dict[str, Dict[str, Any]] = {"base": {}} if include_base else {}
+    for v in values:
+        scenarios[f"{field}={v}"] = {field: v}
+    return scenarios
+
+def _population_arrays(population: Any) -> Dict[str, Any]:
+    if isinstance(population, pd.DataFrame):
+        missing = [c for c in ("age_now", "salary_monthly") if c not in population.columns]
+        if missing:
+            raise ValueError(f"Faltan las columnas {missing} en la población.")
+        return {c: population[c].to_numpy(dtype=float) for c in POPULATION_COLUMNS if c in population.columns}
+    return {c: np.asarray(population[c], dtype=float) for c in POPULATION_COLUMNS if c in population}
+
+@timed()
+def compare_scenarios(
+    population: Any,
+    scenarios: Mapping[str, Mapping[str, Any]],
+    base_assumptions: Optional[Mapping[str, Any]] = None,
+    target_rr: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    percentiles: Sequence[float] = (10, 50, 90),
+    return_engines: bool = False,
+    schedule: Optional[SSRateSchedule] = None
+) -> Any:
+    """Tabla comparativa de escenarios (una fila por escenario) para una población.
+
+    ``population`` es un DataFrame (o dict de arreglos) con ``age_now`` y
+    ``salary_monthly`` y, opcionales, ``voluntary_rate``, ``balance_now`` y
+    ``retirement_age``. Cada escenario son cambios sobre ``base_assumptions``
+    (por omisión ``lss1997_assumptions.json``; cuotas SS de ``schedule`` o
+    ``ss_1997_rates.json``). La población se procesa en
+    bloques de ``chunk_size`` trabajadores (memoria acotada); dentro de cada
+    bloque los escenarios comparten las etapas que no cambian.
+
+    Columnas: scenario, changes, rr_mean, rr_pXX, pension_mean, balance_mean,
+    share_at_target (si hay ``target_rr``) y rr_mean_delta (contra el primer escenario).
+    Con ``return_engines=True`` devuelve además las estadísticas de etapas sumadas.
+    """
+    if base_assumptions is None:
+        base_assumptions = load_params("lss1997_assumptions.json")
+    if not scenarios:
+        raise ValueError("No hay escenarios que comparar.")
+    pop = _population_arrays(population)
+    n = len(pop["age_now"])
+    resolved = {name: {**base_assumptions, **changes} for name, changes in scenarios.items()}
+
+    rr = {name: np.empty(n) for name in scenarios}
+    pension_sum = dict.fromkeys(scenarios, 0.0)
+    balance_sum = dict.fromkeys(scenarios, 0.0)
+    stats = None
+    for a in range(0, max(n, 1), chunk_size):
+        sl = slice(a, a + chunk_size)
+        engine = ScenarioEngine(
+            pop["age_now"][sl], pop["salary_monthly"][sl],
+            voluntary_rate=pop["voluntary_rate"][sl] if "voluntary_rate" in pop else 0.0,
+            balance_now=pop["balance_now"][sl] if "balance_now" in pop else 0.0,
+            retirement_age=pop["retirement_age"][sl] if "retirement_age" in pop else None,
+            schedule=schedule,
+        )
+        for name, assumptions in resolved.items():
+            out = engine.run(assumptions)
+            rr[name][sl] = out["replacement_rate"]
+            pension_sum[name] += float(out["pension_monthly"].sum())
+            balance_sum[name] += float(out["balance"].sum())
+        chunk_stats = engine.stage_stats().set_index("stage")
+        stats = chunk_stats if stats is None else stats + chunk_stats
+
+    rows = []
+    for name, changes in scenarios.items():
+        r = rr[name]
+        row: Dict[str, Any] = {
+            "scenario": name,
+            "changes": ", ".join(f"{k}={v}" for k, v in changes.items()) or "(base)",
+            "rr_mean": float(r.mean()) if n else float("nan"),
+        }
+        for q, v in zip(percentiles, np.percentile(r, percentiles) if n else [float("nan")] * len(percentiles)):
+            row[f"rr_p{q:g}"] = float(v)
+        row["pension_mean"] = pension_sum[name] / n if n else float("nan")
+        row["balance_mean"] = balance_sum[name] / n if n else float("nan")
+        if target_rr is not None:
+            row["share_at_target"] = float((r >= target_rr).mean()) if n else float("nan")
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    table["rr_mean_delta"] = table["rr_mean"] - table["rr_mean"].iloc[0]
+    if return_engines:
+        return table, stats.reset_index()
+    return table
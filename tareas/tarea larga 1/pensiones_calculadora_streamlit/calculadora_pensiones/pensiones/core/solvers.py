@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+_EPS = np.finfo(float).eps
+
+def brent(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    fa: Optional[float] = None,
+    fb: Optional[float] = None,
+    xtol: float = 1e-12,
+    ftol: float = 0.0,
+    max_iter: int = 100
+) -> Dict[str, Any]:
+    """Raíz de ``f`` en [a, b] con el método de Brent (secante / cuadrática inversa
+    con bisección como respaldo).
+
+    ``fa``/``fb`` permiten reutilizar evaluaciones ya hechas en los extremos.
+    Devuelve un dict con x, fx, evals (evaluaciones de ``f``) y converged.
+    """
+    evals = 0
+    if fa is None:
+        fa = f(a)
+        evals += 1
+    if fb is None:
+        fb = f(b)
+        evals += 1
+    if fa * fb > 0:
+        raise ValueError("La raíz no está acotada en [a, b].")
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol1 = 2.0 * _EPS * abs(b) + 0.5 * xtol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or abs(fb) <= ftol:
+            return {"x": b, "fx": fb, "evals": evals, "converged": True}
+
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # secante
+                p = 2.0 * xm * s
+                q = 1.0 - s
+            else:
+                # interpolación cuadrática inversa
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * xm * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * xm * q - abs(tol1 * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = xm
+        else:
+            d = e = xm
+
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else math.copysign(tol1, xm)
+        fb = f(b)
+        evals += 1
+
+    return {"x": b, "fx": fb, "evals": evals, "converged": False}
+
+def solve_monotone(
+    f: Callable[[float], float],
+    target: float,
+    lo: float,
+    hi: float,
+    tol: float = 1e-4,
+    max_iter: int = 60,
+    linear: bool = False
+) -> Dict[str, Any]:
+    """Encuentra x en [lo, hi] con f(x) = target para f monótona.
+
+    - Si la meta queda fuera de [f(lo), f(hi)] devuelve el extremo más cercano
+      (``method="bound"``), igual que lo hacía la bisección.
+    - Con ``linear=True`` (f afín en x, p.ej. el saldo en la tasa voluntaria)
+      resuelve con las dos evaluaciones de los extremos.
+    - En otro caso usa Brent reutilizando esas dos evaluaciones.
+
+    ``tol`` es sobre |f(x) - target|. Devuelve x, fx, evals, converged, method.
+    """
+    f_lo = f(lo)
+    f_hi = f(hi)
+    g_lo = f_lo - target
+    g_hi = f_hi - target
+
+    if abs(g_lo) <= tol:
+        return {"x": lo, "fx": f_lo, "evals": 2, "converged": True, "method": "bound"}
+    if abs(g_hi) <= tol:
+        return {"x": hi, "fx": f_hi, "evals": 2, "converged": True, "method": "bound"}
+    if g_lo * g_hi > 0:
+        # meta no alcanzable en el rango
+        if abs(g_lo) <= abs(g_hi):
+            return {"x": lo, "fx": f_lo, "evals": 2, "converged": False, "method": "bound"}
+        return {"x": hi, "fx": f_hi, "evals": 2, "converged": False, "method": "bound"}
+
+    if linear:
+        x = lo - g_lo * (hi - lo) / (g_hi - g_lo)
+        return {"x": x, "fx": float(target), "evals": 2, "converged": True, "method": "linear"}
+
+    out = brent(lambda x: f(x) - target, lo, hi, fa=g_lo, fb=g_hi, ftol=tol, max_iter=max_iter)
+    return {
+        "x": out["x"],
+        "fx": out["fx"] + target,
+        "evals": out["evals"] + 2,
+        "converged": out["converged"],
+        "method": "brent",
+    }
+
+def solve_monotone_batch(
+    f: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    targets: np.ndarray,
+    lo=0.0,
+    hi=1.0,
+    tol: float = 1e-4,
+    xtol: float = 1e-12,
+    max_iter: int = 60,
+    linear: bool = False
+) -> Dict[str, np.ndarray]:
+    """Versión por lotes de ``solve_monotone``: una meta (y un f monótono) por trabajador.
+
+    ``f(x, idx)`` evalúa el modelo de los trabajadores ``idx`` en sus valores ``x``
+    (dos arreglos del mismo tamaño); en cada iteración sólo se evalúan los que
+    aún no convergen. Usa regula falsi (variante Illinois) con bisección como
+    respaldo, todo vectorizado.
+
+    Devuelve arreglos x, fx, evals, converged (máscara por trabajador) y bracketed
+    (False si la meta quedó fuera del rango y se devolvió el extremo más cercano).
+    """
+    targets = np.asarray(targets, dtype=float)
+    n = targets.shape[0]
+    idx_all = np.arange(n)
+    a = np.broadcast_to(np.asarray(lo, dtype=float), (n,)).copy()
+    b = np.broadcast_to(np.asarray(hi, dtype=float), (n,)).copy()
+
+    fa = np.asarray(f(a, idx_all), dtype=float)
+    fb = np.asarray(f(b, idx_all), dtype=float)
+    ga = fa - targets
+    gb = fb - targets
+
+    x = np.where(np.abs(ga) <= np.abs(gb), a, b)
+    fx = np.where(np.abs(ga) <= np.abs(gb), fa, fb)
+    evals = np.full(n, 2, dtype=int)
+    converged = (np.abs(ga) <= tol) | (np.abs(gb) <= tol)
+    bracketed = converged | (ga * gb < 0)
+    active = bracketed & ~converged
+
+    if linear:
+        ids = np.nonzero(active)[0]
+        x[ids] = a[ids] - ga[ids] * (b[ids] - a[ids]) / (gb[ids] - ga[ids])
+        fx[ids] = targets[ids]
+        converged[ids] = True
+        return {"x": x, "fx": fx, "evals": evals, "converged": converged, "bracketed": bracketed}
+
+    side = np.zeros(n, dtype=int)  # último extremo reemplazado: -1 = a, +1 = b
+    for _ in range(max_iter):
+        ids = np.nonzero(active)[0]
+        if ids.size == 0:
+            break
+        A, B, GA, GB = a[ids], b[ids], ga[ids], gb[ids]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            C = (A * GB - B * GA) / (GB - GA)
+        lo_ab, hi_ab = np.minimum(A, B), np.maximum(A, B)
+        bad = ~np.isfinite(C) | (C <= lo_ab) | (C >= hi_ab)
+        C = np.where(bad, 0.5 * (A + B), C)
+
+        FC = np.asarray(f(C, ids), dtype=float)
+        GC = FC - targets[ids]
+        evals[ids] += 1
+        x[ids] = C
+        fx[ids] = FC
+
+        done = (np.abs(GC) <= tol) | (np.abs(B - A) <= xtol)
+        converged[ids] = done
+
+        # reemplaza el extremo con el mismo signo; Illinois: si se repite el
+        # mismo lado, se reduce a la mitad el valor del extremo que se conserva
+        same_b = GC * GB > 0
+        repeat_b = same_b & (side[ids] == 1)
+        repeat_a = ~same_b & (side[ids] == -1)
+        b[ids] = np.where(same_b, C, B)
+        gb[ids] = np.where(same_b, GC, np.where(repeat_a, 0.5 * GB, GB))
+        a[ids] = np.where(same_b, A, C)
+        ga[ids] = np.where(same_b, np.where(repeat_b, 0.5 * GA, GA), GC)
+        side[ids] = np.where(same_b, 1, -1)
+
+        active[ids] = ~done
+
+    return {"x": x, "fx": fx, "evals": evals, "converged": converged, "bracketed": bracketed}
@@ -1,85 +1,252 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from pensiones.utils.io import load_json
+from pensiones.utils.io import load_parsed
+from pensiones.utils.profiling import timed
 
-def _cap_sbc(sbc_daily: float, uma_daily: float, min_uma: float, max_uma: float) -> float:
-    # capea SBC entre min y max UMA
-    sbc_min = min_uma * uma_daily
-    sbc_max = max_uma * uma_daily
-    return max(sbc_min, min(sbc_daily, sbc_max))
+# Bases de cotización soportadas (índice = columna en la matriz de bases diarias).
+BASE_KINDS: Tuple[str, ...] = ("SBC", "UMA", "SBC_excess_3UMA")
+# Aportantes (índice = columna en la matriz de tasas).
+PAYERS: Tuple[str, ...] = ("Patron", "Trabajador", "Gobierno")
 
-def ss_contributions_monthly(
-    sbc_daily: float,
-    days_in_month: int = 30
-) -> Dict[str, Any]:
-    """Calcula contribuciones mensuales a seguridad social (incluye INFONAVIT)
-    desglosadas por seguro / componente y por aportante (patrón, trabajador, gobierno).
+@dataclass(frozen=True, eq=False)
+class SSRateSchedule:
+    """Tasas IMSS + INFONAVIT compiladas: una fila por componente."""
+    insurance: Tuple[str, ...]
+    component: Tuple[str, ...]
+    base: Tuple[str, ...]  # etiqueta tal cual viene en el JSON
+    base_kind: np.ndarray  # índice en BASE_KINDS (base custom -> SBC)
+    rates: np.ndarray  # (componentes, 3): patrón, trabajador, gobierno
+    uma_daily: float
+    sbc_min_uma: float
+    sbc_max_uma: float
 
-    *El detalle de tasas y bases se toma de pensiones/data/ss_1997_rates.json*
+    def __len__(self) -> int:
+        return len(self.component)
+
+class SSContributions:
+    """Resultado compacto de cuotas SS: montos por componente y aportante en un
+    arreglo ``amounts`` de forma (componentes, 3) para un trabajador o
+    (trabajadores, componentes, 3) para un lote, más las etiquetas del
+    ``schedule`` (compartidas, no se copian).
+
+    El DataFrame de detalle sólo se arma al llamar ``to_frame``.
     """
-    data = load_json("ss_1997_rates.json")
+    __slots__ = ("schedule", "sbc_daily_capped", "days_in_month", "base_daily", "amounts")
+
+    def __init__(self, schedule: "SSRateSchedule", sbc_daily_capped, days_in_month, base_daily, amounts) -> None:
+        self.schedule = schedule
+        self.sbc_daily_capped = sbc_daily_capped
+        self.days_in_month = days_in_month
+        self.base_daily = base_daily
+        self.amounts = amounts
+
+    @property
+    def batched(self) -> bool:
+        return self.amounts.ndim == 3
+
+    def __len__(self) -> int:
+        return int(self.amounts.shape[0]) if self.batched else 1
+
+    def __getitem__(self, i: int) -> "SSContributions":
+        if not self.batched:
+            raise TypeError("El resultado es de un solo trabajador.")
+        days = self.days_in_month
+        return SSContributions(
+            self.schedule,
+            float(self.sbc_daily_capped[i]),
+            days if np.ndim(days) == 0 else days[i],
+            self.base_daily[i],
+            self.amounts[i],
+        )
+
+    def payer(self, name: str):
+        """Total de un aportante (``Patron``, ``Trabajador``, ``Gobierno`` o ``Total``)."""
+        if name == "Total":
+            out = self.amounts.sum(axis=(-2, -1))
+        else:
+            out = self.amounts[..., PAYERS.index(name)].sum(axis=-1)
+        return float(out) if not self.batched else out
+
+    @property
+    def totals(self) -> Dict[str, Any]:
+        return {name: self.payer(name) for name in PAYERS + ("Total",)}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Detalle por seguro / componente (mismas columnas que ``ss_contributions_monthly``)."""
+        if self.batched:
+            raise TypeError("to_frame es por trabajador: usa resultado[i].to_frame().")
+        amounts = self.amounts
+        return pd.DataFrame({
+            "Seguro": list(self.schedule.insurance),
+            "Componente": list(self.schedule.component),
+            "Base": list(self.schedule.base),
+            "Base_diaria": self.base_daily,
+            "Patron": amounts[:, 0],
+            "Trabajador": amounts[:, 1],
+            "Gobierno": amounts[:, 2],
+            "Total": amounts[:, 0] + amounts[:, 1] + amounts[:, 2],
+        })
+
+    @classmethod
+    def stack(cls, results: Sequence["SSContributions"]) -> "SSContributions":
+        """Une resultados (del mismo ``schedule``) en un lote con un arreglo contiguo."""
+        if not results:
+            raise ValueError("No hay resultados que unir.")
+        schedule = results[0].schedule
+        if any(r.schedule is not schedule for r in results):
+            raise ValueError("Sólo se pueden unir resultados calculados con el mismo schedule.")
+
+        def cat(values):
+            return np.concatenate([np.atleast_1d(v) for v in values])
+
+        def cat_rows(values, ndim):
+            return np.ascontiguousarray(np.concatenate([v if v.ndim == ndim else v[None] for v in values]))
+
+        return cls(
+            schedule,
+            cat([r.sbc_daily_capped for r in results]),
+            cat([np.broadcast_to(r.days_in_month, (len(r),)) for r in results]),
+            cat_rows([r.base_daily for r in results], 2),
+            cat_rows([r.amounts for r in results], 3),
+        )
+
+def _cap_sbc(sbc_daily, uma_daily: float, min_uma: float, max_uma: float):
+    # capea SBC entre min y max UMA (acepta escalar o arreglo)
+    sbc_min = min_uma * uma_daily
+    sbc_max = max_uma * uma_daily
+    return np.maximum(sbc_min, np.minimum(sbc_daily, sbc_max))
+
+def compile_ss_rates(data: Dict[str, Any]) -> SSRateSchedule:
+    """Compila el JSON ``insurances -> components`` en una matriz densa de tasas."""
     params = data.get("params", {})
     uma_daily = float(params.get("uma_daily", 0.0))
     if uma_daily <= 0:
         raise ValueError("Config incompleta: setea params.uma_daily en ss_1997_rates.json")
 
-    sbc = _cap_sbc(
-        sbc_daily=float(sbc_daily),
-        uma_daily=uma_daily,
-        min_uma=float(params.get("sbc_min_uma", 1.0)),
-        max_uma=float(params.get("sbc_max_uma", 25.0)),
-    )
-
-    # bases diarias:
-    base_sbc = sbc
-    base_uma = uma_daily
-    base_excess_3uma = max(0.0, sbc - 3.0 * uma_daily)
-
-    rows = []
+    insurance, component, base, kinds, rates = [], [], [], [], []
     for ins in data.get("insurances", []):
         ins_name = ins.get("name", "Seguro")
         for comp in ins.get("components", []):
-            comp_name = comp.get("component", "Componente")
             base_kind = comp.get("base", "SBC")
+            insurance.append(ins_name)
+            component.append(comp.get("component", "Componente"))
+            base.append(base_kind)
+            # base custom: tú puedes extender BASE_KINDS; por ahora se usa el SBC
+            kinds.append(BASE_KINDS.index(base_kind) if base_kind in BASE_KINDS else 0)
+            rates.append([
+                float(comp.get("employer_rate", 0.0)),
+                float(comp.get("employee_rate", 0.0)),
+                float(comp.get("gov_rate", 0.0)),
+            ])
 
-            if base_kind == "SBC":
-                base_daily = base_sbc
-            elif base_kind == "UMA":
-                base_daily = base_uma
-            elif base_kind == "SBC_excess_3UMA":
-                base_daily = base_excess_3uma
-            else:
-                # base custom: tú puedes extender esto
-                base_daily = base_sbc
-
-            employer = float(comp.get("employer_rate", 0.0)) * base_daily * days_in_month
-            employee = float(comp.get("employee_rate", 0.0)) * base_daily * days_in_month
-            gov = float(comp.get("gov_rate", 0.0)) * base_daily * days_in_month
-
-            rows.append({
-                "Seguro": ins_name,
-                "Componente": comp_name,
-                "Base": base_kind,
-                "Base_diaria": base_daily,
-                "Patron": employer,
-                "Trabajador": employee,
-                "Gobierno": gov,
-                "Total": employer + employee + gov
-            })
-
-    df = pd.DataFrame(rows)
-    totals = df[["Patron", "Trabajador", "Gobierno", "Total"]].sum().to_dict()
-    return {
+    base_kind_arr = np.array(kinds, dtype=np.intp)
+    rates_arr = np.array(rates, dtype=float).reshape(len(rates), len(PAYERS))
+    base_kind_arr.flags.writeable = False
+    rates_arr.flags.writeable = False
+    return SSRateSchedule(
+        insurance=tuple(insurance),
+        component=tuple(component),
+        base=tuple(base),
+        base_kind=base_kind_arr,
+        rates=rates_arr,
+        uma_daily=uma_daily,
+        sbc_min_uma=float(params.get("sbc_min_uma", 1.0)),
+        sbc_max_uma=float(params.get("sbc_max_uma", 25.0)),
+    )
+
+def load_ss_1997_schedule() -> SSRateSchedule:
+    """Tasas de ss_1997_rates.json ya compiladas (una vez por proceso)."""
+    return load_parsed("ss_1997_rates.json", compile_ss_rates)
+
+@timed()
+def ss_contributions_batch(
+    sbc_daily: np.ndarray,
+    days_in_month=30,
+    schedule: Optional[SSRateSchedule] = None,
+    detail: bool = False
+) -> Dict[str, np.ndarray]:
+    """Contribuciones mensuales para un arreglo de SBC diarios en un solo cálculo.
+
+    ``days_in_month`` puede ser escalar o arreglo (uno por trabajador).
+    Devuelve columnas ``sbc_daily_capped``, ``Patron``, ``Trabajador``, ``Gobierno``
+    y ``Total``. Con ``detail=True`` agrega ``base_daily`` (trabajadores × componentes)
+    y ``detail`` (trabajadores × componentes × aportante, en el orden de PAYERS).
+    """
+    if schedule is None:
+        schedule = load_ss_1997_schedule()
+
+    sbc_in = np.asarray(sbc_daily, dtype=float)
+    days = np.broadcast_to(np.asarray(days_in_month, dtype=float), sbc_in.shape)
+    uma_daily = schedule.uma_daily
+
+    sbc = _cap_sbc(sbc_in, uma_daily, schedule.sbc_min_uma, schedule.sbc_max_uma)
+
+    # bases diarias por tipo (mismo orden que BASE_KINDS):
+    bases = np.stack([
+        sbc,
+        np.full_like(sbc, uma_daily),
+        np.maximum(0.0, sbc - 3.0 * uma_daily),
+    ], axis=-1)
+    base_daily = bases[..., schedule.base_kind]
+    base_month = base_daily * days[..., None]
+
+    totals = base_month @ schedule.rates
+    out = {
         "sbc_daily_capped": sbc,
-        "uma_daily": uma_daily,
+        "Patron": totals[..., 0],
+        "Trabajador": totals[..., 1],
+        "Gobierno": totals[..., 2],
+        "Total": totals.sum(axis=-1),
+    }
+    if detail:
+        out["base_daily"] = base_daily
+        out["detail"] = np.multiply(base_month[..., None], schedule.rates, order="C")
+    return out
+
+def ss_contributions_compact(
+    sbc_daily,
+    days_in_month=30,
+    schedule: Optional[SSRateSchedule] = None
+) -> SSContributions:
+    """Cuotas SS como ``SSContributions`` (escalar -> un trabajador, arreglo -> lote)."""
+    if schedule is None:
+        schedule = load_ss_1997_schedule()
+    scalar = np.ndim(sbc_daily) == 0
+    out = ss_contributions_batch(np.atleast_1d(np.asarray(sbc_daily, dtype=float)), days_in_month, schedule, detail=True)
+    if scalar:
+        return SSContributions(schedule, float(out["sbc_daily_capped"][0]), days_in_month,
+                               out["base_daily"][0], out["detail"][0])
+    return SSContributions(schedule, out["sbc_daily_capped"], days_in_month, out["base_daily"], out["detail"])
+
+@timed()
+def ss_contributions_monthly(
+    sbc_daily: float,
+    days_in_month: int = 30,
+    schedule: Optional[SSRateSchedule] = None,
+    compact: bool = False
+) -> Union[Dict[str, Any], SSContributions]:
+    """Calcula contribuciones mensuales a seguridad social (incluye INFONAVIT)
+    desglosadas por seguro / componente y por aportante (patrón, trabajador, gobierno).
+
+    Con ``compact=True`` devuelve un ``SSContributions`` (sin DataFrame).
+
+    *El detalle de tasas y bases se toma de pensiones/data/ss_1997_rates.json*
+    """
+    res = ss_contributions_compact(float(sbc_daily), days_in_month, schedule)
+    if compact:
+        return res
+    return {
+        "sbc_daily_capped": res.sbc_daily_capped,
+        "uma_daily": res.schedule.uma_daily,
         "days_in_month": days_in_month,
-        "detail": df,
-        "totals": totals
+        "detail": res.to_frame(),
+        "totals": res.totals
     }
 
 def effective_rates(
@@ -94,3 +261,17 @@ def effective_rates(
         "isr_eff": isr_monthly / sbc_monthly,
         "ss_eff": ss_total_monthly / sbc_monthly
     }
+
+def effective_rates_batch(
+    sbc_monthly: np.ndarray,
+    isr_monthly: np.ndarray,
+    ss_total_monthly: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Versión vectorizada de ``effective_rates`` (0 donde la base es <= 0)."""
+    base = np.asarray(sbc_monthly, dtype=float)
+    positive = base > 0
+    safe = np.where(positive, base, 1.0)
+    return {
+        "isr_eff": np.where(positive, np.asarray(isr_monthly, dtype=float) / safe, 0.0),
+        "ss_eff": np.where(positive, np.asarray(ss_total_monthly, dtype=float) / safe, 0.0),
+    }
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.isr_2026 import ISRTariffArrays, _parse_isr_tariff_arrays
+from pensiones.core.ss_1997 import PAYERS, SSRateSchedule, _cap_sbc, compile_ss_rates, ss_contributions_batch
+from pensiones.utils.io import DATA_DIR, file_version, load_parsed
+from pensiones.utils.profiling import timed
+
+ISR_PATTERN = "isr_*_tarifa.json"
+SS_PATTERN = "ss_*_rates.json"
+UMA_FILE = "uma_historico.json"
+# Año de las tablas que se usan cuando no hay columna de año (isr_2026_tarifa.json, ss_1997_rates.json).
+DEFAULT_YEAR = 2026
+
+@dataclass(frozen=True, eq=False)
+class TariffRegistry:
+    """Tarifas ISR, tasas SS y UMA de todos los años disponibles, indexadas por año.
+
+    Cada consulta usa la tabla *vigente* para el año pedido: la del año más
+    reciente que sea <= al pedido (los años anteriores al primero usan el primero).
+
+    - ISR: arreglos (años_isr, rangos) rellenados con ``inf`` a la derecha y el
+      número real de rangos por año, para evaluar ingresos de distintos años en
+      una sola pasada.
+    - SS: un ``SSRateSchedule`` por año de ``years``; la UMA de ``uma_historico.json``
+      sustituye a la del archivo de tasas cuando existe para ese año.
+    """
+    years: np.ndarray  # todos los años con alguna tabla (ordenados)
+    isr_years: np.ndarray
+    isr_lower: np.ndarray  # (años_isr, rangos_max), inf = relleno
+    isr_upper: np.ndarray
+    isr_fixed_quota: np.ndarray
+    isr_rate: np.ndarray
+    isr_count: np.ndarray  # rangos reales por año
+    uma_daily: np.ndarray  # por año de ``years``
+    sbc_min_uma: np.ndarray
+    sbc_max_uma: np.ndarray
+    ss_schedules: Tuple[SSRateSchedule, ...]  # por año de ``years``
+    ss_rates: Optional[np.ndarray]  # (años, componentes, 3) si todos los años comparten componentes
+    ss_base_kind: Optional[np.ndarray]
+
+    def __len__(self) -> int:
+        return int(self.years.shape[0])
+
+    @staticmethod
+    def _asof(available: np.ndarray, years) -> np.ndarray:
+        idx = np.searchsorted(available, np.asarray(years, dtype=np.int64), side="right") - 1
+        return np.maximum(idx, 0)
+
+    def year_index(self, years) -> np.ndarray:
+        """Fila de ``years`` vigente para cada año pedido."""
+        return self._asof(self.years, years)
+
+    def isr_tariff(self, year: int) -> ISRTariffArrays:
+        """Tarifa ISR vigente en ``year`` (la misma forma que ``load_isr_2026_arrays``)."""
+        r = int(self._asof(self.isr_years, year))
+        n = int(self.isr_count[r])
+        return ISRTariffArrays(
+            lower=self.isr_lower[r, :n], upper=self.isr_upper[r, :n],
+            fixed_quota=self.isr_fixed_quota[r, :n], rate=self.isr_rate[r, :n],
+        )
+
+    def ss_schedule(self, year: int) -> SSRateSchedule:
+        return self.ss_schedules[int(self.year_index(year))]
+
+    def uma_for(self, years) -> np.ndarray:
+        return self.uma_daily[self.year_index(years)]
+
+def _parse_uma(data: Dict[str, Any]) -> Dict[int, float]:
+    return {int(y): float(v) for y, v in data.get("uma_daily", {}).items()}
+
+def _file_year(name: str, data: Dict[str, Any]) -> int:
+    # el año del contenido manda (ss_1997_rates.json es la tabla 2026 de la LSS 1997)
+    if data.get("year") is not None:
+        return int(data["year"])
+    digits = "".join(ch for ch in name if ch.isdigit())
+    if not digits:
+        raise ValueError(f"No se pudo determinar el año de {name}: agrega el campo 'year'.")
+    return int(digits)
+
+def _raw(data: Dict[str, Any]) -> Dict[str, Any]:
+    return data
+
+def _pad(rows, fill: float) -> np.ndarray:
+    width = max(len(r) for r in rows)
+    out = np.full((len(rows), width), fill, dtype=float)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+def build_registry() -> TariffRegistry:
+    """Lee todas las tablas anuales de ``pensiones/data/`` y arma el registro."""
+    isr: Dict[int, ISRTariffArrays] = {}
+    for path in sorted(DATA_DIR.glob(ISR_PATTERN)):
+        isr[_file_year(path.name, load_parsed(path.name, _raw))] = load_parsed(path.name, _parse_isr_tariff_arrays)
+    ss: Dict[int, SSRateSchedule] = {}
+    for path in sorted(DATA_DIR.glob(SS_PATTERN)):
+        ss[_file_year(path.name, load_parsed(path.name, _raw))] = load_parsed(path.name, compile_ss_rates)
+    if not isr or not ss:
+        raise FileNotFoundError("Se requiere al menos una tarifa ISR y un archivo de tasas SS en pensiones/data/.")
+    uma = load_parsed(UMA_FILE, _parse_uma) if (DATA_DIR / UMA_FILE).exists() else {}
+
+    isr_years = np.array(sorted(isr), dtype=np.int64)
+    ss_years = np.array(sorted(ss), dtype=np.int64)
+    years = np.array(sorted(set(isr) | set(ss) | set(uma)), dtype=np.int64)
+
+    tables = [isr[int(y)] for y in isr_years]
+    schedules = []
+    for y in years:
+        base = ss[int(ss_years[TariffRegistry._asof(ss_years, y)])]
+        if int(y) in uma and int(y) not in ss:
+            base = dataclasses.replace(base, uma_daily=uma[int(y)])
+        schedules.append(base)
+
+    # si todos los años comparten la misma lista de componentes, las tasas se
+    # apilan para calcular SS de cualquier mezcla de años en una sola pasada
+    first = schedules[0]
+    same = all(s.component == first.component and s.insurance == first.insurance
+               and np.array_equal(s.base_kind, first.base_kind) for s in schedules)
+    ss_rates = np.stack([s.rates for s in schedules]) if same else None
+
+    arrays = {
+        "isr_lower": _pad([t.lower for t in tables], np.inf),
+        "isr_upper": _pad([t.upper for t in tables], np.inf),
+        "isr_fixed_quota": _pad([t.fixed_quota for t in tables], 0.0),
+        "isr_rate": _pad([t.rate for t in tables], 0.0),
+        "isr_count": np.array([len(t) for t in tables], dtype=np.int64),
+        "uma_daily": np.array([s.uma_daily for s in schedules]),
+        "sbc_min_uma": np.array([s.sbc_min_uma for s in schedules]),
+        "sbc_max_uma": np.array([s.sbc_max_uma for s in schedules]),
+    }
+    for arr in (years, isr_years, ss_rates, *arrays.values()):
+        if arr is not None:
+            arr.flags.writeable = False
+    return TariffRegistry(
+        years=years,
+        isr_years=isr_years,
+        ss_schedules=tuple(schedules),
+        ss_rates=ss_rates,
+        ss_base_kind=first.base_kind if same else None,
+        **arrays,
+    )
+
+def fill_years(years, default_year: int = DEFAULT_YEAR) -> np.ndarray:
+    """Años fiscales como enteros; los vacíos (NaN/None/"") toman ``default_year``.
+
+    Un valor que no es un año entero (texto, 2025.5) es un error y el mensaje
+    indica las filas afectadas.
+    """
+    raw = pd.Series(np.asarray(years, dtype=object).ravel())
+    missing = raw.isna() | (raw.astype(str).str.strip() == "")
+    values = pd.to_numeric(raw.where(~missing), errors="coerce")
+    bad = ~missing & (values.isna() | (values % 1 != 0))
+    if bad.any():
+        rows = np.flatnonzero(bad.to_numpy())
+        shown = ", ".join(str(r) for r in rows[:10]) + (" ..." if rows.shape[0] > 10 else "")
+        raise ValueError(f"Año fiscal inválido en {rows.shape[0]} fila(s) (posiciones {shown}).")
+    return values.fillna(default_year).to_numpy(dtype=np.int64).reshape(np.shape(years))
+
+_lock = threading.Lock()
+_cached: Dict[str, Any] = {"key": None, "registry": None}
+
+def _fingerprint() -> Tuple[Tuple[str, str], ...]:
+    names = [p.name for p in sorted(DATA_DIR.glob(ISR_PATTERN))] + [p.name for p in sorted(DATA_DIR.glob(SS_PATTERN))]
+    if (DATA_DIR / UMA_FILE).exists():
+        names.append(UMA_FILE)
+    return tuple((n, file_version(n)) for n in names)
+
+def load_tariff_registry() -> TariffRegistry:
+    """Registro de todos los años, armado una vez por proceso.
+
+    Se reconstruye sólo si cambia el contenido de algún archivo o aparece uno nuevo.
+    """
+    key = _fingerprint()
+    with _lock:
+        if _cached["key"] == key:
+            return _cached["registry"]
+    registry = build_registry()
+    with _lock:
+        _cached["key"], _cached["registry"] = key, registry
+    return registry
+
+@timed()
+def isr_monthly_by_year(
+    incomes,
+    years,
+    registry: Optional[TariffRegistry] = None
+) -> Dict[str, np.ndarray]:
+    """ISR mensual con la tarifa vigente en el año de cada ingreso (una sola pasada).
+
+    Mismas columnas y reglas que ``isr_monthly_batch`` (``bracket_index``: debajo
+    del primer límite, el primer rango; el hueco entre rangos, el anterior).
+    """
+    if registry is None:
+        registry = load_tariff_registry()
+    income = np.asarray(incomes, dtype=float)
+    if np.any(income < 0):
+        raise ValueError("El ingreso mensual no puede ser negativo.")
+    row = np.broadcast_to(registry._asof(registry.isr_years, years), income.shape)
+
+    lower = registry.isr_lower[row]  # (..., rangos); el relleno inf nunca cuenta
+    idx = np.maximum(np.count_nonzero(lower <= income[..., None], axis=-1) - 1, 0)
+
+    low = registry.isr_lower[row, idx]
+    fixed_quota = registry.isr_fixed_quota[row, idx]
+    rate = registry.isr_rate[row, idx]
+    excess = np.maximum(0.0, income - low)
+    return {
+        "isr": fixed_quota + excess * rate,
+        "bracket": idx,
+        "lower": low,
+        "upper": registry.isr_upper[row, idx],
+        "fixed_quota": fixed_quota,
+        "rate": rate,
+        "excess": excess,
+        "tariff_year": registry.isr_years[row],
+    }
+
+@timed()
+def ss_contributions_by_year(
+    sbc_daily,
+    years,
+    days_in_month=30,
+    registry: Optional[TariffRegistry] = None
+) -> Dict[str, np.ndarray]:
+    """Cuotas SS con la UMA, topes y tasas vigentes en el año de cada trabajador.
+
+    Mismas columnas que ``ss_contributions_batch``. Si todos los años comparten
+    componentes se calcula en una sola pasada; si no, por grupos de año.
+    """
+    if registry is None:
+        registry = load_tariff_registry()
+    sbc_in = np.asarray(sbc_daily, dtype=float)
+    row = np.broadcast_to(registry.year_index(years), sbc_in.shape)
+    days = np.broadcast_to(np.asarray(days_in_month, dtype=float), sbc_in.shape)
+
+    if registry.ss_rates is None:
+        out = {k: np.empty(sbc_in.shape) for k in ("sbc_daily_capped",) + PAYERS + ("Total",)}
+        for r in np.unique(row):
+            mask = row == r
+            part = ss_contributions_batch(sbc_in[mask], days[mask], registry.ss_schedules[int(r)])
+            for k in out:
+                out[k][mask] = part[k]
+        return out
+
+    uma = registry.uma_daily[row]
+    sbc = _cap_sbc(sbc_in, uma, registry.sbc_min_uma[row], registry.sbc_max_uma[row])
+    bases = np.stack([sbc, uma, np.maximum(0.0, sbc - 3.0 * uma)], axis=-1)
+    base_month = bases[..., registry.ss_base_kind] * days[..., None]
+    totals = np.einsum("...c,...cp->...p", base_month, registry.ss_rates[row])
+    return {
+        "sbc_daily_capped": sbc,
+        "Patron": totals[..., 0],
+        "Trabajador": totals[..., 1],
+        "Gobierno": totals[..., 2],
+        "Total": totals.sum(axis=-1),
+    }
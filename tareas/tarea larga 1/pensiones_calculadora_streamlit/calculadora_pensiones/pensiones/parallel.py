@@ -0,0 +1,85 @@
+"""Ejecución en paralelo (multiproceso) sobre ``pensiones.core``.
+
+Parte una tabla en shards, los evalúa en un ``ProcessPoolExecutor`` y los
+reensambla en el orden original. Cada proceso carga las tablas (tarifa ISR,
+tasas SS, supuestos) una sola vez en su inicializador; a cada tarea sólo viaja
+su shard, nunca las tablas.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from pensiones.core.isr_2026 import load_isr_2026_arrays
+from pensiones.core.mortality import load_mortality_tables
+from pensiones.core.ss_1997 import load_ss_1997_schedule
+from pensiones.core.tariffs import load_tariff_registry
+from pensiones.utils.io import load_params
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def warm_tables() -> None:
+    """Carga en la caché del proceso todas las tablas de ``pensiones/data/``."""
+    load_isr_2026_arrays()
+    load_ss_1997_schedule()
+    load_params("lss1997_assumptions.json")
+    load_params("lss1973_assumptions.json")
+    load_tariff_registry()
+    load_mortality_tables()
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+def map_ordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None
+) -> Iterator[R]:
+    """Como ``map(func, items)`` pero en ``workers`` procesos, conservando el orden.
+
+    Mantiene a lo más ``max_in_flight`` tareas pendientes (por defecto 2 por
+    proceso), así se puede consumir un iterable muy grande (p.ej. bloques de un
+    CSV) sin cargarlo completo. ``func`` debe ser picklable (función de módulo
+    o ``functools.partial`` de una).
+    """
+    workers = workers or default_workers()
+    if workers <= 1:
+        warm_tables()
+        for item in items:
+            yield func(item)
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_tables) as ex:
+        pending = deque()
+        for item in items:
+            pending.append(ex.submit(func, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def split_shards(df: pd.DataFrame, n_shards: int) -> List[pd.DataFrame]:
+    """Parte ``df`` en ``n_shards`` bloques contiguos (el último puede ser más corto)."""
+    n_shards = max(1, min(int(n_shards), len(df)))
+    bounds = np.linspace(0, len(df), n_shards + 1).astype(int)
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+def run_sharded(
+    df: pd.DataFrame,
+    func: Callable[[pd.DataFrame], pd.DataFrame],
+    workers: Optional[int] = None,
+    n_shards: Optional[int] = None
+) -> pd.DataFrame:
+    """Evalúa ``func`` por shards en paralelo y concatena en el orden de ``df``."""
+    workers = workers or default_workers()
+    n_shards = n_shards or 4 * workers
+    parts = list(map_ordered(func, split_shards(df, n_shards), workers=workers))
+    return pd.concat(parts) if parts else df.iloc[0:0]
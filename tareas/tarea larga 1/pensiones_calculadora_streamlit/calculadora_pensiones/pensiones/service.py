@@ -0,0 +1,363 @@
+"""Servicio HTTP/JSON (ASGI) sobre ``pensiones.core``, sin Streamlit.
+
+Endpoints (POST con cuerpo JSON; las variantes ``/batch`` reciben listas):
+
+    /isr                          {"income": 20000}
+    /isr/batch                    {"incomes": [...]}
+    /ss                           {"sbc_daily": 700, "days_in_month": 30}
+    /ss/batch                     {"sbc_daily": [...], "days_in_month": 30 | [...]}
+    /lss1997/replacement-rate     {"age_now", "salary_monthly", "voluntary_rate", "retirement_age"?, "balance_now"?}
+    /lss1997/replacement-rate/batch   (mismas llaves, listas o escalares)
+    /lss1997/solve                {"age_now", "salary_monthly", "target_rr", "retirement_age"?}
+    /lss1997/solve/batch          (mismas llaves, listas o escalares)
+    /lss1973/rr-by-age            {"age_now", "salary_monthly", "min_age"?, "max_age"?, "weeks_now"?,
+                                   "has_spouse"?, "n_children"?, "n_parents"?}
+    /lss1973/rr-by-age/batch      {"age_now": [...], "salary_monthly": [...], "min_age"?, "max_age"?,
+                                   "weeks_now"?: [...], "has_spouse"?: [...], "n_children"?: [...], "n_parents"?: [...]}
+
+Además ``GET /health`` y ``GET /stats``.
+
+- Las tablas se cargan al arrancar (y en cada proceso del pool) y quedan en la
+  caché de ``pensiones.utils.io``.
+- Los lotes de ``PENSIONES_SERVICE_INLINE_MAX`` filas o más se mandan a un
+  ``ProcessPoolExecutor`` de ``PENSIONES_SERVICE_WORKERS`` procesos; el resto se
+  calcula en el proceso del servidor, en un hilo aparte para no bloquear el loop.
+- Peticiones idénticas (misma ruta y mismo JSON canónico) que llegan mientras
+  otra igual se está calculando esperan ese mismo resultado.
+
+Uso (requiere ``uvicorn``, opcional):
+    python -m pensiones.service --port 8000 --workers 4
+    uvicorn pensiones.service:app --port 8000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from pensiones.core.isr_2026 import isr_monthly, isr_monthly_batch
+from pensiones.core.lss1973_ret import pension_lss1973_batch, rr_by_retirement_age
+from pensiones.core.lss1997_ret import (
+    replacement_rate_lss1997,
+    replacement_rate_lss1997_batch,
+    solve_voluntary_rate_for_target,
+    solve_voluntary_rate_for_target_batch,
+)
+from pensiones.core.ss_1997 import ss_contributions_batch, ss_contributions_monthly
+from pensiones.parallel import default_workers, warm_tables
+from pensiones.utils import io
+
+ENV_WORKERS = "PENSIONES_SERVICE_WORKERS"
+ENV_INLINE_MAX = "PENSIONES_SERVICE_INLINE_MAX"
+
+# Lotes con menos filas se calculan sin pasar por el pool (el viaje cuesta más).
+DEFAULT_INLINE_MAX = 5_000
+# Cuerpo máximo aceptado (bytes).
+MAX_BODY = 64 * 1024 * 1024
+
+class RequestError(ValueError):
+    """Error en la petición (se responde 400)."""
+
+def _array(payload: Dict[str, Any], key: str) -> np.ndarray:
+    if key not in payload:
+        raise RequestError(f"Falta el campo '{key}'.")
+    try:
+        return np.asarray(payload[key], dtype=float)
+    except (TypeError, ValueError):
+        raise RequestError(f"El campo '{key}' debe ser numérico (número o lista de números).")
+
+def _number(payload: Dict[str, Any], key: str, default: Any = None) -> Any:
+    if key not in payload or payload[key] is None:
+        if default is None:
+            raise RequestError(f"Falta el campo '{key}'.")
+        return default
+    try:
+        return float(payload[key])
+    except (TypeError, ValueError):
+        raise RequestError(f"El campo '{key}' debe ser numérico.")
+
+def _optional_array(payload: Dict[str, Any], key: str) -> Optional[np.ndarray]:
+    return None if payload.get(key) is None else _array(payload, key)
+
+# --- handlers: payload (dict) -> resultado serializable -----------------------
+
+def _isr(p: Dict[str, Any]) -> Dict[str, Any]:
+    return isr_monthly(_number(p, "income"))
+
+def _isr_batch(p: Dict[str, Any]) -> Dict[str, Any]:
+    return isr_monthly_batch(_array(p, "incomes"))
+
+def _ss(p: Dict[str, Any]) -> Dict[str, Any]:
+    res = ss_contributions_monthly(_number(p, "sbc_daily"), int(_number(p, "days_in_month", 30)), compact=True)
+    return {
+        "sbc_daily_capped": res.sbc_daily_capped,
+        "days_in_month": res.days_in_month,
+        "totals": res.totals,
+        "detail": res.to_frame().to_dict(orient="records"),
+    }
+
+def _ss_batch(p: Dict[str, Any]) -> Dict[str, Any]:
+    days = _array(p, "days_in_month") if "days_in_month" in p else 30
+    return ss_contributions_batch(_array(p, "sbc_daily"), days)
+
+def _rr97(p: Dict[str, Any]) -> Dict[str, Any]:
+    ret = p.get("retirement_age")
+    return replacement_rate_lss1997(
+        int(_number(p, "age_now")), _number(p, "salary_monthly"), _number(p, "voluntary_rate"),
+        retirement_age=None if ret is None else int(ret), balance_now=_number(p, "balance_now", 0.0),
+    )
+
+def _rr97_batch(p: Dict[str, Any]) -> Dict[str, Any]:
+    return replacement_rate_lss1997_batch(
+        _array(p, "age_now"), _array(p, "salary_monthly"), _array(p, "voluntary_rate"),
+        retirement_age=_optional_array(p, "retirement_age"),
+        balance_now=_array(p, "balance_now") if "balance_now" in p else 0.0,
+    )
+
+def _solve(p: Dict[str, Any]) -> Dict[str, Any]:
+    ret = p.get("retirement_age")
+    return solve_voluntary_rate_for_target(
+        int(_number(p, "age_now")), _number(p, "salary_monthly"), _number(p, "target_rr"),
+        retirement_age=None if ret is None else int(ret),
+    )
+
+def _solve_batch(p: Dict[str, Any]) -> Dict[str, Any]:
+    return solve_voluntary_rate_for_target_batch(
+        _array(p, "age_now"), _array(p, "salary_monthly"), _array(p, "target_rr"),
+        retirement_age=_optional_array(p, "retirement_age"),
+    )
+
+def _rr73(p: Dict[str, Any]) -> Dict[str, Any]:
+    df = rr_by_retirement_age(
+        int(_number(p, "age_now")), _number(p, "salary_monthly"),
+        int(_number(p, "min_age", 60)), int(_number(p, "max_age", 65)),
+        weeks_now=None if p.get("weeks_now") is None else _number(p, "weeks_now"),
+        has_spouse=bool(p.get("has_spouse", False)),
+        n_children=int(_number(p, "n_children", 0)), n_parents=int(_number(p, "n_parents", 0)),
+    )
+    return df.to_dict(orient="list")
+
+def _rr73_batch(p: Dict[str, Any]) -> Dict[str, Any]:
+    ages = np.arange(int(_number(p, "min_age", 60)), int(_number(p, "max_age", 65)) + 1)
+    age_now = np.atleast_1d(_array(p, "age_now"))
+    salary = np.atleast_1d(_array(p, "salary_monthly"))
+    worker = {
+        k: np.atleast_1d(v)[:, None]
+        for k in ("weeks_now", "has_spouse", "n_children", "n_parents")
+        if (v := _optional_array(p, k)) is not None
+    }
+    out = pension_lss1973_batch(age_now[:, None], ages[None, :], salary[:, None], **worker)
+    return {"retirement_age": ages, **out}
+
+# ruta -> (handler, es lote)
+ROUTES: Dict[str, Tuple[Callable[[Dict[str, Any]], Dict[str, Any]], bool]] = {
+    "/isr": (_isr, False),
+    "/isr/batch": (_isr_batch, True),
+    "/ss": (_ss, False),
+    "/ss/batch": (_ss_batch, True),
+    "/lss1997/replacement-rate": (_rr97, False),
+    "/lss1997/replacement-rate/batch": (_rr97_batch, True),
+    "/lss1997/solve": (_solve, False),
+    "/lss1997/solve/batch": (_solve_batch, True),
+    "/lss1973/rr-by-age": (_rr73, False),
+    "/lss1973/rr-by-age/batch": (_rr73_batch, True),
+}
+
+def _clean(value: Any) -> Any:
+    """numpy -> tipos de Python; NaN/inf -> None (JSON estándar)."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    return value
+
+def run_route(path: str, payload: Dict[str, Any]) -> bytes:
+    """Ejecuta el handler de ``path`` y devuelve el JSON ya serializado.
+
+    Es una función de módulo para poder mandarla al pool de procesos.
+    """
+    handler, _ = ROUTES[path]
+    return json.dumps(_clean(handler(payload)), ensure_ascii=False).encode("utf-8")
+
+def _batch_rows(payload: Dict[str, Any]) -> int:
+    return max((len(v) for v in payload.values() if isinstance(v, list)), default=1)
+
+def _canonical(path: str, payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{path}\n{body}".encode("utf-8")).digest()
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+
+class PensionService:
+    """Aplicación ASGI (``app = PensionService()``)."""
+
+    def __init__(self, workers: Optional[int] = None, inline_max: Optional[int] = None) -> None:
+        self.workers = workers if workers is not None else int(os.environ.get(ENV_WORKERS, default_workers()))
+        self.inline_max = inline_max if inline_max is not None else int(os.environ.get(ENV_INLINE_MAX, DEFAULT_INLINE_MAX))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._started = False
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self.stats = {"requests": 0, "computed": 0, "coalesced": 0, "offloaded": 0, "errors": 0}
+
+    def startup(self) -> None:
+        if self._started:
+            return
+        warm_tables()
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_tables)
+        self._started = True
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._started = False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.startup()
+                except Exception as exc:  # noqa: BLE001 - se reporta al servidor
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        self.startup()  # por si el servidor no manda eventos de lifespan
+        self.stats["requests"] += 1
+        path, method = scope["path"].rstrip("/") or "/", scope["method"]
+
+        if method == "GET" and path == "/health":
+            return await _respond(send, 200, {"status": "ok", "data_version": io.data_version()})
+        if method == "GET" and path == "/stats":
+            return await _respond(send, 200, self.snapshot())
+        if path not in ROUTES:
+            return await _respond(send, 404, {"error": f"Ruta desconocida: {path}", "routes": sorted(ROUTES)})
+        if method != "POST":
+            return await _respond(send, 405, {"error": "Usa POST con un cuerpo JSON."})
+
+        body = await _read_body(receive)
+        if body is None:
+            return await _respond(send, 413, {"error": f"El cuerpo excede {MAX_BODY:,} bytes."})
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise RequestError("El cuerpo debe ser un objeto JSON.")
+            result = await self._coalesced(path, payload)
+        except (RequestError, ValueError, json.JSONDecodeError) as exc:
+            self.stats["errors"] += 1
+            return await _respond(send, 400, {"error": str(exc)})
+        except Exception as exc:  # noqa: BLE001 - el servicio no se cae por una petición
+            self.stats["errors"] += 1
+            return await _respond(send, 500, {"error": f"{type(exc).__name__}: {exc}"})
+        await _send_json(send, 200, result)
+
+    async def _coalesced(self, path: str, payload: Dict[str, Any]) -> bytes:
+        key = _canonical(path, payload)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await self._compute(path, payload)
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # marcada como leída aunque nadie más la espere
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _compute(self, path: str, payload: Dict[str, Any]) -> bytes:
+        self.stats["computed"] += 1
+        _, batch = ROUTES[path]
+        if batch and self._pool is not None and _batch_rows(payload) >= self.inline_max:
+            self.stats["offloaded"] += 1
+            return await asyncio.get_running_loop().run_in_executor(self._pool, run_route, path, payload)
+        # en un hilo: el loop sigue atendiendo (y las peticiones iguales ven el futuro en _inflight)
+        return await asyncio.to_thread(run_route, path, payload)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "in_flight": len(self._inflight),
+            "workers": self.workers,
+            "inline_max": self.inline_max,
+            "table_cache": io.cache_info()._asdict(),
+            "data_version": io.data_version(),
+        }
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+async def _send_json(send: Send, status: int, body: bytes) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def _respond(send: Send, status: int, obj: Dict[str, Any]) -> None:
+    await _send_json(send, status, json.dumps(_clean(obj), ensure_ascii=False).encode("utf-8"))
+
+app = PensionService()
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pensiones.service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="procesos del pool para lotes grandes")
+    parser.add_argument("--inline-max", type=int, default=None, help="filas a partir de las cuales un lote va al pool")
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        print("Para levantar el servicio instala uvicorn: pip install uvicorn", flush=True)
+        return 1
+    service = PensionService(workers=args.workers, inline_max=args.inline_max)
+    uvicorn.run(service, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""Memoización de cálculos para las páginas de Streamlit.
+
+Cada función envuelta con ``memoize`` tiene su propia caché LRU con TTL,
+compartida por todas las sesiones del servidor (vive en ``st.cache_resource``).
+La llave son los argumentos normalizados más ``data_version()``, así que editar
+un JSON de ``pensiones/data/`` invalida los resultados.
+Los valores cacheados son compartidos: no los modifiques.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from pensiones.utils.io import data_version
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 15 * 60  # segundos
+
+class MemoCache:
+    """LRU acotada con expiración (TTL) y contadores de aciertos/fallos."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # llave -> (instante, valor)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and now - item[0] <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+@st.cache_resource
+def _registry() -> Dict[str, MemoCache]:
+    return {}
+
+def _normalize(value: Any) -> Hashable:
+    """Convierte argumentos a algo hasheable y estable (float 1.0 == int 1, etc.)."""
+    if isinstance(value, (bool, str, type(None))):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return round(float(value), 10)
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.shape, str(value.dtype), hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, pd.DataFrame):
+        return ("frame", tuple(value.columns), hashlib.sha1(pd.util.hash_pandas_object(value).values.tobytes()).hexdigest())
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        return tuple(_normalize(v) for v in items)
+    return repr(value)
+
+def memoize(name: str, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+    """Decorador: cachea ``func(*args, **kwargs)`` en la caché ``name``."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            registry = _registry()
+            cache = registry.get(name)
+            if cache is None:
+                cache = registry.setdefault(name, MemoCache(maxsize=maxsize, ttl=ttl))
+            key = (_normalize(args), _normalize(kwargs), data_version())
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Aciertos / fallos / tamaño por caché, más el total en ``"total"``."""
+    stats = {
+        name: {"hits": c.hits, "misses": c.misses, "size": len(c)}
+        for name, c in sorted(_registry().items())
+    }
+    stats["total"] = {
+        "hits": sum(s["hits"] for s in stats.values()),
+        "misses": sum(s["misses"] for s in stats.values()),
+        "size": sum(s["size"] for s in stats.values()),
+    }
+    return stats
+
+def clear_caches() -> None:
+    for cache in _registry().values():
+        cache.clear()
@@ -0,0 +1,192 @@
+"""Exportación de gráficas (HTML/PNG) bajo demanda, con caché en disco por contenido.
+
+- Nada se genera al dibujar la página: el HTML se produce cuando se presiona
+  el botón de descarga (``st.download_button`` con datos diferidos) y el PNG
+  cuando se pide guardar la gráfica.
+- Cada archivo se nombra con un hash de los *datos graficados* (``content_key``),
+  así que una gráfica idéntica se reutiliza de ``outputs/exports/`` sin volver a
+  renderizar; se guardan a lo más ``PENSIONES_EXPORT_MAX_FILES`` (LRU por mtime).
+- El render corre en un pool de hilos en segundo plano: la página responde antes
+  de que se escriba el PNG. Peticiones iguales en curso comparten el mismo trabajo.
+
+Las funciones de render reciben la ruta destino y deben construir su propia
+figura (no compartir una figura cacheada con el hilo de la página).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import streamlit as st
+
+from pensiones.ui.cache import _normalize
+from pensiones.utils.profiling import timer
+
+ENV_EXPORT_DIR = "PENSIONES_EXPORT_DIR"
+ENV_MAX_FILES = "PENSIONES_EXPORT_MAX_FILES"
+DEFAULT_EXPORT_DIR = Path("outputs") / "exports"
+DEFAULT_MAX_FILES = 64
+DEFAULT_WORKERS = 2
+# Reintentos si el archivo cacheado se borra (poda de otro hilo) entre ``submit`` y su lectura.
+READ_ATTEMPTS = 3
+
+def content_key(kind: str, *parts: Any) -> str:
+    """Hash estable de ``kind`` + datos graficados (DataFrames, arreglos, escalares)."""
+    h = hashlib.sha256(kind.encode("utf-8"))
+    h.update(repr(_normalize(parts)).encode("utf-8"))
+    return h.hexdigest()[:24]
+
+class ChartExporter:
+    """Caché en disco ``<key><sufijo>`` + pool de hilos que renderiza lo que falta."""
+
+    def __init__(self, out_dir: Path, max_files: int = DEFAULT_MAX_FILES, workers: int = DEFAULT_WORKERS):
+        self.out_dir = Path(out_dir)
+        self.max_files = max_files
+        self.hits = 0
+        self.renders = 0
+        self.errors = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pensiones-export")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        return self.out_dir / f"{key}{suffix}"
+
+    def submit(self, key: str, suffix: str, render: Callable[[Path], None]) -> "Future[Path]":
+        """Future con la ruta del archivo; sólo se renderiza si no está en disco."""
+        path = self.path_for(key, suffix)
+        with self._lock:
+            pending = self._pending.get(path.name)
+            if pending is not None:
+                return pending
+            if path.exists():
+                self.hits += 1
+                os.utime(path)  # marca de uso para el LRU
+                done: "Future[Path]" = Future()
+                done.set_result(path)
+                return done
+            future = self._pool.submit(self._render, path, render)
+            self._pending[path.name] = future
+        return future
+
+    def _render(self, path: Path, render: Callable[[Path], None]) -> Path:
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            with timer(f"export.render{path.suffix}"):
+                render(tmp)
+            os.replace(tmp, path)  # nunca queda un archivo a medias con el nombre final
+            with self._lock:
+                self.renders += 1
+            self._prune()
+            return path
+        except Exception:
+            tmp.unlink(missing_ok=True)  # _prune ignora los archivos con punto: no se quedan tirados
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(path.name, None)
+
+    def _prune(self) -> None:
+        # otros hilos pueden podar al mismo tiempo: un archivo que desaparece se ignora
+        files = []
+        for p in self.out_dir.iterdir():
+            if p.name.startswith("."):
+                continue
+            try:
+                files.append((p.stat().st_mtime, p))
+            except FileNotFoundError:
+                continue
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda item: item[0])
+        for _, p in files[:len(files) - self.max_files]:
+            p.unlink(missing_ok=True)
+
+    def read_bytes(self, key: str, suffix: str, render: Callable[[Path], None]) -> bytes:
+        """Contenido del archivo (espera el render si hace falta).
+
+        Si la poda lo borra antes de leerlo se vuelve a pedir; si sigue perdiendo
+        la carrera (caché muy chica y mucha concurrencia) se renderiza sin caché."""
+        for _ in range(READ_ATTEMPTS):
+            try:
+                return self.submit(key, suffix, render).result().read_bytes()
+            except FileNotFoundError:
+                continue
+        return self._render_uncached(render, suffix)
+
+    def _render_uncached(self, render: Callable[[Path], None], suffix: str) -> bytes:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.out_dir / f".uncached.{threading.get_ident()}{suffix}"
+        try:
+            with timer(f"export.render{suffix}"):
+                render(tmp)
+            return tmp.read_bytes()
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "renders": self.renders, "errors": self.errors, "pending": len(self._pending)}
+
+@st.cache_resource
+def exporter() -> ChartExporter:
+    """Exportador compartido por todas las sesiones del servidor."""
+    return ChartExporter(
+        Path(os.environ.get(ENV_EXPORT_DIR, DEFAULT_EXPORT_DIR)),
+        max_files=int(os.environ.get(ENV_MAX_FILES, DEFAULT_MAX_FILES)),
+    )
+
+def plotly_html_download(fig: Any, key: str) -> Callable[[], bytes]:
+    """Datos diferidos para ``st.download_button``: el HTML se genera (o se lee de
+    la caché) hasta que se presiona el botón."""
+    def render(path: Path) -> None:
+        path.write_text(fig.to_html(include_plotlyjs="cdn"), encoding="utf-8")
+
+    return lambda: exporter().read_bytes(key, ".html", render)
+
+def save_png_async(
+    build_fig: Callable[[], Any],
+    key: str,
+    out_dir: str = "plots",
+    filename: str = "plot.png",
+    dpi: int = 200
+) -> "Future[Path]":
+    """Guarda el PNG en segundo plano: se renderiza a la caché (si no está) y se
+    copia a ``out_dir/filename``. ``build_fig`` construye una figura nueva."""
+    def render(path: Path) -> None:
+        fig = build_fig()
+        fig.savefig(path, format="png", bbox_inches="tight", dpi=dpi)
+
+    target = Path(out_dir) / filename
+    ex = exporter()  # los callbacks corren en hilos del pool, fuera del script
+    done: "Future[Path]" = Future()
+
+    def publish(f: "Future[Path]", attempt: int = 1) -> None:
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(f.result(), target)
+            done.set_result(target)
+        except FileNotFoundError:
+            # la poda borró el PNG cacheado antes de copiarlo: se vuelve a pedir y,
+            # si sigue perdiendo la carrera, se escribe sin pasar por la caché
+            if attempt < READ_ATTEMPTS:
+                ex.submit(key, ".png", render).add_done_callback(lambda g: publish(g, attempt + 1))
+                return
+            try:
+                target.write_bytes(ex._render_uncached(render, ".png"))
+                done.set_result(target)
+            except Exception as e:
+                done.set_exception(e)
+        except Exception as e:  # el error queda en el Future
+            done.set_exception(e)
+
+    ex.submit(key, ".png", render).add_done_callback(publish)
+    return done
@@ -4,10 +4,17 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from pensiones.core.isr_2026 import isr_monthly
+from pensiones.core.curves import effective_rate_curve
+from pensiones.core.isr_2026 import isr_monthly, load_isr_2026_piecewise
 from pensiones.core.ss_1997 import ss_contributions_monthly, effective_rates
+from pensiones.ui.cache import memoize
+from pensiones.ui.exports import content_key, plotly_html_download
+from pensiones.utils.profiling import timer
 from pensiones.utils.plotting import line_plot, save_fig
 
+_isr_monthly = memoize("isr_monthly")(isr_monthly)
+_ss_contributions_monthly = memoize("ss_contributions_monthly")(ss_contributions_monthly)
+
 def render():
     st.header("I) ISR 2026 + Seguridad Social (LSS 1997) + INFONAVIT")
 
@@ -35,8 +42,8 @@ def render():
             salary_monthly = st.number_input("Sueldo mensual (ingreso gravable) [MXN]", min_value=0.0, value=20000.0, step=500.0)
             sbc_daily = st.number_input("SBC diario (Sueldo Base de Cotización) [MXN]", min_value=0.0, value=700.0, step=10.0)
             days = st.number_input("Días del mes", min_value=28, max_value=31, value=30, step=1)
-            income_min = st.number_input("Ingreso mínimo para gráfica [MXN/mes]", min_value=0.0, value=5000.0, step=500.0)
-            income_max = st.number_input("Ingreso máximo para gráfica [MXN/mes]", min_value=0.0, value=80000.0, step=500.0)
+            income_min = st.number_input("Ingreso mínimo para gráfica [MXN/mes]", min_value=1.0, value=5000.0, step=500.0)
+            income_max = st.number_input("Ingreso máximo para gráfica [MXN/mes]", min_value=1.0, value=80000.0, step=500.0)
             n_points = st.slider("Puntos en la gráfica", min_value=10, max_value=80, value=40)
             #save_plots = st.checkbox("Guardar gráfica en carpeta plots/", value=True)
             submitted = st.form_submit_button("Calcular")
@@ -46,20 +53,20 @@ def render():
         return
 
     # Cálculos
-    isr_out = isr_monthly(salary_monthly)
-    ss_out = ss_contributions_monthly(sbc_daily=sbc_daily, days_in_month=int(days))
+    isr_out = _isr_monthly(salary_monthly)
+    ss_out = _ss_contributions_monthly(sbc_daily=sbc_daily, days_in_month=int(days), compact=True)
 
     sbc_monthly = float(sbc_daily) * float(days)
     eff = effective_rates(
         sbc_monthly=sbc_monthly if sbc_monthly > 0 else salary_monthly,
         isr_monthly=float(isr_out["isr"]),
-        ss_total_monthly=float(ss_out["totals"]["Total"])
+        ss_total_monthly=float(ss_out.totals["Total"])
     )
 
     with colR:
         st.subheader("Resultados")
         st.metric("ISR mensual", f"$ {isr_out['isr']:,.2f}")
-        st.metric("SS total mensual (IMSS+INFONAVIT)", f"$ {ss_out['totals']['Total']:,.2f}")
+        st.metric("SS total mensual (IMSS+INFONAVIT)", f"$ {ss_out.totals['Total']:,.2f}")
         st.metric("Tasa efectiva ISR (sobre base)", f"{eff['isr_eff']:.2%}")
         st.metric("Tasa efectiva SS (sobre base)", f"{eff['ss_eff']:.2%}")
 
@@ -72,31 +79,27 @@ def render():
         })
 
     st.subheader("Desglose de contribuciones a Seguridad Social")
-    st.dataframe(ss_out["detail"], use_container_width=True)
+    st.dataframe(ss_out.to_frame(), use_container_width=True)
 
     st.subheader("Gráfica: tasas efectivas por nivel de ingreso")
     if income_max <= income_min:
         st.warning("Para graficar, asegúrate de que ingreso máximo > ingreso mínimo.")
         return
 
-    incomes = np.linspace(income_min, income_max, int(n_points))
-    rows = []
-    for inc in incomes:
-        isr_val = isr_monthly(float(inc))["isr"]
-        # Para la curva, aproximamos SBC mensual como el ingreso mensual/30 * días
-        # (ajusta si tu definición de SBC difiere).
-        sbc_m = float(inc)
-        ss_total = ss_out["totals"]["Total"]  # usando el mismo SBC ingresado; puedes variar con inc si lo quieres
-        isr_eff = isr_val / sbc_m if sbc_m > 0 else 0.0
-        ss_eff = float(ss_total) / sbc_m if sbc_m > 0 else 0.0
-        rows.append({"Ingreso_mensual": float(inc), "ISR_eff": isr_eff, "SS_eff": ss_eff})
-
-    df_plot = pd.DataFrame(rows)
+    # Para la curva, aproximamos el SBC diario como ingreso mensual / días
+    # (ajusta si tu definición de SBC difiere). La curva se guarda por versión de
+    # tablas: al cambiar sólo el sueldo evaluado o ampliar el rango no se recalcula.
+    curve = effective_rate_curve(float(income_min), float(income_max), int(n_points), int(days))
+    df_plot = curve.to_frame()
+    # ISR es lineal por tramos: su tasa efectiva se dibuja con los puntos mínimos
+    # exactos (breakpoints + subdivisión de cada tramo), no con la malla. Los
+    # ingresos de la gráfica empiezan en 1.0 (la tasa efectiva no existe en 0).
+    isr_pts = load_isr_2026_piecewise().curve_points(float(income_min), float(income_max), kind="effective")
 
     import plotly.graph_objects as go
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df_plot["Ingreso_mensual"], y=df_plot["ISR_eff"], name="ISR_eff", mode="lines"))
+    fig.add_trace(go.Scatter(x=isr_pts["income"], y=isr_pts["effective_rate"], name="ISR_eff", mode="lines"))
     fig.add_trace(go.Scatter(x=df_plot["Ingreso_mensual"], y=df_plot["SS_eff"],  name="SS_eff",  mode="lines"))
 
     """# línea vertical en salario evaluado
@@ -113,12 +116,13 @@ def render():
 
     fig.add_trace(go.Scatter(
         x=[x0],
-        y=[float(ss_out["totals"]["Total"]) / x0 if x0 > 0 else 0.0],
+        y=[float(ss_out.totals["Total"]) / x0 if x0 > 0 else 0.0],
         name="SS (evaluado)",
         mode="markers"
     ))"""
 
-    st.plotly_chart(fig, use_container_width=True)
+    with timer("ui.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
 
 
@@ -136,12 +140,16 @@ def render():
     #     fname = "isr_ss_tasas_efectivas.png"
     #     path = save_fig(fig, out_dir="plots", filename=fname)
     #     st.success(f"Gráfica guardada en: {path}")
-    html = fig.to_html(include_plotlyjs="cdn").encode("utf-8")
+    # el HTML se genera hasta que se pide la descarga (y se reutiliza si la gráfica no cambió)
+    html_key = content_key(
+        "isr_ss_tasas_html", isr_pts["income"], isr_pts["effective_rate"], df_plot[["Ingreso_mensual", "SS_eff"]]
+    )
     st.download_button(
         "Descargar gráfica (HTML)",
-        data=html,
+        data=plotly_html_download(fig, html_key),
         file_name="tasas_efectivas.html",
-        mime="text/html"
+        mime="text/html",
+        on_click="ignore",
     )
 
     with st.expander("Comentarios (para tu archivo separado)"):
@@ -3,14 +3,22 @@ from __future__ import annotations
 import numpy as np
 import streamlit as st
 
+from pensiones.core.lss1997_mc import simulate_replacement_rates
 from pensiones.core.lss1997_ret import (
     replacement_rate_lss1997,
     solve_voluntary_rate_for_target,
     rr_curve,
 )
+from pensiones.ui.cache import memoize
+from pensiones.ui.exports import content_key, plotly_html_download
+from pensiones.utils.profiling import timer
+from pensiones.utils.io import load_params
 
-import plotly.express as px
-
+_solve_voluntary_rate_for_target = memoize("solve_voluntary_rate_for_target")(solve_voluntary_rate_for_target)
+_replacement_rate_lss1997 = memoize("replacement_rate_lss1997")(replacement_rate_lss1997)
+_rr_curve = memoize("rr_curve")(rr_curve)
+# las muestras pesan (8 bytes × trayectoria): pocas entradas
+_simulate_replacement_rates = memoize("simulate_replacement_rates", maxsize=16)(simulate_replacement_rates)
 
 def render():
     st.header("II) LSS 1997 — Tasa de reemplazo por cesantía en edad avanzada y vejez")
@@ -21,9 +29,12 @@ def render():
 - Estima la tasa de reemplazo (CESANTÍA/VEJEZ) para edad x
 - Encuentra la tasa de ahorro voluntario adicional necesaria para una RR objetivo
 - Grafica RR (tasa de reemplazo) vs. diferentes tasas de contribución voluntaria
+- (Opcional) Simula rendimientos/inflación/salarios estocásticos: percentiles de RR y probabilidad de meta
 """
         )
 
+    params = load_params("lss1997_assumptions.json")
+
     col1, col2 = st.columns([1, 1], gap="large")
 
     # -------------------------
@@ -94,7 +105,9 @@ def render():
                 with c2:
                     crecimiento = (
                         st.number_input(
-                            "Crecimiento salarial anual (%)", value=0.0, step=0.5
+                            "Crecimiento salarial anual (%)",
+                            value=100 * float(params.get("wage_growth_annual", 0.0)),
+                            step=0.5,
                         )
                         / 100
                     )
@@ -105,6 +118,31 @@ def render():
                 v_min = st.slider("Voluntaria mínima (para curva)", 0.0, 0.30, 0.0)
                 v_max = st.slider("Voluntaria máxima (para curva)", 0.0, 0.30, 0.20)
                 n_pts = st.slider("Puntos curva", 10, 100, 40)
+                annuity_basis = st.radio(
+                    "Conversión del saldo a pensión",
+                    options=["Renta vitalicia (tablas de mortalidad)", "Renta cierta (annuity_years del JSON)"],
+                    index=0,
+                )
+
+            with st.expander("🎲 Simulación Monte Carlo", expanded=False):
+                run_mc = st.checkbox("Simular distribución de la RR", value=False)
+                c1, c2 = st.columns(2)
+                with c1:
+                    n_paths = st.select_slider(
+                        "Trayectorias", options=[1_000, 10_000, 50_000, 100_000], value=10_000
+                    )
+                    mc_seed = st.number_input("Semilla", min_value=0, value=2026, step=1)
+                with c2:
+                    return_vol = st.number_input(
+                        "Volatilidad rendimiento real anual (%)",
+                        value=100 * float(params.get("real_return_vol_annual", 0.0)),
+                        step=0.5,
+                    ) / 100
+                    wage_vol = st.number_input(
+                        "Volatilidad crecimiento salarial anual (%)",
+                        value=100 * float(params.get("wage_growth_vol_annual", 0.0)),
+                        step=0.5,
+                    ) / 100
 
             submitted = st.form_submit_button("Calcular")
 
@@ -118,23 +156,38 @@ def render():
             st.info("Ingresa valores y presiona **Calcular**.")
             return
 
-        # Nota: por ahora tu core usa (age_now, salary_monthly, target_rr)
-        # Mantengo variables aunque aún no entren (exp_retirement_age, weeks_now, crecimiento, dependientes, partner...)
-        sol = solve_voluntary_rate_for_target(
+        # Plotly se carga hasta que hay algo que graficar (arranque más rápido)
+        import plotly.express as px
+
+        # Nota: el core usa (age_now, salary_monthly, exp_retirement_age, crecimiento)
+        # y, con renta vitalicia, género y pareja (viudez); weeks_now y dependientes aún no entran
+        assumptions = {**params, "wage_growth_annual": float(crecimiento)}
+        if annuity_basis.startswith("Renta vitalicia"):
+            assumptions.update(
+                gender=gender,
+                partner_age=None if partner_age is None else float(partner_age),
+                gender_partner=gender_partner,
+            )
+        sol = _solve_voluntary_rate_for_target(
             age_now=int(age_now),
             salary_monthly=float(salary_monthly),
             target_rr=float(target_rr),
+            assumptions=assumptions,
+            retirement_age=int(exp_retirement_age),
         )
 
-        out = replacement_rate_lss1997(
+        out = _replacement_rate_lss1997(
             int(age_now),
             float(salary_monthly),
             float(sol["voluntary_rate"]),
+            assumptions,
+            retirement_age=int(exp_retirement_age),
         )
 
         st.metric("Ahorro voluntario requerido", f"{sol['voluntary_rate']:.2%}")
         st.metric("RR alcanzada (modelo)", f"{sol['achieved_rr']:.2%}")
         st.metric("Pensión mensual estimada", f"$ {out['pension_monthly']:,.2f}")
+        st.metric("Saldo estimado al retiro", f"$ {out['balance']:,.2f}")
 
         # (Opcional) mini-debug para ti, sin ensuciar:
         with st.expander("Ver inputs usados (debug)", expanded=False):
@@ -158,6 +211,45 @@ def render():
                 }
             )
 
+    # -------------------------
+    # MONTE CARLO (full width)
+    # -------------------------
+    if run_mc:
+        st.subheader("Simulación Monte Carlo: distribución de la RR")
+        mc = _simulate_replacement_rates(
+            int(age_now),
+            float(salary_monthly),
+            float(sol["voluntary_rate"]),
+            n_paths=int(n_paths),
+            seed=int(mc_seed),
+            target_rr=float(target_rr),
+            assumptions={
+                **assumptions,
+                "real_return_vol_annual": float(return_vol),
+                "wage_growth_vol_annual": float(wage_vol),
+            },
+            retirement_age=int(exp_retirement_age),
+            return_samples=True,
+        )
+
+        pct = mc["percentiles"]
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("P(RR ≥ meta)", f"{mc['prob_target']:.1%}")
+        c2.metric("RR mediana", f"{pct[50.0]:.2%}")
+        c3.metric("RR P5", f"{pct[5.0]:.2%}")
+        c4.metric("RR P95", f"{pct[95.0]:.2%}")
+
+        fig_mc = px.histogram(
+            x=mc["samples"],
+            nbins=60,
+            labels={"x": "Tasa de reemplazo"},
+            title=f"Distribución de la RR ({mc['n_paths']:,} trayectorias, voluntaria {sol['voluntary_rate']:.2%})",
+        )
+        fig_mc.add_vline(x=float(target_rr), line_dash="dash", annotation_text="meta")
+        fig_mc.update_layout(template="plotly_white", title_x=0.5, showlegend=False)
+        with timer("ui.plotly_chart"):
+            st.plotly_chart(fig_mc, use_container_width=True)
+
     # -------------------------
     # CURVA (full width)
     # -------------------------
@@ -168,7 +260,7 @@ def render():
         return
 
     rates = np.linspace(float(v_min), float(v_max), int(n_pts))
-    df = rr_curve(int(age_now), float(salary_monthly), rates)
+    df = _rr_curve(int(age_now), float(salary_monthly), rates, assumptions, retirement_age=int(exp_retirement_age))
 
     fig = px.line(
         df,
@@ -188,14 +280,16 @@ def render():
         title_x=0.5,
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with timer("ui.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
-    html = fig.to_html(include_plotlyjs="cdn").encode("utf-8")
+    # el HTML se genera hasta que se pide la descarga (y se reutiliza si la gráfica no cambió)
     st.download_button(
         "Descargar gráfica (HTML)",
-        data=html,
+        data=plotly_html_download(fig, content_key("lss1997_rr_html", df)),
         file_name="lss1997_rr_vs_voluntaria.html",
         mime="text/html",
+        on_click="ignore",
     )
 
     with st.expander("Comentarios (para tu archivo separado)"):
@@ -3,7 +3,24 @@ from __future__ import annotations
 import streamlit as st
 
 from pensiones.core.lss1973_ret import rr_by_retirement_age
-from pensiones.utils.plotting import line_plot, save_fig
+from pensiones.ui.cache import memoize
+from pensiones.ui.exports import content_key, save_png_async
+from pensiones.utils.profiling import timer
+from pensiones.utils.plotting import line_plot
+
+_rr_by_retirement_age = memoize("rr_by_retirement_age")(rr_by_retirement_age)
+
+def _build_rr_figure(df):
+    # una figura nueva por ejecución: matplotlib no es thread-safe y lo memoizado
+    # (st.cache_resource) se comparte entre sesiones, así que sólo se memoiza el DataFrame
+    return line_plot(
+        df=df,
+        x="retirement_age",
+        y_cols=["replacement_rate"],
+        title="Tasa de reemplazo por edad de jubilación (LSS 1973)",
+        xlabel="Edad de jubilación",
+        ylabel="Tasa de reemplazo"
+    )
 
 def render():
     st.header("IV) LSS 1973 — Pensión y tasa de reemplazo por edad de jubilación (60–65)")
@@ -26,6 +43,9 @@ def render():
             salary_monthly = st.number_input("Salario mensual y [MXN]", min_value=0.0, value=20000.0, step=500.0)
             min_age = st.slider("Edad mínima jubilación", 60, 65, 60)
             max_age = st.slider("Edad máxima jubilación", 60, 65, 65)
+            weeks_now = st.number_input("Semanas cotizadas a hoy", min_value=0, value=1000, step=50)
+            has_spouse = st.checkbox("Esposa(o) o concubina(o)", value=False)
+            n_children = st.number_input("Hijos con derecho a asignación", min_value=0, max_value=10, value=0, step=1)
             save_plots = st.checkbox("Guardar gráfica en plots/", value=True)
             submitted = st.form_submit_button("Calcular")
 
@@ -33,7 +53,9 @@ def render():
         st.info("Ingresa valores y presiona **Calcular**.")
         return
 
-    df = rr_by_retirement_age(int(age_now), float(salary_monthly), int(min_age), int(max_age))
+    worker = (float(weeks_now), bool(has_spouse), int(n_children))
+    df = _rr_by_retirement_age(int(age_now), float(salary_monthly), int(min_age), int(max_age),
+                               weeks_now=worker[0], has_spouse=worker[1], n_children=worker[2])
 
     with col2:
         st.subheader("Vista rápida")
@@ -45,19 +67,16 @@ def render():
     st.dataframe(df, use_container_width=True)
 
     st.subheader("Gráfica: RR vs edad de jubilación")
-    fig = line_plot(
-        df=df,
-        x="retirement_age",
-        y_cols=["replacement_rate"],
-        title="Tasa de reemplazo por edad de jubilación (LSS 1973)",
-        xlabel="Edad de jubilación",
-        ylabel="Tasa de reemplazo"
-    )
-    st.pyplot(fig, clear_figure=False)
+    plotted = df[["retirement_age", "replacement_rate"]]
+    fig = _build_rr_figure(plotted)
+    with timer("ui.pyplot"):
+        st.pyplot(fig, clear_figure=False)
 
     if save_plots:
-        path = save_fig(fig, out_dir="plots", filename="lss1973_rr_por_edad.png")
-        st.success(f"Gráfica guardada en: {path}")
+        # el PNG se escribe en segundo plano (y se reutiliza si la gráfica no cambió)
+        save_png_async(lambda: _build_rr_figure(plotted), content_key("lss1973_rr_png", plotted),
+                       out_dir="plots", filename="lss1973_rr_por_edad.png")
+        st.success("Gráfica guardándose en: plots/lss1973_rr_por_edad.png")
 
     with st.expander("Comentarios (para tu archivo separado)"):
         st.write(
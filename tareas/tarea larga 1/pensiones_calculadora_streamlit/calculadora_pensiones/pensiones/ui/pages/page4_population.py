@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from pensiones.aggregates import PopulationSummary, merge_summaries
+from pensiones.batch import compute_chunk, iter_chunks
+from pensiones.ui.cache import memoize
+from pensiones.utils.profiling import timer
+
+RATE_LABELS = {"isr_eff": "Tasa efectiva ISR", "ss_eff": "Tasa efectiva SS"}
+
+def _sample_chunks(n: int, seed: int, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Nómina sintética (sueldo log-normal, SBC ≈ sueldo / 30.4 con prestaciones)."""
+    rng = np.random.default_rng(seed)
+    for a in range(0, n, chunksize):
+        m = min(chunksize, n - a)
+        salary = np.round(rng.lognormal(np.log(15_000.0), 0.7, m), 2)
+        sbc = np.round(salary / 30.4 * rng.uniform(1.0452, 1.25, m), 2)
+        yield pd.DataFrame({"salary_monthly": salary, "sbc_daily": sbc, "days": rng.choice([28, 30, 31], m)})
+
+def _summarize(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+    # sólo el resumen (tamaño fijo) sobrevive a cada bloque
+    summary = PopulationSummary()
+    for chunk in chunks:
+        summary.update(compute_chunk(chunk))
+    return summary.to_dict()
+
+def _summarize_sample(n: int, seed: int, chunksize: int) -> Dict[str, Any]:
+    return _summarize(_sample_chunks(n, seed, chunksize))
+
+_sample_summary = memoize("population_sample_summary", maxsize=8)(_summarize_sample)
+
+def _file_summary(upload: Any, chunksize: int) -> Dict[str, Any]:
+    """Resumen de un archivo subido (nómina CSV/Parquet o resumen JSON de ``--summary``),
+    guardado en la sesión por archivo para no recalcularlo en cada rerun."""
+    cache = st.session_state.setdefault("population_summaries", {})
+    key = (upload.file_id, chunksize)
+    if key not in cache:
+        if upload.name.lower().endswith(".json"):
+            cache[key] = json.loads(upload.getvalue().decode("utf-8"))
+        else:
+            upload.seek(0)
+            cache[key] = _summarize(iter_chunks(upload, chunksize))
+    return cache[key]
+
+def _histogram_chart(summary: PopulationSummary):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for col, label in RATE_LABELS.items():
+        h = summary.histogram_frame(col)
+        h = h[np.isfinite(h["desde"]) & np.isfinite(h["hasta"])]
+        fig.add_trace(go.Bar(x=(h["desde"] + h["hasta"]) / 2, y=h["proporcion"], name=label, width=h["hasta"] - h["desde"]))
+    fig.update_layout(barmode="overlay", xaxis_title="Tasa efectiva", yaxis_title="Proporción de trabajadores",
+                      xaxis_tickformat=".0%", yaxis_tickformat=".0%")
+    fig.update_traces(opacity=0.6)
+    return fig
+
+def render():
+    st.header("V) Población — ISR y cuotas SS agregadas")
+
+    with st.expander("Qué hace esta sección", expanded=True):
+        st.write(
+            """
+- Calcula ISR, cuotas SS y tasas efectivas para toda una nómina, bloque por bloque
+- Sólo conserva resúmenes de tamaño fijo (sumas, histogramas, cuantiles aproximados), no las filas
+- Costo mensual por seguro y por aportante (patrón, trabajador, gobierno)
+- Distribución de tasas efectivas ISR/SS y trabajadores por tramo de la tarifa ISR
+- Acepta resúmenes JSON de `python -m pensiones.batch ... --summary` y los combina
+"""
+        )
+
+    with st.form("form_population"):
+        source = st.radio("Población", ["Ejemplo sintético", "Archivos"], horizontal=True)
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            n = st.number_input("Trabajadores (ejemplo)", min_value=1_000, max_value=5_000_000, value=100_000, step=10_000)
+        with c2:
+            seed = st.number_input("Semilla (ejemplo)", min_value=0, value=0, step=1)
+        with c3:
+            chunksize = st.number_input("Filas por bloque", min_value=1_000, max_value=1_000_000, value=100_000, step=10_000)
+        uploads = st.file_uploader(
+            "Nómina (CSV/Parquet con salary_monthly, sbc_daily y opcional days/year) o resúmenes JSON",
+            type=["csv", "parquet", "json"],
+            accept_multiple_files=True,
+        )
+        submitted = st.form_submit_button("Calcular")
+
+    if not submitted:
+        st.info("Elige la población y presiona **Calcular**.")
+        return
+
+    with st.spinner("Resumiendo la población..."), timer("ui.population_summary"):
+        try:
+            if source == "Ejemplo sintético":
+                parts = [_sample_summary(int(n), int(seed), int(chunksize))]
+            else:
+                if not uploads:
+                    st.warning("Sube al menos un archivo.")
+                    return
+                parts = [_file_summary(f, int(chunksize)) for f in uploads]
+            summary = merge_summaries(PopulationSummary.from_dict(p) for p in parts)
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+    totals = summary.totals_frame().set_index("columna")
+    salary_total = totals.loc[summary.salary_col, "total"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Trabajadores", f"{summary.count:,}")
+    m2.metric("Nómina mensual", f"$ {salary_total:,.0f}")
+    m3.metric("ISR mensual total", f"$ {totals.loc['isr', 'total']:,.0f}")
+    m4.metric("SS mensual total (IMSS+INFONAVIT)", f"$ {totals.loc['ss_total', 'total']:,.0f}")
+
+    st.subheader("Costo mensual por seguro y aportante")
+    st.dataframe(summary.insurance_frame(), use_container_width=True, hide_index=True)
+
+    st.subheader("Distribución de tasas efectivas")
+    with timer("ui.plotly_chart"):
+        st.plotly_chart(_histogram_chart(summary), use_container_width=True)
+    st.caption("Cuantiles aproximados (error relativo ≤ 0.5%)")
+    st.dataframe(summary.quantiles_frame(), use_container_width=True, hide_index=True)
+
+    st.subheader("Trabajadores por tramo de ISR")
+    st.dataframe(summary.brackets_frame().query("n > 0"), use_container_width=True, hide_index=True)
+
+    with st.expander("Totales por columna"):
+        st.dataframe(summary.totals_frame(), use_container_width=True, hide_index=True)
+
+    st.download_button(
+        "Descargar resumen (JSON)",
+        data=json.dumps(summary.to_dict(), ensure_ascii=False),
+        file_name="resumen_poblacion.json",
+        mime="application/json",
+    )
@@ -1,15 +1,155 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Tuple
+
+from pensiones.utils.profiling import timer
 
 PACKAGE_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PACKAGE_ROOT / "data"
 
-def load_json(name: str) -> Dict[str, Any]:
+# Número máximo de tablas parseadas que se mantienen en memoria por proceso.
+CACHE_MAXSIZE = 32
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: int
+
+class _Entry(NamedTuple):
+    stamp: Tuple[int, int]  # (mtime_ns, tamaño) del archivo cuando se parseó
+    digest: str  # sha256 del contenido
+    value: Any
+
+_lock = threading.Lock()
+_cache: "OrderedDict[Tuple[str, Callable[[Dict[str, Any]], Any]], _Entry]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+def _resolve(name: str) -> Path:
     path = DATA_DIR / name
     if not path.exists():
         raise FileNotFoundError(f"No existe el archivo: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return path
+
+def _raw(data: Dict[str, Any]) -> Dict[str, Any]:
+    return data
+
+def load_parsed(name: str, parser: Callable[[Dict[str, Any]], Any]) -> Any:
+    """Devuelve ``parser(json)`` del archivo ``name`` de ``pensiones/data/``, cacheado.
+
+    La caché es de todo el proceso, se indexa por (ruta, parser) y se invalida
+    cuando cambia el mtime/tamaño del archivo *y* su sha256. Con el archivo sin
+    cambios sólo se hace un ``stat``: no se relee ni se vuelve a parsear. Si hay
+    un snapshot vigente (``pensiones.utils.snapshot``) el valor se mapea de ahí
+    en lugar de parsear el JSON.
+
+    El valor devuelto es compartido: trátalo como de solo lectura.
+    """
+    path = _resolve(name)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (str(path), parser)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry.stamp == stamp:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry.value
+
+    with timer(f"io.read:{name}"):
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry.digest == digest:
+            # se tocó el archivo pero el contenido es el mismo
+            _cache[key] = entry._replace(stamp=stamp)
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry.value
+
+    # snapshot binario (``python -m pensiones.utils.snapshot build``): se usa sólo
+    # si se compiló a partir de este mismo contenido (mismo sha256)
+    from pensiones.utils.snapshot import lookup
+
+    with timer(f"io.snapshot:{name}"):
+        value = lookup(name, parser, digest)
+    if value is None:
+        with timer(f"io.parse:{name}"):
+            value = parser(json.loads(raw.decode("utf-8")))
+
+    with _lock:
+        _stats["misses"] += 1
+        _cache[key] = _Entry(stamp=stamp, digest=digest, value=value)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAXSIZE:
+            _cache.popitem(last=False)
+            _stats["evictions"] += 1
+    return value
+
+def load_json(name: str) -> Dict[str, Any]:
+    """JSON de ``pensiones/data/`` (copia propia, se puede modificar)."""
+    return copy.deepcopy(load_parsed(name, _raw))
+
+def _params(data: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(dict(data.get("params", {})))
+
+def load_params(name: str) -> Mapping[str, Any]:
+    """Bloque ``params`` de un archivo de supuestos, cacheado y de solo lectura."""
+    return load_parsed(name, _params)
+
+def cache_info() -> CacheInfo:
+    with _lock:
+        return CacheInfo(
+            hits=_stats["hits"],
+            misses=_stats["misses"],
+            evictions=_stats["evictions"],
+            currsize=len(_cache),
+            maxsize=CACHE_MAXSIZE,
+        )
+
+def cache_entries() -> List[Tuple[str, Callable[[Dict[str, Any]], Any], str, Any]]:
+    """(archivo, parser, sha256, valor) de cada tabla en la caché (para el snapshot)."""
+    with _lock:
+        return [(Path(path).name, parser, e.digest, e.value) for (path, parser), e in _cache.items()]
+
+def cache_clear(reset_stats: bool = True) -> None:
+    with _lock:
+        _cache.clear()
+        if reset_stats:
+            for k in _stats:
+                _stats[k] = 0
+
+def file_version(name: str) -> str:
+    """Huella (sha256, 16 caracteres) del contenido actual de ``name``.
+
+    Reutiliza la caché de ``load_parsed``: con el archivo sin cambios sólo cuesta un ``stat``.
+    """
+    load_parsed(name, _raw)
+    with _lock:
+        entry = _cache.get((str(_resolve(name)), _raw))
+    if entry is None:  # desalojada entre ambas llamadas
+        return hashlib.sha256(_resolve(name).read_bytes()).hexdigest()[:16]
+    return entry.digest[:16]
+
+def data_version() -> str:
+    """Huella de los archivos de ``pensiones/data/`` (nombre, mtime, tamaño).
+
+    Sirve como parte de la llave de cachés de resultados: cambia en cuanto se
+    edita cualquier tabla o supuesto.
+    """
+    h = hashlib.sha1()
+    for path in sorted(DATA_DIR.glob("*.json")):
+        st = path.stat()
+        h.update(f"{path.name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return h.hexdigest()[:16]
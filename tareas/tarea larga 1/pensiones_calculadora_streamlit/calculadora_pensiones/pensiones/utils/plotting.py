@@ -1,19 +1,29 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import matplotlib.pyplot as plt
-import pandas as pd
+from pensiones.utils.profiling import timed
 
+if TYPE_CHECKING:  # matplotlib/pandas se importan hasta que se dibuja algo
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+@timed()
 def save_fig(fig: plt.Figure, out_dir: str = "plots", filename: str = "plot.png") -> str:
     Path(out_dir).mkdir(parents=True, exist_ok=True)
     out_path = Path(out_dir) / filename
     fig.savefig(out_path, bbox_inches="tight", dpi=200)
     return str(out_path)
 
+@timed()
 def line_plot(df: pd.DataFrame, x: str, y_cols: list[str], title: str, xlabel: str, ylabel: str) -> plt.Figure:
-    fig, ax = plt.subplots()
+    # Figure directa (sin pyplot): no queda registrada en el estado global y se
+    # puede construir/guardar desde hilos en segundo plano
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
     for col in y_cols:
         ax.plot(df[x], df[col], label=col)
     ax.set_title(title)
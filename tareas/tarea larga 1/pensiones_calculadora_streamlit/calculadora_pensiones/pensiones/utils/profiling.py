@@ -0,0 +1,168 @@
+"""Instrumentación opcional: conteo de llamadas y tiempos de las funciones del core.
+
+- ``PENSIONES_PROFILE=1`` activa el registro global de tiempos (todo el proceso).
+- ``collect()`` activa el registro sólo para el bloque actual (p.ej. una
+  ejecución de la página en Streamlit) y devuelve ese desglose aparte.
+- ``PENSIONES_CPROFILE=ruta.pstats`` hace que ``cprofile_from_env()`` (usado por
+  ``python -m pensiones.batch``) guarde un perfil de cProfile.
+
+Desactivado, ``timed``/``timer`` sólo cuestan una verificación por llamada.
+"""
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import functools
+import io as _io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+ENV_PROFILE = "PENSIONES_PROFILE"
+ENV_CPROFILE = "PENSIONES_CPROFILE"
+
+# Muestras recientes que se guardan por función para calcular el p95.
+MAX_SAMPLES = 2048
+
+class _Stat:
+    __slots__ = ("calls", "total", "samples")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+class Registry:
+    """Estadísticas por nombre (llamadas, tiempo acumulado, p95 de muestras recientes)."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, _Stat] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = _Stat()
+            stat.add(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(name, s.calls, s.total, list(s.samples)) for name, s in self._stats.items()]
+        rows = []
+        for name, calls, total, samples in items:
+            arr = np.asarray(samples)
+            rows.append({
+                "name": name,
+                "calls": calls,
+                "total_ms": 1e3 * total,
+                "mean_ms": 1e3 * total / calls,
+                "p95_ms": 1e3 * float(np.percentile(arr, 95)),
+                "max_ms": 1e3 * float(arr.max()),
+            })
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.snapshot(), columns=["name", "calls", "total_ms", "mean_ms", "p95_ms", "max_ms"])
+
+    def report(self) -> str:
+        lines = [f"{'función':<48} {'llamadas':>9} {'total ms':>10} {'media ms':>10} {'p95 ms':>10}"]
+        for r in self.snapshot():
+            lines.append(
+                f"{r['name']:<48} {r['calls']:>9,} {r['total_ms']:>10.2f} {r['mean_ms']:>10.3f} {r['p95_ms']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+GLOBAL = Registry()
+_enabled = os.environ.get(ENV_PROFILE, "").strip().lower() in ("1", "true", "yes", "si", "sí")
+_collector: contextvars.ContextVar[Optional[Registry]] = contextvars.ContextVar("pensiones_profiling", default=None)
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def _record(name: str, seconds: float, local: Optional[Registry]) -> None:
+    if _enabled:
+        GLOBAL.add(name, seconds)
+    if local is not None:
+        local.add(name, seconds)
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Mide el bloque con nombre ``name`` (si la instrumentación está activa)."""
+    local = _collector.get()
+    if not _enabled and local is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - t0, local)
+
+def timed(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorador: registra llamadas y tiempos de la función (``modulo.funcion``)."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            local = _collector.get()
+            if not _enabled and local is None:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(label, time.perf_counter() - t0, local)
+        return wrapper
+    return decorator
+
+@contextmanager
+def collect() -> Iterator[Registry]:
+    """Registra los tiempos del bloque en un ``Registry`` propio (por contexto/hilo)."""
+    local = Registry()
+    token = _collector.set(local)
+    try:
+        yield local
+    finally:
+        _collector.reset(token)
+
+@contextmanager
+def cprofile_from_env(top: int = 25) -> Iterator[Optional[cProfile.Profile]]:
+    """Si ``PENSIONES_CPROFILE`` tiene una ruta, perfila el bloque con cProfile,
+    guarda el .pstats ahí e imprime las ``top`` funciones por tiempo acumulado."""
+    path = os.environ.get(ENV_CPROFILE, "").strip()
+    if not path:
+        yield None
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        buf = _io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        print(f"Perfil cProfile guardado en {path}\n{buf.getvalue()}", file=sys.stderr)
@@ -0,0 +1,369 @@
+"""Snapshot binario de las tablas compiladas de ``pensiones/data/``.
+
+``python -m pensiones.utils.snapshot build`` carga (y valida) todas las tablas
+con sus parsers y guarda el resultado en ``pensiones/data/snapshot/``:
+
+- todos los arreglos de NumPy en un solo ``arrays.bin`` (bytes crudos alineados
+  a 64, sin pickle), que se mapea completo con ``np.memmap``;
+- ``manifest.json`` con la versión del formato, el sha256 de cada JSON fuente y
+  de ``arrays.bin``, el parser que produjo cada valor y la estructura
+  (dataclasses, tuplas, diccionarios) con dtype/forma/offset de cada arreglo.
+
+``pensiones.utils.io.load_parsed`` consulta el snapshot antes de parsear: si
+existe una entrada para (archivo, parser) cuyo sha256 coincide con el del JSON
+actual, el valor se arma con vistas de solo lectura sobre el mapa (sin copiar:
+todos los procesos comparten las mismas páginas del archivo). Si el JSON cambió, la
+entrada se ignora y se parsea como siempre, así que un snapshot viejo nunca da
+resultados distintos a los del JSON. Lo mismo si cambia el código de los
+parsers (``code_fingerprint``): entonces no se usa ninguna entrada.
+
+``PENSIONES_SNAPSHOT=0`` lo desactiva; ``PENSIONES_SNAPSHOT=<carpeta>`` usa otra carpeta.
+
+Uso (desde la carpeta del proyecto):
+    python -m pensiones.utils.snapshot build
+    python -m pensiones.utils.snapshot verify     # sha256 de arrays.bin y frescura vs. JSON
+    python -m pensiones.utils.snapshot info
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pensiones.utils.io import DATA_DIR, cache_clear, cache_entries, file_version
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+BLOB = "arrays.bin"
+ALIGN = 64
+ENV_SNAPSHOT = "PENSIONES_SNAPSHOT"
+DEFAULT_DIR = DATA_DIR / "snapshot"
+
+class SnapshotError(ValueError):
+    """El snapshot no se puede construir o está dañado."""
+
+def snapshot_dir() -> Optional[Path]:
+    """Carpeta del snapshot, o None si está desactivado."""
+    value = os.environ.get(ENV_SNAPSHOT, "").strip()
+    if value.lower() in ("0", "off", "false", "no"):
+        return None
+    return Path(value) if value else DEFAULT_DIR
+
+def code_fingerprint() -> str:
+    """sha256 del código que produce las tablas (``pensiones/core`` + ``utils/io.py``)."""
+    package = DATA_DIR.parent
+    h = hashlib.sha256()
+    for path in sorted((package / "core").glob("*.py")) + [package / "utils" / "io.py"]:
+        h.update(path.name.encode() + b"\0" + path.read_bytes())
+    return h.hexdigest()[:16]
+
+def parser_id(parser: Callable[..., Any]) -> Optional[str]:
+    """``modulo:nombre`` del parser; None si no es una función de módulo (lambda, local)."""
+    qualname = getattr(parser, "__qualname__", "")
+    if not qualname or "<" in qualname:
+        return None
+    return f"{parser.__module__}:{qualname}"
+
+# --- codificación -------------------------------------------------------------
+
+def _is_json(value: Any) -> bool:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json(v) for v in value)
+    if type(value) is dict:
+        return all(isinstance(k, str) and _is_json(v) for k, v in value.items())
+    return False
+
+def _encode(value: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    if _is_json(value):
+        return {"$json": value}  # se usa tal cual al leer el manifiesto
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise SnapshotError("Arreglos de objetos no se pueden guardar sin pickle.")
+        arr = np.ascontiguousarray(value)
+        # mismo contenido -> mismo nombre: los arreglos repetidos se guardan una vez
+        name = hashlib.sha256(f"{arr.dtype.str}{arr.shape}".encode() + arr.tobytes()).hexdigest()[:24]
+        arrays[name] = arr
+        return {"$array": name}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        cls = type(value)
+        if not cls.__module__.startswith("pensiones."):
+            raise SnapshotError(f"Tipo no soportado: {cls.__module__}.{cls.__qualname__}")
+        return {
+            "$dataclass": f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {f.name: _encode(getattr(value, f.name), arrays) for f in dataclasses.fields(value) if f.init},
+        }
+    if isinstance(value, (dict, MappingProxyType)):
+        return {
+            "$mapping": [[_encode(k, arrays), _encode(v, arrays)] for k, v in value.items()],
+            "proxy": isinstance(value, MappingProxyType),
+        }
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(v, arrays) for v in value]}
+    if isinstance(value, list):
+        return {"$list": [_encode(v, arrays) for v in value]}
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    raise SnapshotError(f"Tipo no soportado en el snapshot: {type(value).__name__}")
+
+def _resolve_class(ref: str) -> type:
+    module, _, qualname = ref.partition(":")
+    if not module.startswith("pensiones."):
+        raise SnapshotError(f"Clase fuera del paquete en el snapshot: {ref}")
+    obj: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    if not dataclasses.is_dataclass(obj):
+        raise SnapshotError(f"{ref} no es una dataclass.")
+    return obj
+
+def _decode(value: Any, snap: "_Snapshot") -> Any:
+    if not isinstance(value, dict):
+        return value
+    if "$json" in value:
+        return value["$json"]
+    if "$array" in value:
+        return snap.array(value["$array"])
+    if "$dataclass" in value:
+        cls = _resolve_class(value["$dataclass"])
+        return cls(**{k: _decode(v, snap) for k, v in value["fields"].items()})
+    if "$tuple" in value:
+        return tuple(_decode(v, snap) for v in value["$tuple"])
+    if "$list" in value:
+        return [_decode(v, snap) for v in value["$list"]]
+    if "$mapping" in value:
+        items = {_decode(k, snap): _decode(v, snap) for k, v in value["$mapping"]}
+        return MappingProxyType(items) if value.get("proxy") else items
+    raise SnapshotError("Entrada desconocida en el manifiesto.")
+
+# --- lectura ------------------------------------------------------------------
+
+class _Snapshot:
+    def __init__(self, root: Path, manifest: Dict[str, Any]):
+        self.root = root
+        self.manifest = manifest
+        self.entries = {(e["source"], e["parser"]): e for e in manifest["entries"]}
+        self._blob: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self.manifest["arrays"][name]
+        shape = tuple(spec["shape"])
+        dtype = np.dtype(spec["dtype"])
+        if spec["nbytes"] == 0:  # no hay bytes que mapear
+            arr = np.empty(shape, dtype=dtype)
+        else:
+            with self._lock:
+                if self._blob is None:
+                    path = self.root / BLOB
+                    if path.stat().st_size != self.manifest["blob"]["bytes"]:
+                        raise SnapshotError(f"{BLOB} no coincide con el manifiesto (tamaño).")
+                    self._blob = np.memmap(path, dtype=np.uint8, mode="r")
+            arr = np.ndarray(shape, dtype=dtype, buffer=self._blob, offset=spec["offset"])
+        arr.flags.writeable = False
+        return arr
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {"key": None, "snapshot": None}
+_stats = {"hits": 0, "stale": 0, "errors": 0}
+
+def _open(root: Path) -> Optional[_Snapshot]:
+    path = root / MANIFEST
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    with _lock:
+        if _state["key"] == key:
+            return _state["snapshot"]
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    usable = manifest.get("format") == FORMAT_VERSION and manifest.get("code") == code_fingerprint()
+    snap = _Snapshot(root, manifest) if usable else None
+    with _lock:
+        _state["key"], _state["snapshot"] = key, snap
+    return snap
+
+def lookup(name: str, parser: Callable[..., Any], digest: str) -> Any:
+    """Valor precompilado de ``parser(name)`` si el snapshot corresponde al JSON
+    con sha256 ``digest``; si no, ``None`` (y se parsea normalmente)."""
+    root = snapshot_dir()
+    pid = parser_id(parser)
+    if root is None or pid is None:
+        return None
+    try:
+        snap = _open(root)
+        entry = None if snap is None else snap.entries.get((name, pid))
+        if entry is None:
+            return None
+        if entry["sha256"] != digest:
+            with _lock:
+                _stats["stale"] += 1
+            return None
+        value = _decode(entry["value"], snap)
+    except (OSError, ValueError, KeyError, AttributeError, TypeError, ImportError):
+        # un snapshot dañado nunca debe tumbar la carga: se vuelve al JSON
+        with _lock:
+            _stats["errors"] += 1
+        return None
+    with _lock:
+        _stats["hits"] += 1
+    return value
+
+def snapshot_info() -> Dict[str, Any]:
+    root = snapshot_dir()
+    snap = None if root is None else _open(root)
+    with _lock:
+        return {
+            "dir": None if root is None else str(root),
+            "entries": 0 if snap is None else len(snap.entries),
+            **_stats,
+        }
+
+# --- construcción -------------------------------------------------------------
+
+def _warm_all() -> None:
+    # todo lo que la app y el batch cargan con load_parsed
+    from pensiones.core.isr_2026 import load_isr_2026_piecewise, load_isr_2026_tariff
+    from pensiones.core.lss1973_ret import load_lss1973_tables
+    from pensiones.core.mortality import load_mortality_tables
+    from pensiones.parallel import warm_tables
+
+    warm_tables()
+    load_isr_2026_tariff()
+    load_isr_2026_piecewise()
+    load_lss1973_tables()
+    load_mortality_tables()
+
+def build(out_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Parsea todas las tablas desde los JSON y escribe el snapshot en ``out_dir``."""
+    root = Path(out_dir) if out_dir is not None else (snapshot_dir() or DEFAULT_DIR)
+    previous = os.environ.get(ENV_SNAPSHOT)
+    os.environ[ENV_SNAPSHOT] = "0"  # se compila desde los JSON, nunca desde otro snapshot
+    try:
+        cache_clear()
+        _warm_all()
+        loaded = cache_entries()
+    finally:
+        if previous is None:
+            os.environ.pop(ENV_SNAPSHOT, None)
+        else:
+            os.environ[ENV_SNAPSHOT] = previous
+        cache_clear()
+
+    arrays: Dict[str, np.ndarray] = {}
+    entries: List[Dict[str, Any]] = []
+    skipped: List[Tuple[str, str]] = []
+    for name, parser, digest, value in loaded:
+        pid = parser_id(parser)
+        if pid is None:
+            continue
+        try:
+            encoded = _encode(value, arrays)
+        except SnapshotError as e:
+            skipped.append((f"{name} ({pid})", str(e)))
+            continue
+        entries.append({"source": name, "parser": pid, "sha256": digest, "value": encoded})
+
+    # se escribe a una carpeta temporal y se cambia de golpe: nadie lee un snapshot a medias
+    tmp = root.with_name(f".{root.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    specs = {}
+    offset = 0
+    blob_hash = hashlib.sha256()
+    with open(tmp / BLOB, "wb") as fh:
+        for name, arr in sorted(arrays.items()):
+            pad = -offset % ALIGN
+            raw = arr.tobytes()
+            fh.write(b"\0" * pad + raw)
+            blob_hash.update(b"\0" * pad + raw)
+            offset += pad
+            specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset, "nbytes": len(raw)}
+            offset += len(raw)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "numpy": np.__version__,
+        "code": code_fingerprint(),
+        "entries": sorted(entries, key=lambda e: (e["source"], e["parser"])),
+        "blob": {"bytes": offset, "sha256": blob_hash.hexdigest()},
+        "arrays": specs,
+    }
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=1, ensure_ascii=False), encoding="utf-8")
+    old = root.with_name(f".{root.name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if root.exists():
+        root.rename(old)
+    tmp.rename(root)
+    shutil.rmtree(old, ignore_errors=True)
+    return {"dir": str(root), "entries": len(entries), "arrays": len(specs), "skipped": skipped}
+
+def verify(root: Optional[Path] = None) -> List[str]:
+    """Problemas encontrados (vacío = OK): sha256 de ``arrays.bin`` y entradas viejas."""
+    root = Path(root) if root is not None else (snapshot_dir() or DEFAULT_DIR)
+    path = root / MANIFEST
+    if not path.exists():
+        return [f"No existe {path}; corre `python -m pensiones.utils.snapshot build`."]
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    problems = []
+    if manifest.get("format") != FORMAT_VERSION:
+        problems.append(f"Formato {manifest.get('format')} (se espera {FORMAT_VERSION}).")
+    if manifest.get("code") != code_fingerprint():
+        problems.append("Cambió el código de los parsers (pensiones/core): reconstruye el snapshot.")
+    blob = root / BLOB
+    spec = manifest.get("blob", {})
+    if not blob.exists() or hashlib.sha256(blob.read_bytes()).hexdigest() != spec.get("sha256"):
+        problems.append(f"{BLOB}: falta o no coincide el sha256.")
+    for e in manifest.get("entries", []):
+        if not (DATA_DIR / e["source"]).exists():
+            problems.append(f"{e['source']}: ya no existe.")
+        elif not hashlib.sha256((DATA_DIR / e["source"]).read_bytes()).hexdigest() == e["sha256"]:
+            problems.append(f"{e['source']} ({e['parser']}): el JSON cambió, reconstruye el snapshot.")
+    return problems
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pensiones.utils.snapshot")
+    parser.add_argument("command", choices=["build", "verify", "info"])
+    parser.add_argument("--dir", default=None, help="carpeta del snapshot (por omisión pensiones/data/snapshot)")
+    args = parser.parse_args(argv)
+    root = Path(args.dir) if args.dir else None
+
+    if args.command == "build":
+        res = build(root)
+        print(f"Snapshot en {res['dir']}: {res['entries']} tablas, {res['arrays']} arreglos")
+        for what, why in res["skipped"]:
+            print(f"  omitido {what}: {why}", file=sys.stderr)
+        return 0
+    if args.command == "verify":
+        problems = verify(root)
+        for p in problems:
+            print(p)
+        print("OK" if not problems else f"{len(problems)} problema(s)")
+        return 1 if problems else 0
+    manifest_path = (root or snapshot_dir() or DEFAULT_DIR) / MANIFEST
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    print(f"formato {manifest['format']}, creado {manifest['created']}, numpy {manifest['numpy']}")
+    for e in manifest["entries"]:
+        if not (DATA_DIR / e["source"]).exists():
+            fresh = "FALTA"
+        else:
+            fresh = "ok" if e["sha256"][:16] == file_version(e["source"]) else "VIEJO"
+        print(f"  {e['source']:<28} {e['parser']:<55} {fresh}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())